@@ -71,7 +71,7 @@ final as (
     from rates r
     left join contracts c on r.contract_id = c.contract_id
     {% if ref_exists %}
-    left join {{ ref('ref_service_categories') }} ref on upper(r.service_category) = upper(ref.category_code)
+    left join {{ ref('ref_service_categories') }} ref on r.service_category = ref.category_code
     {% endif %}
 )
 
@@ -0,0 +1,89 @@
+"""
+Amendment Extraction Benchmark
+
+Times amendment extraction on adversarial contract text with the original
+lookahead regex and with the current segmenter, and checks that both give
+the same amendments. The inputs are:
+    boilerplate  "amendment" mentioned thousands of times without a number
+    whitespace   unnumbered mentions followed by long whitespace runs
+                 (quadratic backtracking in the original pattern)
+    numbered     thousands of numbered amendments with long descriptions
+    tail         one amendment followed by megabytes of text
+
+Usage (from the extraction/ directory):
+    python benchmarks/amendment_bench.py --scale 1
+    python benchmarks/amendment_bench.py --scale 4 --skip-legacy
+"""
+
+import os
+import re
+import sys
+import time
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.docling_parser import DoclingParser  # noqa: E402
+
+LEGACY_PATTERN = r"Amendment\s*(?:#|No\.?)?\s*(\d+)[:\s]*(.*?)(?=Amendment|$)"
+LEGACY_DATE_PATTERN = r"effective[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})"
+
+
+def legacy_amendments(parser: DoclingParser, text: str) -> list:
+    """The original regex implementation, as dicts."""
+    amendments = []
+    for match in re.finditer(LEGACY_PATTERN, text, re.IGNORECASE | re.DOTALL):
+        description = match.group(2)[:500].strip()
+        date_match = re.search(LEGACY_DATE_PATTERN, description, re.IGNORECASE)
+        amendments.append({
+            "amendment_id": f"AMD-{match.group(1)}",
+            "effective_date": parser._parse_date(date_match.group(1)) if date_match else None,
+            "description": description,
+            "amendment_type": "MODIFICATION",
+        })
+    return amendments
+
+
+def build_inputs(scale: int) -> dict:
+    return {
+        "boilerplate": "This amendment is subject to amendment under the amendments clause. " * (20000 * scale),
+        "whitespace": ("Amendment" + " " * 2000 + "(see schedule) ") * (100 * scale),
+        "numbered": "".join(
+            f"Amendment No. {i}: effective 01/{i % 28 + 1:02d}/2024 " + "Rates revised per exhibit. " * 40
+            for i in range(2000 * scale)
+        ),
+        "tail": "Amendment 1: effective 03/01/2024 " + "Fee schedule text. " * (250000 * scale),
+    }
+
+
+def timed(func, *args) -> tuple:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+@click.command()
+@click.option("--scale", default=1, show_default=True, help="Multiplier for input sizes")
+@click.option("--skip-legacy", is_flag=True, default=False, help="Only time the current implementation")
+def main(scale: int, skip_legacy: bool):
+    """Compare amendment extraction on worst-case inputs."""
+    parser = DoclingParser(field_cache=None)
+
+    click.echo(f"{'input':<12} {'chars':>10} {'amendments':>10} {'legacy s':>10} {'current s':>10}")
+
+    for name, text in build_inputs(scale).items():
+        current_seconds, current = timed(lambda t: parser._extract_amendments(t).to_dicts(), text)
+
+        legacy_column = "skipped"
+        if not skip_legacy:
+            legacy_seconds, legacy = timed(legacy_amendments, parser, text)
+            legacy_column = f"{legacy_seconds:.3f}"
+            if legacy != current:
+                raise SystemExit(f"{name}: current output differs from the legacy implementation")
+
+        click.echo(f"{name:<12} {len(text):>10} {len(current):>10} {legacy_column:>10} {current_seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
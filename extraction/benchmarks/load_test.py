@@ -0,0 +1,413 @@
+"""
+SQS Polling Load Test
+
+Drives SQSPoller + ContractExtractor against local S3/SQS stand-ins at a
+controlled message rate to find the sustainable throughput and where it
+saturates. By default an in-process moto server is started; pass
+--endpoint-url to use LocalStack from docker-compose.yml instead.
+
+The harness seeds a corpus of PDFs into the raw bucket and injects S3
+event messages at a steady rate, optionally with periodic bursts. Pollers
+run in threads. It reports:
+    - end-to-end latency percentiles (send -> processed and deleted)
+    - completed messages per second against the offered rate
+    - queue depth (visible / in flight) sampled over time
+    - AWS API call counts by service and operation
+    - worker utilization (share of wall time spent handling messages)
+
+The JSON report records the git revision, so runs can be compared
+across builds with --compare.
+
+Usage (from the extraction/ directory):
+    python benchmarks/load_test.py --rate 2 --duration 60 --workers 4 --report load.json
+    python benchmarks/load_test.py --rate 5 --burst-size 50 --burst-every 20 --compare load.json
+    python benchmarks/load_test.py --endpoint-url http://localhost:4566 --rate 1
+    python benchmarks/load_test.py --rate 4 --concurrency 2 --trace-file traces.jsonl
+"""
+
+import glob
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.batch import percentile  # noqa: E402
+
+REGION = "us-east-1"
+RAW_BUCKET = "loadtest-raw"
+PROCESSED_BUCKET = "loadtest-processed"
+QUEUE_NAME = "loadtest-contracts"
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+
+
+class ApiCallCounter:
+    """Counts botocore API calls on every client created from the default session."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def install(self):
+        import boto3
+
+        boto3.setup_default_session(region_name=REGION)
+        boto3.DEFAULT_SESSION.events.register("before-call", self._on_call)
+
+    def _on_call(self, event_name, **kwargs):
+        # event_name is before-call.<service>.<operation>
+        _, service, operation = event_name.split(".", 2)
+        with self._lock:
+            self.counts[f"{service}.{operation}"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(sorted(self.counts.items()))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def s3_event(key: str, size: int) -> str:
+    """S3 ObjectCreated notification body for one key."""
+    return json.dumps({
+        "Records": [{
+            "eventSource": "aws:s3",
+            "eventName": "ObjectCreated:Put",
+            "s3": {"bucket": {"name": RAW_BUCKET}, "object": {"key": key, "size": size}},
+        }]
+    })
+
+
+def build_poller_class():
+    """SQSPoller subclass that records latency and busy time per message."""
+    from src.extractor import SQSPoller
+
+    class InstrumentedPoller(SQSPoller):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.busy_seconds = 0.0
+            self.latencies = []
+            self.completed = 0
+            self._stats_lock = threading.Lock()
+
+        def _handle_message(self, message: dict):
+            start = time.perf_counter()
+            super()._handle_message(message)
+            busy = time.perf_counter() - start
+
+            sent_at = message.get("MessageAttributes", {}).get("SentAt", {}).get("StringValue")
+            with self._stats_lock:
+                self.busy_seconds += busy
+                if sent_at is not None:
+                    self.latencies.append(time.time() - float(sent_at))
+                self.completed += 1
+
+    return InstrumentedPoller
+
+
+def run_producer(sqs_client, queue_url, keys, rate, duration, burst_size, burst_every, sent):
+    """Send messages at `rate` per second, plus `burst_size` every `burst_every` seconds."""
+    start = time.monotonic()
+    next_burst = start + burst_every if burst_size and burst_every else None
+    index = 0
+
+    def send(count):
+        nonlocal index
+        for offset in range(0, count, 10):
+            entries = []
+            for i in range(min(10, count - offset)):
+                key, size = keys[index % len(keys)]
+                index += 1
+                entries.append({
+                    "Id": str(i),
+                    "MessageBody": s3_event(key, size),
+                    "MessageAttributes": {
+                        "SentAt": {"DataType": "Number", "StringValue": repr(time.time())}
+                    },
+                })
+            sqs_client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            sent[0] += len(entries)
+
+    while True:
+        now = time.monotonic()
+        elapsed = now - start
+        if elapsed >= duration:
+            break
+
+        due = int(elapsed * rate) + 1 - (sent[0] - sent[1])
+        if due > 0:
+            send(due)
+
+        if next_burst is not None and now >= next_burst:
+            send(burst_size)
+            sent[1] += burst_size
+            next_burst += burst_every
+
+        time.sleep(0.01)
+
+
+def sample_queue(sqs_client, queue_url, interval, samples, stop, start):
+    while not stop.is_set():
+        attributes = sqs_client.get_queue_attributes(
+            QueueUrl=queue_url,
+            AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"]
+        )["Attributes"]
+        samples.append({
+            "t": round(time.monotonic() - start, 2),
+            "visible": int(attributes["ApproximateNumberOfMessages"]),
+            "in_flight": int(attributes["ApproximateNumberOfMessagesNotVisible"]),
+        })
+        stop.wait(interval)
+
+
+def compare_reports(baseline: dict, current: dict):
+    """Print metric deltas against a previous report."""
+    click.echo(f"\nCompared with {baseline['build']['revision']} ({baseline['build']['started_at']}):")
+
+    for section, metric in [
+        ("throughput", "completed_per_second"),
+        ("latency_seconds", "p50"),
+        ("latency_seconds", "p95"),
+        ("latency_seconds", "p99"),
+        ("workers", "mean_utilization"),
+    ]:
+        old = baseline[section][metric]
+        new = current[section][metric]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        click.echo(f"  {section + '.' + metric:<38} {old:>10.3f} -> {new:>10.3f}  ({change})")
+
+
+@click.command()
+@click.option("--corpus", default=DEFAULT_CORPUS, show_default=True, help="PDF file, directory or glob to seed")
+@click.option("--objects", default=20, show_default=True, help="Distinct raw objects seeded from the corpus")
+@click.option("--rate", default=1.0, show_default=True, help="Steady messages per second")
+@click.option("--duration", default=30.0, show_default=True, help="Seconds to inject messages")
+@click.option("--burst-size", default=0, show_default=True, help="Extra messages per burst")
+@click.option("--burst-every", default=0.0, show_default=True, help="Seconds between bursts")
+@click.option("--workers", default=2, show_default=True, help="Poller threads")
+@click.option("--concurrency", default=1, show_default=True, help="Converter pool size and messages handled at once per poller")
+@click.option("--max-messages", default=10, show_default=True, help="Messages per receive call")
+@click.option("--scheduled/--unscheduled", default=False, help="Order batches through ContractScheduler")
+@click.option("--sample-interval", default=1.0, show_default=True, help="Queue depth sampling interval")
+@click.option("--drain-timeout", default=120.0, show_default=True, help="Max seconds to wait for the backlog")
+@click.option("--endpoint-url", default=None, help="Existing S3/SQS endpoint (e.g. LocalStack); default starts moto")
+@click.option("--report", "report_path", default=None, help="Write the JSON report here")
+@click.option("--compare", "compare_path", default=None, help="Previous report to compare against")
+@click.option("--log-level", default="WARNING", show_default=True, help="Extractor log level during the run")
+@click.option("--trace-file", default=None, help="Write per-message trace spans (JSON Lines) here")
+def main(
+    corpus, objects, rate, duration, burst_size, burst_every, workers, concurrency, max_messages, scheduled,
+    sample_interval, drain_timeout, endpoint_url, report_path, compare_path, log_level, trace_file
+):
+    """Measure sustainable SQS polling throughput against local stand-ins."""
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    server = None
+    if endpoint_url is None:
+        from moto.server import ThreadedMotoServer
+
+        # Keep the server's per-request access log out of the report output
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        port = free_port()
+        server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+        server.start()
+        endpoint_url = f"http://127.0.0.1:{port}"
+
+    # Every client the extractor creates picks this up
+    os.environ["AWS_ENDPOINT_URL"] = endpoint_url
+
+    api_calls = ApiCallCounter()
+    api_calls.install()
+
+    import boto3
+    from src import tracing
+    from src.extractor import ContractExtractor, EXTRACTOR_VERSION
+    from src.scheduler import ContractScheduler
+
+    logging.getLogger().setLevel(log_level)
+    tracing.configure(trace_file)
+
+    s3 = boto3.client("s3", region_name=REGION)
+    sqs = boto3.client("sqs", region_name=REGION)
+
+    for bucket in (RAW_BUCKET, PROCESSED_BUCKET):
+        try:
+            s3.create_bucket(Bucket=bucket)
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+    queue_url = sqs.create_queue(QueueName=QUEUE_NAME, Attributes={"VisibilityTimeout": "300"})["QueueUrl"]
+    sqs.purge_queue(QueueUrl=queue_url)
+
+    paths = sorted(glob.glob(os.path.join(corpus, "*.pdf")) if os.path.isdir(corpus) else glob.glob(corpus))
+    if not paths:
+        raise click.BadParameter(f"No PDFs found at {corpus}", param_hint="--corpus")
+
+    keys = []
+    for i in range(objects):
+        path = paths[i % len(paths)]
+        key = f"incoming/load-{i:05d}-{os.path.basename(path)}"
+        s3.upload_file(path, RAW_BUCKET, key)
+        keys.append((key, os.path.getsize(path)))
+
+    click.echo(f"Seeded {len(keys)} objects from {len(paths)} PDFs at {endpoint_url}")
+    seed_calls = api_calls.snapshot()
+
+    poller_class = build_poller_class()
+    pollers = [
+        poller_class(
+            queue_url,
+            ContractExtractor(RAW_BUCKET, PROCESSED_BUCKET, REGION, converter_pool_size=concurrency),
+            REGION,
+            wait_time=1,
+            max_messages=max_messages,
+            concurrency=concurrency,
+            scheduler=ContractScheduler() if scheduled else None
+        )
+        for _ in range(workers)
+    ]
+
+    stop_workers = threading.Event()
+    stop_sampling = threading.Event()
+    samples = []
+    sent = [0, 0]  # total sent, burst messages sent
+    started_at = datetime.utcnow().isoformat() + "Z"
+    start = time.monotonic()
+
+    def work(poller):
+        while not stop_workers.is_set():
+            poller._poll_once()
+
+    threads = [threading.Thread(target=work, args=(p,), daemon=True) for p in pollers]
+    sampler = threading.Thread(
+        target=sample_queue,
+        args=(sqs, queue_url, sample_interval, samples, stop_sampling, start),
+        daemon=True
+    )
+    for thread in threads + [sampler]:
+        thread.start()
+
+    run_producer(sqs, queue_url, keys, rate, duration, burst_size, burst_every, sent)
+    injection_seconds = time.monotonic() - start
+
+    deadline = time.monotonic() + drain_timeout
+    while sum(p.completed for p in pollers) < sent[0] and time.monotonic() < deadline:
+        time.sleep(0.2)
+
+    wall_seconds = time.monotonic() - start
+    stop_workers.set()
+    stop_sampling.set()
+    for thread in threads + [sampler]:
+        thread.join(timeout=10)
+    if server is not None:
+        server.stop()
+
+    latencies = [latency for p in pollers for latency in p.latencies]
+    completed = sum(p.completed for p in pollers)
+    # Share of each poller's message slots that was busy
+    utilization = [round(p.busy_seconds / (wall_seconds * concurrency), 3) for p in pollers]
+    run_calls = Counter(api_calls.snapshot())
+    run_calls.subtract(seed_calls)
+    depth = [s["visible"] + s["in_flight"] for s in samples]
+
+    report = {
+        "build": {
+            "revision": git_revision(),
+            "extractor_version": EXTRACTOR_VERSION,
+            "started_at": started_at,
+        },
+        "config": {
+            "endpoint_url": endpoint_url,
+            "corpus_files": len(paths),
+            "objects": objects,
+            "rate": rate,
+            "duration": duration,
+            "burst_size": burst_size,
+            "burst_every": burst_every,
+            "workers": workers,
+            "concurrency": concurrency,
+            "max_messages": max_messages,
+            "scheduled": scheduled,
+        },
+        "throughput": {
+            "sent": sent[0],
+            "completed": completed,
+            "offered_per_second": round(sent[0] / injection_seconds, 3),
+            "completed_per_second": round(completed / wall_seconds, 3),
+            "wall_seconds": round(wall_seconds, 2),
+            "drained": completed >= sent[0],
+        },
+        "latency_seconds": {
+            name: round(percentile(latencies, pct), 3)
+            for name, pct in [("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100)]
+        },
+        "queue_depth": {
+            "max": max(depth, default=0),
+            "final": depth[-1] if depth else 0,
+            "samples": samples,
+        },
+        "api_calls": {name: count for name, count in sorted(run_calls.items()) if count},
+        "workers": {
+            "utilization": utilization,
+            "mean_utilization": round(sum(utilization) / len(utilization), 3),
+        },
+    }
+
+    throughput = report["throughput"]
+    latency = report["latency_seconds"]
+    click.echo(
+        f"Sent {throughput['sent']} ({throughput['offered_per_second']}/s), "
+        f"completed {throughput['completed']} ({throughput['completed_per_second']}/s) "
+        f"in {throughput['wall_seconds']}s{'' if throughput['drained'] else ' - backlog NOT drained'}"
+    )
+    click.echo(
+        f"Latency p50 {latency['p50']}s  p95 {latency['p95']}s  p99 {latency['p99']}s  max {latency['max']}s"
+    )
+    click.echo(
+        f"Queue depth max {report['queue_depth']['max']}, "
+        f"worker utilization {report['workers']['mean_utilization']:.0%} mean"
+    )
+    click.echo("API calls: " + ", ".join(f"{name}={count}" for name, count in report["api_calls"].items()))
+
+    # Saturated when the queue kept growing: workers were busy nearly all the
+    # time and could not keep up with the offered rate.
+    if not throughput["drained"] or report["workers"]["mean_utilization"] > 0.9:
+        click.echo("Saturated: offered rate exceeds what these workers sustain")
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Report written to {report_path}")
+
+    if compare_path:
+        with open(compare_path) as f:
+            compare_reports(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
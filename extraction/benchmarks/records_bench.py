@@ -0,0 +1,93 @@
+"""
+Rate Schedule Memory Benchmark
+
+Builds a contract with a large fee-schedule exhibit both as the original
+list of per-row dicts and as RateScheduleColumns, then validates and
+serializes it. Reports peak traced memory and wall time for each path.
+
+Usage (from the extraction/ directory):
+    python benchmarks/records_bench.py --rate-lines 50000
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.contract_schema import ContractData, validate_contract  # noqa: E402
+from src.records import RateScheduleColumns, dumps_json  # noqa: E402
+
+CATEGORIES = ["INPATIENT", "OUTPATIENT", "IMAGING", "LAB", "SURGERY"]
+
+
+def contract_header() -> dict:
+    return {
+        "contract_id": "CTR-BENCH-001",
+        "payer_id": "AETNA-001",
+        "payer_name": "Aetna",
+        "provider_npi": "1234567890",
+        "provider_name": "Metro General Hospital",
+        "effective_date": "2024-01-01",
+        "termination_date": None,
+        "amendments": [],
+    }
+
+
+def row_values(i: int) -> dict:
+    return {
+        "service_category": CATEGORIES[i % len(CATEGORIES)],
+        "cpt_code": str(10000 + i % 90000),
+        "rate_type": "FEE_SCHEDULE",
+        "rate_amount": 50.0 + (i % 1000) * 1.25,
+        "effective_date": None,
+    }
+
+
+def dict_path(rate_lines: int) -> int:
+    """Original path: list of dicts, pydantic model, json.dumps."""
+    data = contract_header()
+    data["rate_schedules"] = [row_values(i) for i in range(rate_lines)]
+    ContractData(**data)
+    return len(json.dumps(data, indent=2, default=str))
+
+
+def columnar_path(rate_lines: int) -> int:
+    """Compact path: columns, column-wise validation, streamed rows."""
+    data = contract_header()
+    rates = RateScheduleColumns()
+    for i in range(rate_lines):
+        rates.append(**row_values(i))
+    data["rate_schedules"] = rates
+    validate_contract(data)
+    return len(dumps_json(data))
+
+
+def measure(func, rate_lines: int) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func(rate_lines)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+@click.command()
+@click.option("--rate-lines", default=20000, show_default=True, help="Rate lines in the contract")
+def main(rate_lines: int):
+    """Report peak memory per contract for dict and columnar rate schedules."""
+    for name, func in [("dicts", dict_path), ("columnar", columnar_path)]:
+        elapsed, peak, size = measure(func, rate_lines)
+        click.echo(
+            f"{name:<10} {elapsed * 1000:9.1f} ms  "
+            f"peak {peak / 1024 / 1024:8.2f} MiB  json {size / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Trace Summary
+
+Summarizes a span file written with TRACE_FILE (or load_test.py
+--trace-file):
+    - duration percentiles per span name, for capacity planning
+    - the slowest traces with their stages, for tail-latency debugging
+    - bytes and pages per stage where spans record them
+
+Usage (from the extraction/ directory):
+    python benchmarks/trace_summary.py traces.jsonl
+    python benchmarks/trace_summary.py traces.jsonl --root sqs.message --slowest 5
+"""
+
+import json
+from collections import defaultdict
+
+import click
+
+
+def attributes(span: dict) -> dict:
+    """OTLP attribute list as a plain dict."""
+    values = {}
+    for attribute in span.get("attributes", []):
+        (kind, value), = attribute["value"].items()
+        values[attribute["key"]] = int(value) if kind == "intValue" else value
+    return values
+
+
+def duration_ms(span: dict) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def load_spans(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_tree(span: dict, children: dict, depth: int = 0):
+    attrs = attributes(span)
+    details = ", ".join(
+        f"{name}={attrs[name]}" for name in ("key", "message_id", "tier", "pages", "bytes", "pool_wait_ms", "outcome")
+        if name in attrs
+    )
+    failed = " FAILED" if span["status"]["code"] == 2 else ""
+    click.echo(f"  {'  ' * depth}{span['name']:<{32 - 2 * depth}} {duration_ms(span):>10.1f} ms{failed}  {details}")
+    for child in sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"])):
+        print_tree(child, children, depth + 1)
+
+
+@click.command()
+@click.argument("trace_file")
+@click.option("--root", default="sqs.message", show_default=True, help="Root span name that defines one unit of work")
+@click.option("--slowest", default=3, show_default=True, help="Slowest root traces to print in full")
+def main(trace_file: str, root: str, slowest: int):
+    """Per-stage latency percentiles and the slowest traces."""
+    spans = load_spans(trace_file)
+    if not spans:
+        raise SystemExit(f"No spans in {trace_file}")
+
+    by_name = defaultdict(list)
+    bytes_by_name = defaultdict(int)
+    children = defaultdict(list)
+    for span in spans:
+        by_name[span["name"]].append(duration_ms(span))
+        bytes_by_name[span["name"]] += attributes(span).get("bytes", 0)
+        children[span["parentSpanId"]].append(span)
+
+    click.echo(f"{'span':<24} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10} {'total s':>9} {'MB':>8}")
+    for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+        click.echo(
+            f"{name:<24} {len(durations):>7} {percentile(durations, 50):>10.1f} {percentile(durations, 95):>10.1f} "
+            f"{percentile(durations, 99):>10.1f} {max(durations):>10.1f} {sum(durations) / 1000:>9.2f} "
+            f"{bytes_by_name[name] / 1e6:>8.2f}"
+        )
+
+    roots = sorted((s for s in children[""] if s["name"] == root), key=duration_ms, reverse=True)
+    for span in roots[:slowest]:
+        click.echo(f"\nTrace {span['traceId']}")
+        print_tree(span, children)
+
+
+if __name__ == "__main__":
+    main()
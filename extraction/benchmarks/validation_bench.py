@@ -0,0 +1,82 @@
+"""
+Validation Benchmark
+
+Compares the original per-document validation path (json.loads followed
+by ContractData(**data)) against the cached TypeAdapter validating
+directly from JSON bytes, for single and batch calls.
+
+Usage (from the extraction/ directory):
+    python benchmarks/validation_bench.py --count 5000
+"""
+
+import json
+import os
+import sys
+import time
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.contract_schema import ContractData, validate_contract_data, validate_contracts  # noqa: E402
+
+
+def make_documents(count: int, rate_lines: int) -> list:
+    """Build JSON documents shaped like extractor output."""
+    example = ContractData.model_config["json_schema_extra"]["example"]
+    documents = []
+    
+    for i in range(count):
+        doc = dict(example)
+        doc["contract_id"] = f"CTR-BENCH-{i:06d}"
+        doc["rate_schedules"] = [
+            dict(example["rate_schedules"][0], cpt_code=str(99000 + j))
+            for j in range(rate_lines)
+        ]
+        # Every tenth document fails validation
+        if i % 10 == 0:
+            doc["provider_npi"] = "12345"
+        documents.append(json.dumps(doc).encode("utf-8"))
+    
+    return documents
+
+
+def baseline(documents: list) -> int:
+    """Original path: parse, build model, format errors."""
+    invalid = 0
+    for raw in documents:
+        try:
+            ContractData(**json.loads(raw))
+        except Exception as e:
+            invalid += 1
+            [f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()]
+    return invalid
+
+
+def cached_single(documents: list) -> int:
+    return sum(1 for raw in documents if validate_contract_data(raw))
+
+
+def cached_batch(documents: list) -> int:
+    return sum(1 for result in validate_contracts(documents) if not result.is_valid)
+
+
+@click.command()
+@click.option("--count", default=2000, show_default=True, help="Number of documents")
+@click.option("--rate-lines", default=20, show_default=True, help="Rate lines per document")
+def main(count: int, rate_lines: int):
+    """Benchmark contract validation paths."""
+    documents = make_documents(count, rate_lines)
+    
+    for name, func in [("baseline", baseline), ("cached", cached_single), ("batch", cached_batch)]:
+        start = time.perf_counter()
+        invalid = func(documents)
+        elapsed = time.perf_counter() - start
+        click.echo(
+            f"{name:<10} {elapsed * 1000:9.1f} ms  "
+            f"{count / elapsed:10.0f} docs/s  invalid={invalid}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Local Batch Runner
+
+Runs the parser over a local directory or glob of PDFs across a process
+pool, without AWS. Output JSON is written under a local directory using
+the same partition layout as the S3 output, and a run summary reports
+throughput, latency percentiles and failures.
+
+Usage (from the extraction/ directory):
+    python -m src.batch --input ./contracts --output-dir ./out --workers 4
+"""
+
+import glob
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import click
+import structlog
+
+from . import tracing
+from .extractor import finalize_contract, generate_output_key
+from .partition_index import INDEX_KEY, IndexUpdate, LocalIndexStore, PartitionIndex, update_from_output
+
+logger = structlog.get_logger(__name__)
+
+SUMMARY_FILENAME = "_run_summary.json"
+
+# Joins the folders of a PDF below the input root into its output filename
+SUBDIR_SEPARATOR = "__"
+
+# Per-process parser and input root, set by the pool initializer
+_parser = None
+_input_root = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one PDF in a batch run."""
+
+    path: str
+    seconds: float
+    output_key: Optional[str] = None
+    error: Optional[str] = None
+    unchanged: bool = False
+    field_cache_hits: int = 0
+    field_cache_misses: int = 0
+    index_update: Optional[IndexUpdate] = None
+    parser_tier: Optional[str] = None
+    tier_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BatchSummary:
+    """Aggregate statistics for a batch run."""
+
+    total: int
+    succeeded: int
+    failed: int
+    unchanged: int
+    wall_seconds: float
+    docs_per_second: float
+    p50_seconds: float
+    p95_seconds: float
+    field_cache_hits: int = 0
+    field_cache_misses: int = 0
+    tier_counts: Dict[str, int] = field(default_factory=dict)
+    tier_seconds: Dict[str, float] = field(default_factory=dict)
+    pool_restarts: int = 0
+    failures: List[dict] = field(default_factory=list)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def find_pdfs(input_path: str) -> List[str]:
+    """Expand a directory (recursively) or glob pattern into PDF paths."""
+    if os.path.isdir(input_path):
+        pattern = os.path.join(input_path, "**", "*")
+    else:
+        pattern = input_path
+
+    return sorted(
+        path for path in glob.glob(pattern, recursive=True)
+        if os.path.isfile(path) and path.lower().endswith(".pdf")
+    )
+
+
+def input_root(input_path: str) -> str:
+    """Directory that relative output names are taken from: the input directory, or a glob's fixed prefix."""
+    root = input_path
+    while glob.has_magic(root):
+        root = os.path.dirname(root)
+    return root if os.path.isdir(root) else os.path.dirname(root)
+
+
+def output_source(pdf_path: str, root: Optional[str]) -> str:
+    """
+    Name the output key is generated from.
+
+    PDFs directly under the root keep their filename; deeper ones have
+    their folders folded in (a/contract.pdf -> a__contract.pdf), so files
+    with the same name in different folders do not share an output.
+    """
+    if root is None:
+        return pdf_path
+    return os.path.relpath(pdf_path, root).replace(os.sep, SUBDIR_SEPARATOR)
+
+
+def _init_worker(
+    parse_cache_dir: Optional[str],
+    table_structure: str,
+    escalation=None,
+    root: Optional[str] = None
+):
+    """Create the parser once per worker process (tracing follows TRACE_FILE and friends)."""
+    global _parser, _input_root
+
+    from .docling_parser import DoclingParser
+    from .parse_cache import ParseCache
+
+    tracing.configure_from_env()
+
+    parse_cache = ParseCache(parse_cache_dir) if parse_cache_dir else None
+    _parser = DoclingParser(parse_cache=parse_cache, table_structure=table_structure, escalation=escalation)
+    _input_root = root
+
+
+def _previous_fingerprint(output_path: str) -> Optional[str]:
+    """Content fingerprint of an existing output file, if any."""
+    try:
+        with open(output_path) as f:
+            return json.load(f)["extraction_metadata"].get("content_fingerprint")
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _process_one(pdf_path: str, output_dir: str) -> BatchResult:
+    """Parse one PDF and write its JSON output (runs in a worker)."""
+    with tracing.span("batch.document", path=pdf_path, bytes=os.path.getsize(pdf_path)) as document:
+        result = _process_document(pdf_path, output_dir)
+        document.set(parser_tier=result.parser_tier, unchanged=result.unchanged, error=result.error)
+    return result
+
+
+def _process_document(pdf_path: str, output_dir: str) -> BatchResult:
+    """_process_one() inside its trace span."""
+    from .records import dumps_json
+
+    start = time.perf_counter()
+    result = BatchResult(pdf_path, 0.0)
+    field_cache = _parser.field_cache
+    hits, misses = (field_cache.hits, field_cache.misses) if field_cache else (0, 0)
+
+    try:
+        extracted_data = _parser.parse_contract(pdf_path, source=pdf_path)
+        if extracted_data is None:
+            result.error = "Parser returned no data"
+            return result
+
+        finalize_contract(extracted_data, pdf_path)
+        result.parser_tier = extracted_data["extraction_metadata"].get("parser_tier")
+        result.tier_seconds = extracted_data["extraction_metadata"].get("tier_seconds") or {}
+        output_key = generate_output_key(extracted_data, output_source(pdf_path, _input_root))
+
+        output_path = os.path.join(output_dir, output_key)
+        result.output_key = output_key
+
+        if _previous_fingerprint(output_path) == extracted_data["extraction_metadata"]["content_fingerprint"]:
+            result.unchanged = True
+            return result
+
+        replaced_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else None
+        encoded = dumps_json(extracted_data).encode("utf-8")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(encoded)
+
+        result.index_update = update_from_output(output_key, extracted_data, len(encoded), replaced_bytes)
+
+        return result
+
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    finally:
+        result.seconds = time.perf_counter() - start
+        if field_cache:
+            result.field_cache_hits = field_cache.hits - hits
+            result.field_cache_misses = field_cache.misses - misses
+
+
+def _run_pool(
+    pdf_paths: List[str],
+    output_dir: str,
+    workers: int,
+    initargs: tuple
+) -> Tuple[List[BatchResult], List[Tuple[str, str]]]:
+    """
+    Run documents through one process pool.
+
+    A worker that dies (segfault, OOM kill) breaks the whole pool, failing
+    every document that had not finished with BrokenProcessPool.
+
+    Returns:
+        Tuple of (results, (path, error) for documents lost to a broken
+        pool, in submission order)
+    """
+    results: List[BatchResult] = []
+    broken: Dict[str, str] = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = {pool.submit(_process_one, path, output_dir): path for path in pdf_paths}
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                broken[path] = f"{type(e).__name__}: {e}"
+                continue
+            except Exception as e:
+                result = BatchResult(path, 0.0, error=f"{type(e).__name__}: {e}")
+            results.append(result)
+
+            if result.error:
+                logger.warning("Batch document failed", path=result.path, error=result.error)
+
+    return results, [(path, broken[path]) for path in pdf_paths if path in broken]
+
+
+def run_local_batch(
+    input_path: str,
+    output_dir: str,
+    workers: int = 1,
+    parse_cache_dir: Optional[str] = None,
+    table_structure: str = "all",
+    escalation=None
+) -> BatchSummary:
+    """
+    Process every PDF under input_path with a pool of worker processes.
+
+    Args:
+        input_path: Directory (searched recursively) or glob pattern
+        output_dir: Root directory for partitioned JSON output
+        workers: Number of worker processes
+        parse_cache_dir: Optional parse cache shared by the workers
+        table_structure: Table-structure mode ("all", "auto" or "off")
+        escalation: Optional escalation.EscalationPolicy for tiered parsing
+
+    Returns:
+        BatchSummary, also written to {output_dir}/_run_summary.json; the
+        partition index in {output_dir}/_partition_index.json is updated
+    """
+    pdf_paths = find_pdfs(input_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    logger.info("Starting local batch", input=input_path, files=len(pdf_paths), workers=workers)
+
+    initargs = (parse_cache_dir, table_structure, escalation, input_root(input_path))
+    start = time.perf_counter()
+
+    results, lost = _run_pool(pdf_paths, output_dir, workers, initargs)
+    pool_restarts = 0
+
+    # Which document killed the pool is unknown, so rerun the affected ones
+    # through a fresh single-worker pool: documents run in order there, so
+    # if it breaks again the first lost document is the one that crashed
+    while lost:
+        pool_restarts += 1
+        logger.warning("Worker process died, retrying affected documents one at a time", documents=len(lost))
+
+        retried, lost_again = _run_pool([path for path, _ in lost], output_dir, 1, initargs)
+        results.extend(retried)
+
+        if lost_again:
+            path, error = lost_again[0]
+            logger.warning("Batch document failed", path=path, error=error)
+            results.append(BatchResult(path, 0.0, error=error))
+            lost = lost_again[1:]
+        else:
+            lost = []
+
+    wall_seconds = time.perf_counter() - start
+    latencies = [r.seconds for r in results if r.error is None]
+    failures = [asdict(r) for r in results if r.error is not None]
+
+    tier_counts: Dict[str, int] = {}
+    tier_seconds: Dict[str, float] = {}
+    for result in results:
+        if result.parser_tier:
+            tier_counts[result.parser_tier] = tier_counts.get(result.parser_tier, 0) + 1
+        for tier, seconds in result.tier_seconds.items():
+            tier_seconds[tier] = round(tier_seconds.get(tier, 0.0) + seconds, 3)
+
+    summary = BatchSummary(
+        total=len(results),
+        succeeded=len(latencies),
+        failed=len(failures),
+        unchanged=sum(1 for r in results if r.unchanged),
+        wall_seconds=round(wall_seconds, 3),
+        docs_per_second=round(len(latencies) / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        p50_seconds=round(percentile(latencies, 50), 3),
+        p95_seconds=round(percentile(latencies, 95), 3),
+        field_cache_hits=sum(r.field_cache_hits for r in results),
+        field_cache_misses=sum(r.field_cache_misses for r in results),
+        tier_counts=tier_counts,
+        tier_seconds=tier_seconds,
+        pool_restarts=pool_restarts,
+        failures=failures,
+    )
+
+    index_delta = PartitionIndex()
+    for result in results:
+        if result.index_update is not None:
+            index_delta.apply(result.index_update)
+    if index_delta:
+        LocalIndexStore(os.path.join(output_dir, INDEX_KEY)).update(index_delta)
+
+    with open(os.path.join(output_dir, SUMMARY_FILENAME), "w") as f:
+        json.dump(asdict(summary), f, indent=2)
+
+    logger.info(
+        "Local batch complete",
+        total=summary.total,
+        failed=summary.failed,
+        unchanged=summary.unchanged,
+        docs_per_second=summary.docs_per_second,
+        p50_seconds=summary.p50_seconds,
+        p95_seconds=summary.p95_seconds,
+        tier_counts=summary.tier_counts,
+        pool_restarts=summary.pool_restarts
+    )
+    return summary
+
+
+@click.command()
+@click.option(
+    "--input",
+    "input_path",
+    required=True,
+    help="Directory of PDFs (searched recursively) or a glob pattern"
+)
+@click.option(
+    "--output-dir",
+    required=True,
+    help="Directory for partitioned JSON output and the run summary"
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Number of worker processes"
+)
+@click.option(
+    "--parse-cache-dir",
+    envvar="PARSE_CACHE_DIR",
+    default=None,
+    help="Directory for cached conversion intermediates"
+)
+@click.option(
+    "--table-structure",
+    envvar="TABLE_STRUCTURE",
+    type=click.Choice(["all", "auto", "off"]),
+    default="all",
+    show_default=True,
+    help="Pages that get table-structure recognition"
+)
+@click.option(
+    "--tiers",
+    envvar="PARSER_TIERS",
+    default=None,
+    help="Comma-separated parser tiers to escalate through, cheapest first (pypdf,docling,docling-ocr)"
+)
+@click.option(
+    "--min-confidence",
+    envvar="MIN_CONFIDENCE",
+    type=float,
+    default=0.8,
+    show_default=True,
+    help="Escalate to the next parser tier below this confidence score"
+)
+@click.option(
+    "--required-fields",
+    envvar="REQUIRED_FIELDS",
+    default="provider_npi,effective_date",
+    show_default=True,
+    help="Escalate to the next parser tier while any of these fields is missing"
+)
+def main(
+    input_path: str,
+    output_dir: str,
+    workers: int,
+    parse_cache_dir: str,
+    table_structure: str,
+    tiers: str,
+    min_confidence: float,
+    required_fields: str
+):
+    """Extract contracts from local PDFs without AWS."""
+    from .escalation import EscalationPolicy
+
+    try:
+        escalation = EscalationPolicy.from_options(tiers, min_confidence, required_fields)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint=["--tiers", "--min-confidence", "--required-fields"])
+    summary = run_local_batch(input_path, output_dir, workers, parse_cache_dir, table_structure, escalation)
+
+    click.echo(
+        f"Processed {summary.total} PDFs ({summary.failed} failed, {summary.unchanged} unchanged) in {summary.wall_seconds:.1f}s: "
+        f"{summary.docs_per_second:.2f} docs/s, p50 {summary.p50_seconds:.2f}s, p95 {summary.p95_seconds:.2f}s"
+    )
+
+    if summary.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,30 @@ Pydantic models and JSON Schema validation for
 extracted contract data.
 """
 
+from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import List, Optional, Tuple, Any
-from pydantic import BaseModel, Field, field_validator
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Union
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
 import json
+import re
+
+from .records import ColumnarRecords
+
+# Fast path for the canonical YYYY-MM-DD form; anything else goes through strptime
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _check_iso_date(v: str) -> str:
+    """Reject dates not in YYYY-MM-DD format."""
+    try:
+        if ISO_DATE_RE.fullmatch(v):
+            date.fromisoformat(v)
+        else:
+            datetime.strptime(v, '%Y-%m-%d')
+        return v
+    except ValueError:
+        raise ValueError('Date must be in YYYY-MM-DD format')
 
 
 class RateSchedule(BaseModel):
@@ -56,6 +76,9 @@ class ExtractionMetadata(BaseModel):
     confidence_score: float = Field(ge=0, le=1)
     source_file: str
     extractor_version: Optional[str] = "1.0.0"
+    content_fingerprint: Optional[str] = None
+    parser_tier: Optional[str] = None
+    tier_seconds: Optional[Dict[str, float]] = None
 
 
 class ContractData(BaseModel):
@@ -97,11 +120,7 @@ class ContractData(BaseModel):
     def validate_date_format(cls, v):
         if v is None:
             return v
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError('Date must be in YYYY-MM-DD format')
+        return _check_iso_date(v)
     
     class Config:
         json_schema_extra = {
@@ -132,33 +151,112 @@ class ContractData(BaseModel):
         }
 
 
-def validate_contract(data: dict) -> Tuple[bool, List[str]]:
+@dataclass(frozen=True)
+class ValidationErrorRecord:
+    """A single schema violation."""
+    
+    field: str
+    message: str
+    error_type: str
+    
+    def __str__(self) -> str:
+        return f"{self.field}: {self.message}"
+
+
+@dataclass
+class ContractValidationResult:
+    """Validation outcome for one contract in a batch."""
+    
+    index: int
+    is_valid: bool
+    errors: List[ValidationErrorRecord] = field(default_factory=list)
+
+
+@lru_cache(maxsize=1)
+def get_contract_adapter() -> TypeAdapter:
+    """Build the ContractData validator once per process."""
+    return TypeAdapter(ContractData)
+
+
+def _error_records(exc: ValidationError) -> List[ValidationErrorRecord]:
+    """Convert a pydantic ValidationError to structured records."""
+    return [
+        ValidationErrorRecord(
+            field='.'.join(str(x) for x in error['loc']),
+            message=error['msg'],
+            error_type=error['type'],
+        )
+        for error in exc.errors(include_url=False, include_input=False)
+    ]
+
+
+def validate_contract_data(data: Union[dict, bytes, str]) -> List[ValidationErrorRecord]:
     """
-    Validate contract data against schema.
+    Validate one contract with the cached validator.
     
     Args:
-        data: Contract data dictionary
+        data: Contract data dictionary, or raw JSON bytes/str which are
+            validated directly without building an intermediate dict.
+            Columnar record fields are checked column-wise.
         
     Returns:
-        Tuple of (is_valid, list of error messages)
+        List of validation errors (empty if valid)
     """
-    errors = []
+    adapter = get_contract_adapter()
+    tables = {}
+    
+    if not isinstance(data, (bytes, str)):
+        tables = {k: v for k, v in data.items() if isinstance(v, ColumnarRecords)}
+        if tables:
+            data = {k: v for k, v in data.items() if k not in tables}
     
     try:
-        ContractData(**data)
-        return True, []
-        
-    except Exception as e:
-        # Parse Pydantic validation errors
-        if hasattr(e, 'errors'):
-            for error in e.errors():
-                field = '.'.join(str(x) for x in error['loc'])
-                message = error['msg']
-                errors.append(f"{field}: {message}")
+        if isinstance(data, (bytes, str)):
+            adapter.validate_json(data)
         else:
-            errors.append(str(e))
+            adapter.validate_python(data)
+        errors = []
         
-        return False, errors
+    except ValidationError as e:
+        errors = _error_records(e)
+    
+    for name, table in tables.items():
+        errors.extend(ValidationErrorRecord(*error) for error in table.validate(name))
+    
+    return errors
+
+
+def validate_contracts(items: Iterable[Union[dict, bytes, str]]) -> List[ContractValidationResult]:
+    """
+    Validate many contracts in one call.
+    
+    Args:
+        items: Contract dictionaries or raw JSON documents
+        
+    Returns:
+        One result per input, in input order
+    """
+    results = []
+    
+    for index, item in enumerate(items):
+        errors = validate_contract_data(item)
+        results.append(ContractValidationResult(index, not errors, errors))
+    
+    return results
+
+
+def validate_contract(data: dict) -> Tuple[bool, List[str]]:
+    """
+    Validate contract data against schema.
+    
+    Args:
+        data: Contract data dictionary
+        
+    Returns:
+        Tuple of (is_valid, list of error messages)
+    """
+    errors = validate_contract_data(data)
+    return not errors, [str(error) for error in errors]
 
 
 def get_json_schema() -> dict:
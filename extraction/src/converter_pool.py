@@ -0,0 +1,170 @@
+"""
+Converter Pool
+
+Docling's DocumentConverter holds large layout, table and OCR models and
+is not safe to share between threads. The pool keeps up to `size` warm
+converters per pipeline configuration and hands each one to a single
+borrower at a time, so one process can convert several documents
+concurrently without rebuilding models for every document.
+
+Converters are recycled after `max_uses` conversions to bound the memory
+growth seen in long-running converters. Wait times are tracked so an
+undersized pool shows up in the metrics.
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class _PooledConverter:
+    __slots__ = ("converter", "uses")
+
+    def __init__(self, converter: Any):
+        self.converter = converter
+        self.uses = 0
+
+
+class ConverterPool:
+    """
+    Bounded pool of converters with checkout/return semantics.
+
+    Args:
+        factory: Builds a new converter; called lazily, at most `size`
+            converters are alive at once
+        size: Maximum concurrent borrowers (and live converters)
+        max_uses: Discard a converter after this many borrows; None keeps
+            converters for the life of the process
+        name: Label used in logs
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 1,
+        max_uses: Optional[int] = None,
+        name: str = "converter"
+    ):
+        if size < 1:
+            raise ValueError("Converter pool size must be at least 1")
+
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.name = name
+
+        self._idle: List[_PooledConverter] = []
+        self._live = 0
+        self._condition = threading.Condition()
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.created = 0
+        self.recycled = 0
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Check out a converter for the duration of a with-block.
+
+        Args:
+            timeout: Seconds to wait for a free converter (None waits forever)
+
+        Raises:
+            TimeoutError: if no converter became free in time
+        """
+        entry = self._checkout(timeout)
+        try:
+            yield entry.converter
+        finally:
+            self._checkin(entry)
+
+    def _checkout(self, timeout: Optional[float]) -> _PooledConverter:
+        start = time.perf_counter()
+        waited = False
+
+        with self._condition:
+            while not self._idle and self._live >= self.size:
+                waited = True
+                remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No {self.name} free after {timeout}s (pool size {self.size})")
+                self._condition.wait(remaining)
+
+            # Most recently returned first, so idle converters stay warm
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._live += 1
+
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.waits += waited
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+        if entry is not None:
+            return entry
+
+        # Build outside the lock; other borrowers can proceed meanwhile
+        try:
+            entry = _PooledConverter(self.factory())
+        except BaseException:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.created += 1
+        logger.info("Converter created", pool=self.name, live=self._live, size=self.size)
+        return entry
+
+    def _checkin(self, entry: _PooledConverter):
+        entry.uses += 1
+        recycle = self.max_uses is not None and entry.uses >= self.max_uses
+
+        with self._condition:
+            if recycle:
+                self._live -= 1
+                self.recycled += 1
+            else:
+                self._idle.append(entry)
+            self._condition.notify()
+
+        if recycle:
+            logger.info("Recycling converter", pool=self.name, uses=entry.uses)
+            entry.converter = None
+            gc.collect()
+
+    def stats(self) -> Dict[str, float]:
+        """Checkout and wait counters for metrics."""
+        with self._condition:
+            return {
+                "converter_pool_checkouts": self.checkouts,
+                "converter_pool_waits": self.waits,
+                "converter_pool_wait_seconds": round(self.wait_seconds, 3),
+                "converter_pool_max_wait_seconds": round(self.max_wait_seconds, 3),
+                "converter_pool_created": self.created,
+                "converter_pool_recycled": self.recycled,
+                "converter_pool_live": self._live,
+            }
+
+
+def merge_stats(pools: List[ConverterPool]) -> Dict[str, float]:
+    """Combined counters for several pools (one per pipeline configuration)."""
+    merged: Dict[str, float] = {}
+    for pool in pools:
+        for name, value in pool.stats().items():
+            if name == "converter_pool_max_wait_seconds":
+                merged[name] = max(merged.get(name, 0.0), value)
+            else:
+                merged[name] = round(merged.get(name, 0) + value, 3)
+    return merged
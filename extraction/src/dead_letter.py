@@ -0,0 +1,275 @@
+"""
+Dead-Letter Handling
+
+Records messages that failed too many times (or can never succeed) so
+they stop consuming worker time, and replays them in bulk once the
+underlying problem is fixed.
+
+Failed messages go to an SQS dead-letter queue, a local JSON Lines
+failure store, or both.
+
+Usage (from the extraction/ directory):
+    python -m src.dead_letter replay --failure-file failures.jsonl --queue-url $SQS_QUEUE_URL
+    python -m src.dead_letter replay --dlq-url $SQS_DLQ_URL --queue-url $SQS_QUEUE_URL
+"""
+
+import glob
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import click
+import structlog
+
+# File locking keeps appends from other processes out of a claimed store;
+# unavailable on Windows
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+# SQS batch APIs accept at most 10 entries
+SQS_BATCH_SIZE = 10
+
+
+class FailureStore:
+    """
+    Append-only JSON Lines store of dead-lettered messages.
+
+    Each record holds the original message body plus the failure reason,
+    receive count and time of failure.
+
+    A replay first claims the store by renaming it to a unique
+    <path>.replay-<stamp>-<pid> file, so records appended while it runs
+    land in a fresh store instead of being lost when the replay finishes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by appenders and claim() across processes."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock, open(self.path + ".lock", "w") as lock:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def add(self, record: dict):
+        """Append a failure record."""
+        with self._file_lock():
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def iter_records(self, path: Optional[str] = None) -> Iterator[dict]:
+        """Yield every record in the store (or in a claimed replay file)."""
+        path = path or self.path
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def claim(self) -> List[str]:
+        """
+        Move the current records aside for replay.
+
+        Returns:
+            Replay files to process: the one just claimed (if the store had
+            records) and any left by earlier replays that did not finish
+        """
+        with self._file_lock():
+            if os.path.exists(self.path):
+                stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+                os.replace(self.path, f"{self.path}.replay-{stamp}-{os.getpid()}")
+
+        return sorted(glob.glob(glob.escape(self.path) + ".replay-*"))
+
+    def retain(self, replay_path: str, records: List[dict]):
+        """Keep only the given records in a replay file (removing it when none are left)."""
+        if not records:
+            os.remove(replay_path)
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(replay_path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, replay_path)
+
+
+def failure_record(message: dict, reason: str, receive_count: int, keys: Optional[List[str]] = None) -> dict:
+    """Build the record stored for a dead-lettered SQS message."""
+    return {
+        "message_id": message.get("MessageId"),
+        "body": message.get("Body"),
+        "reason": reason,
+        "receive_count": receive_count,
+        "keys": keys or [],
+        "failed_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def unsent_bodies(sqs_client, queue_url: str, bodies: List[str]) -> List[int]:
+    """
+    Send message bodies to a queue in batches of 10.
+
+    Returns:
+        Indexes of the bodies SQS did not accept (a batch whose request
+        raised counts as unsent)
+    """
+    unsent = []
+
+    for start in range(0, len(bodies), SQS_BATCH_SIZE):
+        chunk = bodies[start:start + SQS_BATCH_SIZE]
+        try:
+            response = sqs_client.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[{"Id": str(i), "MessageBody": body} for i, body in enumerate(chunk)]
+            )
+        except Exception as e:
+            logger.error("Replay send failed", queue_url=queue_url, error=str(e), batch=len(chunk))
+            unsent.extend(range(start, start + len(chunk)))
+            continue
+
+        for failed in response.get("Failed", []):
+            logger.error("Replay send failed", queue_url=queue_url, error=failed.get("Message"))
+            unsent.append(start + int(failed["Id"]))
+
+    return unsent
+
+
+def send_bodies(sqs_client, queue_url: str, bodies: List[str]) -> int:
+    """
+    Send message bodies to a queue in batches of 10.
+
+    Returns:
+        Number of messages accepted by SQS
+    """
+    return len(bodies) - len(unsent_bodies(sqs_client, queue_url, bodies))
+
+
+def replay_failure_store(sqs_client, store: FailureStore, queue_url: str) -> int:
+    """
+    Re-enqueue every stored failure.
+
+    The store is claimed (renamed) first, so failures recorded during the
+    replay stay for the next one. A replay file is deleted once all of its
+    records were sent; otherwise it keeps only the unsent records, which
+    the next replay picks up.
+    """
+    sent = 0
+    total = 0
+
+    for replay_path in store.claim():
+        records = [record for record in store.iter_records(replay_path) if record.get("body")]
+        unsent = unsent_bodies(sqs_client, queue_url, [record["body"] for record in records])
+        store.retain(replay_path, [records[i] for i in unsent])
+
+        sent += len(records) - len(unsent)
+        total += len(records)
+        if unsent:
+            logger.warning("Replay file kept for retry", path=replay_path, unsent=len(unsent))
+
+    logger.info("Replayed failure store", path=store.path, sent=sent, total=total)
+    return sent
+
+
+def replay_dlq(sqs_client, dlq_url: str, queue_url: str, max_messages: Optional[int] = None) -> int:
+    """
+    Move messages from a dead-letter queue back to the work queue.
+
+    Each batch is deleted from the DLQ only after it was re-sent.
+    """
+    moved = 0
+
+    while max_messages is None or moved < max_messages:
+        response = sqs_client.receive_message(
+            QueueUrl=dlq_url,
+            MaxNumberOfMessages=SQS_BATCH_SIZE,
+            WaitTimeSeconds=1
+        )
+        messages = response.get("Messages", [])
+        if not messages:
+            break
+
+        sent = send_bodies(sqs_client, queue_url, [m["Body"] for m in messages])
+        if sent != len(messages):
+            logger.error("Stopping DLQ replay after partial send", sent=sent, batch=len(messages))
+            break
+
+        sqs_client.delete_message_batch(
+            QueueUrl=dlq_url,
+            Entries=[
+                {"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]}
+                for i, m in enumerate(messages)
+            ]
+        )
+        moved += sent
+
+    logger.info("Replayed dead-letter queue", dlq_url=dlq_url, moved=moved)
+    return moved
+
+
+@click.group()
+def cli():
+    """Dead-letter inspection and replay."""
+
+
+@cli.command()
+@click.option("--queue-url", envvar="SQS_QUEUE_URL", required=True, help="Work queue to replay into")
+@click.option("--dlq-url", envvar="SQS_DLQ_URL", default=None, help="Dead-letter queue to drain")
+@click.option("--failure-file", envvar="FAILURE_FILE", default=None, help="Local failure store to replay")
+@click.option(
+    "--quarantine-file",
+    envvar="QUARANTINE_FILE",
+    default=None,
+    help="Clear this quarantine list before replaying"
+)
+@click.option("--aws-region", envvar="AWS_REGION", default="us-east-2", help="AWS region")
+def replay(queue_url: str, dlq_url: str, failure_file: str, quarantine_file: str, aws_region: str):
+    """Re-enqueue failed messages after a fix."""
+    if not dlq_url and not failure_file:
+        click.echo("Specify --dlq-url and/or --failure-file", err=True)
+        raise SystemExit(1)
+
+    import boto3
+    sqs_client = boto3.client("sqs", region_name=aws_region)
+
+    if quarantine_file and os.path.exists(quarantine_file):
+        # Quarantined keys would otherwise be skipped again on replay
+        os.remove(quarantine_file)
+        click.echo(f"Cleared quarantine list {quarantine_file}")
+
+    total = 0
+    if failure_file:
+        total += replay_failure_store(sqs_client, FailureStore(failure_file), queue_url)
+    if dlq_url:
+        total += replay_dlq(sqs_client, dlq_url, queue_url)
+
+    click.echo(f"Replayed {total} messages")
+
+
+@cli.command("list")
+@click.option("--failure-file", envvar="FAILURE_FILE", required=True, help="Local failure store")
+def list_failures(failure_file: str):
+    """Show stored failures."""
+    for record in FailureStore(failure_file).iter_records():
+        click.echo(
+            f"{record['failed_at']}  receives={record['receive_count']}  "
+            f"{','.join(record['keys']) or record['message_id']}  {record['reason']}"
+        )
+
+
+if __name__ == "__main__":
+    cli()
@@ -5,22 +5,105 @@ Uses Docling for AI-powered document understanding
 to extract structured contract data from PDFs.
 """
 
+import os
 import re
+import threading
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from importlib.util import find_spec
+from typing import Optional, Callable, Dict, Any, List
 from pathlib import Path
 
 import structlog
 
-# Docling imports (with fallback for environments without it)
-try:
+from . import tracing
+from .converter_pool import ConverterPool, merge_stats
+from .escalation import (
+    CONFIDENCE_WEIGHTS,
+    TIER_DOCLING,
+    TIER_DOCLING_OCR,
+    TIER_PYPDF,
+    EscalationPolicy,
+    pick_best,
+)
+from .field_cache import FieldCache, get_field_cache, stage_key
+from .parse_cache import ParseCache
+from .records import AmendmentColumns, RateScheduleColumns
+from .reference_index import ReferenceIndex, get_reference_index
+from .table_selection import (
+    TABLE_STRUCTURE_ALL,
+    TABLE_STRUCTURE_AUTO,
+    TABLE_STRUCTURE_MODES,
+    find_rate_pages,
+    is_rate_table,
+    open_pdf,
+    page_looks_like_rates,
+    page_may_hold_rates,
+    page_runs,
+    write_page_subset,
+)
+
+# Docling pulls in torch and its model stack, so only check that it is
+# installed here and defer the real import until a converter is needed.
+DOCLING_AVAILABLE = find_spec("docling") is not None
+
+logger = structlog.get_logger(__name__)
+
+# Bump when the regexes or rules in the text extraction stages change, so
+# cached field results from older rules are not reused.
+EXTRACTION_RULESET_VERSION = 4
+
+AMENDMENT_DESCRIPTION_LIMIT = 500
+
+_EFFECTIVE_DATE = re.compile(r"effective[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})", re.IGNORECASE)
+_AMENDMENT_MENTION = re.compile(r"amendment", re.IGNORECASE)
+
+# Numbered amendment header, e.g. "Amendment No. 3:". Only a mention at
+# the start of a line or followed by a colon is a header; "as changed by
+# Amendment 2 below" is a cross-reference. The optional marker carries its
+# own trailing whitespace, so a long whitespace run after an unnumbered
+# mention backtracks linearly instead of quadratically.
+_AMENDMENT_HEADER = re.compile(
+    r"^[ \t]*amendment\s*(?:(?:#|No\.?)\s*)?(\d+)[:\s]*"
+    r"|amendment\s*(?:(?:#|No\.?)\s*)?(\d+)[ \t]*:[:\s]*",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def _create_converter(do_table_structure: bool = True, do_ocr: bool = True):
+    """Import Docling and build a DocumentConverter."""
     from docling.document_converter import DocumentConverter
+    
+    if do_table_structure and do_ocr:
+        return DocumentConverter()
+    
     from docling.datamodel.base_models import InputFormat
-    DOCLING_AVAILABLE = True
-except ImportError:
-    DOCLING_AVAILABLE = False
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import PdfFormatOption
+    
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_table_structure = do_table_structure
+    pipeline_options.do_ocr = do_ocr
+    
+    return DocumentConverter(
+        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+    )
 
-logger = structlog.get_logger(__name__)
+
+def _default_tier() -> str:
+    """Tier used without a tiered policy: full Docling when installed, otherwise pypdf."""
+    return TIER_DOCLING_OCR if DOCLING_AVAILABLE else TIER_PYPDF
+
+
+def _tier_converter(tier: str) -> str:
+    """Converter (and parse cache converter name) that runs a tier."""
+    return "pypdf" if tier == TIER_PYPDF else "docling"
+
+
+def _item_page(item) -> Optional[int]:
+    """1-based page number of a Docling document item, if recorded."""
+    prov = getattr(item, "prov", None)
+    return getattr(prov[0], "page_no", None) if prov else None
 
 
 class DoclingParser:
@@ -34,20 +117,107 @@ class DoclingParser:
     - Entity recognition
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        reference_index: Optional[ReferenceIndex] = None,
+        parse_cache: Optional[ParseCache] = None,
+        table_structure: str = TABLE_STRUCTURE_ALL,
+        field_cache: Optional[FieldCache] = None,
+        escalation: Optional[EscalationPolicy] = None,
+        converter_pool_size: int = 1,
+        converter_max_uses: Optional[int] = None
+    ):
+        """
+        Args:
+            reference_index: Payer reference index (defaults to the
+                per-process index loaded from the dbt seeds)
+            parse_cache: Store for conversion intermediates; when set,
+                unchanged PDFs skip conversion
+            table_structure: "all" runs table-structure recognition on
+                every page, "auto" only on pages that look like rate
+                tables, "off" skips it
+            field_cache: Memo of text extraction stages (defaults to the
+                per-process cache configured by FIELD_CACHE_SIZE and
+                FIELD_CACHE_DIR)
+            escalation: Tiered parsing policy; when set, cheaper parsers
+                run first and heavier ones only when the result falls
+                short (see escalation.py)
+            converter_pool_size: Docling converters kept per pipeline
+                configuration; this many documents can be converted
+                concurrently by threads sharing the parser
+            converter_max_uses: Rebuild a converter after this many
+                conversions to bound memory growth (None never rebuilds)
+        """
+        if table_structure not in TABLE_STRUCTURE_MODES:
+            raise ValueError(f"Unknown table_structure mode: {table_structure}")
+        
+        self._pools: Dict[tuple, ConverterPool] = {}
+        self._pools_lock = threading.Lock()
+        self.converter_pool_size = converter_pool_size
+        self.converter_max_uses = converter_max_uses
+        self._reference_index = reference_index
+        self.parse_cache = parse_cache
+        self.table_structure = table_structure
+        self.field_cache = field_cache if field_cache is not None else get_field_cache()
+        self.escalation = escalation
+        
         if DOCLING_AVAILABLE:
-            self.converter = DocumentConverter()
             logger.info("Docling parser initialized")
         else:
-            self.converter = None
             logger.warning("Docling not available, using fallback parser")
     
-    def parse_contract(self, pdf_path: str) -> Optional[Dict[str, Any]]:
+    def _converter_pool(self, do_table_structure: bool, do_ocr: bool = True) -> ConverterPool:
+        """Pool of Docling converters for a pipeline configuration, created on first use."""
+        options = (do_table_structure, do_ocr)
+        
+        with self._pools_lock:
+            if options not in self._pools:
+                self._pools[options] = ConverterPool(
+                    lambda: _create_converter(do_table_structure, do_ocr),
+                    size=self.converter_pool_size,
+                    max_uses=self.converter_max_uses,
+                    name=f"docling(tables={do_table_structure},ocr={do_ocr})"
+                )
+            return self._pools[options]
+    
+    def warm_up(self):
+        """
+        Build the Docling converters for the configured tiers and load
+        their models now rather than on the first document.
+        
+        Lets a supervised worker report ready only once a document can
+        actually be converted, so a broken model install or an OOM at
+        load time surfaces before any document is handed over.
+        """
+        if not DOCLING_AVAILABLE:
+            return
+        
+        from docling.datamodel.base_models import InputFormat
+        
+        # Whole-document conversion, plus the page-subset table pass in auto mode
+        table_passes = [self.table_structure == TABLE_STRUCTURE_ALL]
+        if self.table_structure == TABLE_STRUCTURE_AUTO:
+            table_passes.append(True)
+        
+        tiers = self.escalation.available_tiers(DOCLING_AVAILABLE) if self.escalation else (TIER_DOCLING_OCR,)
+        for tier in tiers:
+            if tier == TIER_PYPDF:
+                continue
+            for do_table_structure in table_passes:
+                pool = self._converter_pool(do_table_structure, do_ocr=tier == TIER_DOCLING_OCR)
+                with pool.borrow() as converter:
+                    converter.initialize_pipeline(InputFormat.PDF)
+        
+        logger.info("Docling converters warmed up", tiers=list(tiers), table_structure=self.table_structure)
+    
+    def parse_contract(self, pdf_path: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Parse a contract PDF and extract structured data.
         
         Args:
             pdf_path: Path to the PDF file
+            source: Original location of the PDF (e.g. S3 key), recorded
+                with the cached intermediate for later re-extraction
             
         Returns:
             Extracted contract data as dictionary
@@ -55,44 +225,328 @@ class DoclingParser:
         logger.info("Parsing contract PDF", path=pdf_path)
         
         try:
-            if DOCLING_AVAILABLE:
-                return self._parse_with_docling(pdf_path)
-            else:
-                return self._parse_fallback(pdf_path)
+            if self.escalation is not None:
+                return self._parse_tiered(pdf_path, lambda tier: self.convert(pdf_path, source, tier=tier))
+            
+            intermediate = self.convert(pdf_path, source)
+            if intermediate is None:
+                return None
+            return self.extract_from_intermediate(intermediate)
                 
         except Exception as e:
             logger.exception("Error parsing PDF", path=pdf_path, error=str(e))
             return None
     
-    def _parse_with_docling(self, pdf_path: str) -> Dict[str, Any]:
-        """Parse using Docling document converter."""
+    def _parse_tiered(
+        self,
+        pdf_path: str,
+        convert_tier: Callable[[str], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Parse with escalating tiers, stopping at the first accepted result.
         
-        # Convert PDF to structured document
-        result = self.converter.convert(pdf_path)
-        doc = result.document
+        Args:
+            pdf_path: PDF (or cached digest) being parsed, for logging
+            convert_tier: Returns the intermediate for a tier, or None
+        """
+        results = []
+        tier_seconds = {}
+        
+        tiers = self.escalation.available_tiers(DOCLING_AVAILABLE)
+        
+        for position, tier in enumerate(tiers, start=1):
+            start = time.perf_counter()
+            with tracing.span("parser.tier", tier=tier) as tier_span:
+                intermediate = convert_tier(tier)
+                contract_data = self.extract_from_intermediate(intermediate) if intermediate is not None else None
+                reasons = self.escalation.escalation_reasons(contract_data) if contract_data is not None else None
+                tier_span.set(
+                    confidence=contract_data["_confidence"] if contract_data is not None else None,
+                    escalation_reasons=",".join(reasons) if reasons else None
+                )
+            tier_seconds[tier] = round(time.perf_counter() - start, 4)
+            
+            if contract_data is None:
+                continue
+            results.append(contract_data)
+            
+            if not reasons or position == len(tiers):
+                break
+            logger.info(
+                "Escalating parser tier",
+                path=pdf_path,
+                tier=tier,
+                confidence=contract_data["_confidence"],
+                reasons=reasons
+            )
+        
+        best = pick_best(results)
+        if best is None:
+            return None
+        
+        best["_tier_seconds"] = tier_seconds
+        logger.info(
+            "Tiered parse complete",
+            path=pdf_path,
+            tier=best["_tier"],
+            confidence=best["_confidence"],
+            tiers_run=len(tier_seconds),
+            seconds=round(sum(tier_seconds.values()), 3)
+        )
+        return best
+    
+    def convert(
+        self,
+        pdf_path: str,
+        source: Optional[str] = None,
+        tier: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run the expensive conversion stage, reusing the parse cache if configured.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            source: Original location of the PDF, recorded with the intermediate
+            tier: Parser tier to run; defaults to full Docling when installed,
+                otherwise pypdf
         
-        # Extract text content
-        full_text = doc.export_to_markdown()
+        Returns:
+            Intermediate dict with converter, tier, text and tables
+        """
+        tier = tier or _default_tier()
+        converter = _tier_converter(tier)
+        
+        with tracing.span("convert", tier=tier, converter=converter, pdf_bytes=os.path.getsize(pdf_path)) as stage:
+            intermediate = self._convert_cached(pdf_path, source, tier, converter)
+            if intermediate is not None:
+                stage.set(
+                    pages=intermediate.get("pages"),
+                    text_chars=len(intermediate["text"]),
+                    tables=len(intermediate["tables"])
+                )
+        return intermediate
+    
+    def _cache_variant(self, tier: str) -> Optional[str]:
+        """Parse cache variant for a tier under the configured pipeline."""
+        # Intermediates from reduced pipelines must not satisfy the full one
+        variants = []
+        if tier != TIER_PYPDF and self.table_structure != TABLE_STRUCTURE_ALL:
+            variants.append(f"tables-{self.table_structure}")
+        if tier == TIER_DOCLING:
+            variants.append("no-ocr")
+        return "-".join(variants) or None
+    
+    def _convert_cached(
+        self,
+        pdf_path: str,
+        source: Optional[str],
+        tier: str,
+        converter: str
+    ) -> Optional[Dict[str, Any]]:
+        """convert() for a resolved tier, through the parse cache."""
+        cache_key = None
+        
+        if self.parse_cache is not None:
+            cache_key = self.parse_cache.key_for(pdf_path, converter, self._cache_variant(tier))
+            cached = self.parse_cache.get(cache_key)
+            tracing.current_span().set(cache_hit=cached is not None)
+            if cached is not None:
+                logger.info("Parse cache hit", path=pdf_path, key=cache_key)
+                # The same bytes under another key still need their own output on re-extraction
+                return self.parse_cache.add_source(cache_key, cached, source or pdf_path)
+        
+        if converter == "docling":
+            intermediate = self._convert_with_docling(pdf_path, do_ocr=tier == TIER_DOCLING_OCR)
+        else:
+            intermediate = self._convert_fallback(pdf_path)
         
-        # Extract tables
-        tables = self._extract_tables(doc)
+        if intermediate is None:
+            return None
         
-        # Parse contract fields from text
-        contract_data = self._extract_contract_fields(full_text)
+        intermediate["tier"] = tier
+        intermediate["source"] = source or pdf_path
+        intermediate["sources"] = [source or pdf_path]
         
-        # Extract rate schedules from tables
-        contract_data["rate_schedules"] = self._extract_rate_schedules(tables)
+        if cache_key is not None:
+            self.parse_cache.put(cache_key, intermediate)
         
-        # Extract amendments
-        contract_data["amendments"] = self._extract_amendments(full_text)
+        return intermediate
+    
+    def extract_cached(self, digest: str, entries: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Re-run the extraction stages over one PDF's parse cache entries.
+        
+        Only the entries this configuration would read are used (installed
+        converter versions, current table-structure and OCR variants);
+        entries left behind by older versions or other pipelines are
+        ignored. With tiered parsing the cached tiers are replayed in
+        order, so the same tier is accepted as in a fresh parse.
+        
+        Args:
+            digest: SHA-256 of the PDF bytes
+            entries: The PDF's cache entries by key (see
+                ParseCache.iter_documents)
+            
+        Returns:
+            Extracted contract data, or None if no current entry is cached
+        """
+        def cached_tier(tier: str) -> Optional[Dict[str, Any]]:
+            key = ParseCache.key_for_digest(digest, _tier_converter(tier), self._cache_variant(tier))
+            return entries.get(key)
+        
+        if self.escalation is not None:
+            return self._parse_tiered(digest, cached_tier)
         
-        # Calculate confidence score
-        contract_data["_confidence"] = self._calculate_confidence(contract_data)
+        intermediate = cached_tier(_default_tier())
+        return self.extract_from_intermediate(intermediate) if intermediate is not None else None
+    
+    def extract_from_intermediate(self, intermediate: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the cheap extraction stages over a conversion intermediate.
+        
+        Args:
+            intermediate: Output of convert() or a parse cache entry
+            
+        Returns:
+            Extracted contract data as dictionary
+        """
+        with tracing.span("extract_fields", converter=intermediate["converter"]):
+            return self._extract_fields(intermediate)
+    
+    def _extract_fields(self, intermediate: Dict[str, Any]) -> Dict[str, Any]:
+        """extract_from_intermediate() inside its trace span."""
+        full_text = intermediate["text"]
+        
+        # Parse contract fields from text
+        contract_data = self._cached_contract_fields(full_text)
+        
+        if intermediate["converter"] == "docling":
+            # Extract rate schedules from tables
+            contract_data["rate_schedules"] = self._extract_rate_schedules(intermediate["tables"])
+            
+            # Extract amendments
+            contract_data["amendments"] = self._cached_amendments(full_text)
+            
+            # Calculate confidence score
+            contract_data["_confidence"] = self._calculate_confidence(contract_data)
+        else:
+            # Basic rate schedule extraction (limited without table detection)
+            contract_data["rate_schedules"] = RateScheduleColumns()
+            
+            # Amendments come from the text alone
+            contract_data["amendments"] = self._cached_amendments(full_text)
+            
+            # Pages whose rate tables this tier could not read; tiered parsing
+            # escalates on them (older cache entries only carry the text)
+            rate_pages = intermediate.get("rate_pages")
+            if rate_pages is None:
+                rate_pages = [1] if page_looks_like_rates(full_text) else []
+            contract_data["_rate_pages"] = rate_pages
+            
+            # Lower confidence for the fallback parser; tiered parsing judges
+            # it on the fields it found, like the other tiers
+            contract_data["_confidence"] = self._calculate_confidence(contract_data)
+            if self.escalation is None:
+                contract_data["_confidence"] *= 0.7
+        
+        # Older cached intermediates predate tiers and were converted by the default pipeline
+        contract_data["_tier"] = intermediate.get(
+            "tier", TIER_DOCLING_OCR if intermediate["converter"] == "docling" else TIER_PYPDF
+        )
         
         return contract_data
     
-    def _parse_fallback(self, pdf_path: str) -> Dict[str, Any]:
-        """Fallback parser using pypdf when Docling is unavailable."""
+    def _convert_with_docling(self, pdf_path: str, do_ocr: bool = True) -> Dict[str, Any]:
+        """Convert using Docling document converter."""
+        
+        # Convert PDF to structured document (timed once a converter is free)
+        with tracing.span("docling.convert", ocr=do_ocr, table_structure=self.table_structure) as call:
+            requested = time.perf_counter()
+            with self._converter_pool(self.table_structure == TABLE_STRUCTURE_ALL, do_ocr).borrow() as converter:
+                start = time.perf_counter()
+                call.set(pool_wait_ms=round((start - requested) * 1000, 3))
+                result = converter.convert(pdf_path)
+            doc = result.document
+            text = doc.export_to_markdown()
+            convert_seconds = time.perf_counter() - start
+        
+        if self.table_structure == TABLE_STRUCTURE_ALL:
+            # Structure cost is inside the single conversion and not separable per table
+            tables = self._extract_tables(doc)
+        elif self.table_structure == TABLE_STRUCTURE_AUTO:
+            tables = self._extract_selected_tables(pdf_path, do_ocr)
+        else:
+            tables = []
+        
+        self._log_table_stats(pdf_path, tables, convert_seconds)
+        
+        return {
+            "converter": "docling",
+            "text": text,
+            "tables": tables,
+            "pages": len(getattr(doc, "pages", None) or {}),
+        }
+    
+    def _extract_selected_tables(self, pdf_path: str, do_ocr: bool = True) -> List[Dict[str, Any]]:
+        """
+        Run table-structure recognition only on likely rate-table pages.
+        
+        The PDF is parsed once, and each run of consecutive selected pages
+        is converted as one subset so a table spanning pages stays whole.
+        A run's cost is split across the tables found in it.
+        """
+        reader = open_pdf(pdf_path)
+        tables = []
+        
+        for run in page_runs(find_rate_pages(pdf_path, reader)):
+            subset_path = write_page_subset(pdf_path, run, reader)
+            
+            try:
+                with tracing.span("docling.convert_pages", first_page=run[0], pages=len(run), ocr=do_ocr), \
+                        self._converter_pool(True, do_ocr).borrow() as converter:
+                    start = time.perf_counter()
+                    result = converter.convert(subset_path)
+                run_tables = self._extract_tables(result.document)
+                run_seconds = time.perf_counter() - start
+            finally:
+                os.remove(subset_path)
+            
+            for table in run_tables:
+                # Map the subset's page number back to the original document
+                subset_page = table.get("page")
+                in_run = subset_page is not None and 1 <= subset_page <= len(run)
+                table["page"] = run[subset_page - 1] if in_run else run[0]
+                table["seconds"] = round(run_seconds / len(run_tables), 4)
+            tables.extend(run_tables)
+        
+        return tables
+    
+    def _log_table_stats(self, pdf_path: str, tables: List[Dict[str, Any]], convert_seconds: float):
+        """Report per-table cost and how many tables extraction will keep."""
+        for index, table in enumerate(tables):
+            logger.debug(
+                "Table structure",
+                path=pdf_path,
+                table=index,
+                page=table.get("page"),
+                rows=len(table["rows"]),
+                rate_table=is_rate_table(table["headers"]),
+                seconds=table.get("seconds")
+            )
+        
+        logger.info(
+            "Table structure summary",
+            path=pdf_path,
+            mode=self.table_structure,
+            tables=len(tables),
+            rate_tables=sum(1 for t in tables if is_rate_table(t["headers"])),
+            structure_pages=len({t.get("page") for t in tables}),
+            convert_seconds=round(convert_seconds, 3),
+            table_seconds=round(sum(t.get("seconds") or 0.0 for t in tables), 3)
+        )
+    
+    def _convert_fallback(self, pdf_path: str) -> Optional[Dict[str, Any]]:
+        """Fallback conversion using pypdf when Docling is unavailable."""
         
         try:
             from pypdf import PdfReader
@@ -102,21 +556,21 @@ class DoclingParser:
         
         reader = PdfReader(pdf_path)
         full_text = ""
-        
-        for page in reader.pages:
-            full_text += page.extract_text() + "\n"
-        
-        # Parse contract fields from text
-        contract_data = self._extract_contract_fields(full_text)
-        
-        # Basic rate schedule extraction (limited without table detection)
-        contract_data["rate_schedules"] = []
-        contract_data["amendments"] = []
-        
-        # Lower confidence for fallback parser
-        contract_data["_confidence"] = self._calculate_confidence(contract_data) * 0.7
-        
-        return contract_data
+        rate_pages = []
+        
+        for page_no, page in enumerate(reader.pages, start=1):
+            page_text = page.extract_text()
+            full_text += page_text + "\n"
+            if page_may_hold_rates(page_text):
+                rate_pages.append(page_no)
+        
+        return {
+            "converter": "pypdf",
+            "text": full_text,
+            "tables": [],
+            "pages": len(reader.pages),
+            "rate_pages": rate_pages,
+        }
     
     def _extract_tables(self, doc) -> List[Dict[str, Any]]:
         """Extract tables from Docling document."""
@@ -126,7 +580,8 @@ class DoclingParser:
             if hasattr(item, 'table') and item.table is not None:
                 table_data = {
                     "headers": [],
-                    "rows": []
+                    "rows": [],
+                    "page": _item_page(item),
                 }
                 
                 # Extract table structure
@@ -142,6 +597,75 @@ class DoclingParser:
         
         return tables
     
+    def cache_stats(self) -> Dict[str, int]:
+        """Parse, field, normalization cache and converter pool counters for metrics."""
+        stats = {}
+        
+        if self.parse_cache is not None:
+            stats["parse_cache_hits"] = self.parse_cache.hits
+            stats["parse_cache_misses"] = self.parse_cache.misses
+        
+        if self.field_cache is not None:
+            stats.update(self.field_cache.stats())
+        
+        reference_index = self._reference_index or get_reference_index()
+        if reference_index:
+            stats.update(reference_index.services.cache_info())
+        
+        with self._pools_lock:
+            pools = list(self._pools.values())
+        if pools:
+            stats.update(merge_stats(pools))
+        
+        return stats
+    
+    def _cached_contract_fields(self, text: str) -> Dict[str, Any]:
+        """
+        _extract_contract_fields, memoized by text, ruleset and reference data.
+        
+        A contract ID is generated for each document without one; it is
+        never cached, so identical text parsed again or in another document
+        does not reuse it.
+        """
+        if self.field_cache is None:
+            contract_data = self._extract_contract_fields(text)
+        else:
+            reference_index = self._reference_index or get_reference_index()
+            key = stage_key(
+                "contract_fields",
+                text,
+                EXTRACTION_RULESET_VERSION,
+                reference_index.fingerprint if reference_index else None
+            )
+            
+            cached = self.field_cache.get(key)
+            if cached is None:
+                cached = self._extract_contract_fields(text)
+                self.field_cache.put(key, cached)
+            
+            # Callers add keys to the result, so never hand out the cached dict
+            contract_data = dict(cached)
+        
+        if not contract_data["contract_id"]:
+            contract_data["contract_id"] = f"CTR-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        
+        return contract_data
+    
+    def _cached_amendments(self, text: str) -> AmendmentColumns:
+        """_extract_amendments, memoized by text and ruleset."""
+        if self.field_cache is None:
+            return self._extract_amendments(text)
+        
+        key = stage_key("amendments", text, EXTRACTION_RULESET_VERSION)
+        
+        cached = self.field_cache.get(key)
+        if cached is None:
+            amendments = self._extract_amendments(text)
+            self.field_cache.put(key, amendments.to_dicts())
+            return amendments
+        
+        return AmendmentColumns.from_dicts(cached)
+    
     def _extract_contract_fields(self, text: str) -> Dict[str, Any]:
         """Extract key contract fields using regex patterns."""
         
@@ -168,10 +692,6 @@ class DoclingParser:
                 contract_data["contract_id"] = match.group(1).strip()
                 break
         
-        # Generate contract ID if not found
-        if not contract_data["contract_id"]:
-            contract_data["contract_id"] = f"CTR-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
         # NPI pattern (exactly 10 digits)
         npi_match = re.search(r"NPI[:\s#]*(\d{10})", text, re.IGNORECASE)
         if npi_match:
@@ -189,13 +709,23 @@ class DoclingParser:
                 contract_data["provider_name"] = match.group(1).strip()
                 break
         
-        # Payer name patterns
+        # Resolve payer against reference data in a single pass
+        reference_index = self._reference_index or get_reference_index()
+        payer_match = reference_index.resolve_payer(text) if reference_index else None
+        
+        if payer_match:
+            contract_data["payer_name"] = payer_match.payer_name
+            contract_data["payer_id"] = payer_match.payer_id
+        
+        # Payer name patterns (fallback when no reference data matches)
         payer_patterns = [
             r"(?:Payer|Insurance|Plan)[:\s]+([A-Za-z\s]+(?:Blue Cross|Aetna|UnitedHealth|Cigna|Humana|Anthem))",
             r"(Blue Cross Blue Shield|Aetna|UnitedHealthcare|Cigna|Humana|Anthem|Kaiser)",
         ]
         
         for pattern in payer_patterns:
+            if payer_match:
+                break
             match = re.search(pattern, text, re.IGNORECASE)
             if match:
                 contract_data["payer_name"] = match.group(1).strip()
@@ -226,8 +756,8 @@ class DoclingParser:
                 contract_data["termination_date"] = self._parse_date(match.group(1))
                 break
         
-        # Generate payer_id from payer_name
-        if contract_data["payer_name"]:
+        # Generate payer_id from payer_name for payers missing from reference data
+        if contract_data["payer_name"] and not contract_data["payer_id"]:
             payer_abbrev = "".join([w[0] for w in contract_data["payer_name"].split()[:2]]).upper()
             contract_data["payer_id"] = f"{payer_abbrev}-001"
         
@@ -254,17 +784,20 @@ class DoclingParser:
         
         return None
     
-    def _extract_rate_schedules(self, tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _extract_rate_schedules(self, tables: List[Dict[str, Any]]) -> RateScheduleColumns:
         """Extract rate schedules from parsed tables."""
         
-        rate_schedules = []
+        rate_schedules = RateScheduleColumns()
+        
+        # Canonicalize codes and categories against reference data when available
+        reference_index = self._reference_index or get_reference_index()
+        normalizer = reference_index.services if reference_index else None
         
         for table in tables:
             headers = [h.lower() for h in table.get("headers", [])]
             
             # Check if this looks like a rate table
-            rate_indicators = ["rate", "amount", "fee", "price", "cpt", "service"]
-            if not any(ind in " ".join(headers) for ind in rate_indicators):
+            if not is_rate_table(headers):
                 continue
             
             # Map columns
@@ -281,43 +814,68 @@ class DoclingParser:
             
             # Extract rows
             for row in table.get("rows", []):
-                schedule = {
-                    "service_category": self._safe_get(row, col_map.get("service_category")),
-                    "cpt_code": self._safe_get(row, col_map.get("cpt_code")),
-                    "rate_type": self._safe_get(row, col_map.get("rate_type"), "FEE_SCHEDULE"),
-                    "rate_amount": self._parse_amount(self._safe_get(row, col_map.get("rate_amount"))),
-                    "effective_date": None,  # Will inherit from contract
-                }
+                rate_amount = self._parse_amount(self._safe_get(row, col_map.get("rate_amount")))
                 
-                if schedule["rate_amount"] is not None:
-                    rate_schedules.append(schedule)
+                if rate_amount is not None:
+                    service_category = self._safe_get(row, col_map.get("service_category"))
+                    cpt_code = self._safe_get(row, col_map.get("cpt_code"))
+                    modifier = None
+                    
+                    if normalizer:
+                        service_category = normalizer.normalize_category(service_category)
+                        cpt_code, modifier = normalizer.normalize_cpt(cpt_code)
+                    
+                    rate_schedules.append(
+                        service_category=service_category,
+                        cpt_code=cpt_code,
+                        rate_type=self._safe_get(row, col_map.get("rate_type"), "FEE_SCHEDULE"),
+                        rate_amount=rate_amount,
+                        effective_date=None,  # Will inherit from contract
+                        modifier=modifier,
+                    )
         
         return rate_schedules
     
-    def _extract_amendments(self, text: str) -> List[Dict[str, Any]]:
-        """Extract amendment information from text."""
+    def _extract_amendments(self, text: str) -> AmendmentColumns:
+        """
+        Extract amendment information from text.
         
-        amendments = []
+        Segments the text in one forward pass: each numbered header starts
+        an amendment whose description runs to the next mention of
+        "amendment" (numbered or not), capped at AMENDMENT_DESCRIPTION_LIMIT
+        characters. The effective date is searched only within that cap,
+        so every character is scanned a bounded number of times.
         
-        # Amendment patterns
-        amendment_pattern = r"Amendment\s*(?:#|No\.?)?\s*(\d+)[:\s]*(.*?)(?=Amendment|$)"
+        An amendment headed more than once (e.g. in a table of contents
+        and again in the body) is reported once, at its first position,
+        preferring the occurrence that carries an effective date.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
         
-        for match in re.finditer(amendment_pattern, text, re.IGNORECASE | re.DOTALL):
-            amendment_id = f"AMD-{match.group(1)}"
-            description = match.group(2)[:500].strip()  # Limit description length
+        for header in _AMENDMENT_HEADER.finditer(text):
+            start = header.end()
+            next_mention = _AMENDMENT_MENTION.search(text, start)
+            end = next_mention.start() if next_mention else len(text)
+            window_end = min(start + AMENDMENT_DESCRIPTION_LIMIT, end)
             
-            # Try to find effective date in amendment text
-            date_match = re.search(r"effective[:\s]*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})", 
-                                   description, re.IGNORECASE)
+            date_match = _EFFECTIVE_DATE.search(text, start, window_end)
+            amendment_id = f"AMD-{header.group(1) or header.group(2)}"
+            effective_date = self._parse_date(date_match.group(1)) if date_match else None
             
-            amendment = {
+            previous = found.get(amendment_id)
+            if previous is not None and (previous["effective_date"] or not effective_date):
+                continue
+            
+            found[amendment_id] = {
                 "amendment_id": amendment_id,
-                "effective_date": self._parse_date(date_match.group(1)) if date_match else None,
-                "description": description,
+                "effective_date": effective_date,
+                "description": text[start:window_end].strip(),
                 "amendment_type": "MODIFICATION",
             }
-            
-            amendments.append(amendment)
+        
+        amendments = AmendmentColumns()
+        for amendment in found.values():
+            amendments.append(**amendment)
         
         return amendments
     
@@ -347,22 +905,10 @@ class DoclingParser:
         Based on presence and validity of key fields.
         """
         score = 0.0
-        weights = {
-            "contract_id": 0.15,
-            "payer_name": 0.15,
-            "provider_npi": 0.20,
-            "provider_name": 0.10,
-            "effective_date": 0.15,
-            "termination_date": 0.10,
-            "rate_schedules": 0.15,
-        }
         
-        for field, weight in weights.items():
-            value = contract_data.get(field)
-            if value:
-                if isinstance(value, list) and len(value) > 0:
-                    score += weight
-                elif not isinstance(value, list):
-                    score += weight
+        for field, weight in CONFIDENCE_WEIGHTS.items():
+            # Empty strings, lists and record containers are all falsy
+            if contract_data.get(field):
+                score += weight
         
         return round(score, 2)
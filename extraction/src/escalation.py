@@ -0,0 +1,150 @@
+"""
+Parser Escalation Policy
+
+Runs the cheapest parser tier first and escalates to heavier ones only
+when the result is not good enough:
+
+    pypdf        text layer only, no tables (milliseconds)
+    docling      Docling layout and tables, OCR disabled
+    docling-ocr  full Docling pipeline with OCR (the default converter)
+
+A result is accepted once its confidence score reaches the threshold and
+every required field is present. Otherwise the next tier runs, and the
+best result seen is kept if no tier is accepted. A tier that saw pages
+holding rate tables but extracted no rate schedules (pypdf, which cannot
+read tables) is never accepted before the last tier, whatever it scores.
+
+Confidence is the weighted share of key fields found. pypdf cannot find
+rate schedules, so its score tops out below 1.0; a policy whose bar a
+non-final tier can never clear is rejected, since every document would
+pay for that tier and escalate anyway.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+TIER_PYPDF = "pypdf"
+TIER_DOCLING = "docling"
+TIER_DOCLING_OCR = "docling-ocr"
+TIERS = (TIER_PYPDF, TIER_DOCLING, TIER_DOCLING_OCR)
+DOCLING_TIERS = (TIER_DOCLING, TIER_DOCLING_OCR)
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+DEFAULT_REQUIRED_FIELDS = ("provider_npi", "effective_date")
+
+# Fields behind the parser's confidence score
+CONFIDENCE_WEIGHTS = {
+    "contract_id": 0.15,
+    "payer_name": 0.15,
+    "provider_npi": 0.20,
+    "provider_name": 0.10,
+    "effective_date": 0.15,
+    "termination_date": 0.10,
+    "rate_schedules": 0.15,
+}
+
+# Fields a tier never produces (pypdf has no table detection)
+TIER_UNSUPPORTED_FIELDS = {
+    TIER_PYPDF: ("rate_schedules",),
+}
+
+
+def _split(spec: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in spec.split(",") if part.strip())
+
+
+def max_confidence(tier: str) -> float:
+    """Highest confidence score a tier's results can reach."""
+    unsupported = TIER_UNSUPPORTED_FIELDS.get(tier, ())
+    return round(sum(weight for field, weight in CONFIDENCE_WEIGHTS.items() if field not in unsupported), 2)
+
+
+@dataclass(frozen=True)
+class EscalationPolicy:
+    """
+    Ordered parser tiers and the bar a result must clear to stop escalating.
+
+    Args:
+        tiers: Tiers to try, cheapest first
+        min_confidence: Escalate while confidence is below this score
+        required_fields: Escalate while any of these fields is missing
+    """
+
+    tiers: Tuple[str, ...] = TIERS
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    required_fields: Tuple[str, ...] = DEFAULT_REQUIRED_FIELDS
+
+    def __post_init__(self):
+        unknown = [tier for tier in self.tiers if tier not in TIERS]
+        if unknown:
+            raise ValueError(f"Unknown parser tiers: {', '.join(unknown)} (expected {', '.join(TIERS)})")
+        if not self.tiers:
+            raise ValueError("At least one parser tier is required")
+
+        # Every tier but the last must be able to stop the escalation
+        for tier in self.tiers[:-1]:
+            ceiling = max_confidence(tier)
+            if self.min_confidence > ceiling:
+                raise ValueError(
+                    f"Tier {tier} scores at most {ceiling}, below the minimum confidence "
+                    f"{self.min_confidence}; lower it or drop {tier} from the tiers"
+                )
+            unsupported = [f for f in self.required_fields if f in TIER_UNSUPPORTED_FIELDS.get(tier, ())]
+            if unsupported:
+                raise ValueError(
+                    f"Tier {tier} never extracts required field(s) {', '.join(unsupported)}; "
+                    f"drop {tier} from the tiers or the field from the required fields"
+                )
+
+    @classmethod
+    def from_options(
+        cls,
+        tiers: Optional[str],
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        required_fields: Optional[str] = None
+    ) -> Optional["EscalationPolicy"]:
+        """
+        Policy from comma-separated CLI/environment values.
+
+        Returns:
+            None when no tiers are given (single-tier parsing)
+        """
+        if not tiers:
+            return None
+
+        return cls(
+            tiers=_split(tiers),
+            min_confidence=min_confidence,
+            required_fields=DEFAULT_REQUIRED_FIELDS if required_fields is None else _split(required_fields)
+        )
+
+    def available_tiers(self, docling_available: bool) -> List[str]:
+        """Configured tiers that can run in this environment."""
+        return [tier for tier in self.tiers if docling_available or tier not in DOCLING_TIERS]
+
+    def escalation_reasons(self, contract_data: Dict[str, Any]) -> List[str]:
+        """
+        Why a result should go to the next tier.
+
+        Returns:
+            Empty list when the result is accepted
+        """
+        reasons = [f"missing {field}" for field in self.required_fields if not contract_data.get(field)]
+
+        if contract_data.get("_rate_pages") and not contract_data.get("rate_schedules"):
+            reasons.append("rate pages without rate schedules")
+
+        confidence = contract_data.get("_confidence", 0.0)
+        if confidence < self.min_confidence:
+            reasons.append(f"confidence {confidence} < {self.min_confidence}")
+
+        return reasons
+
+
+def pick_best(results: Sequence[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Highest-confidence result; later (heavier) tiers win ties."""
+    best = None
+    for result in results:
+        if best is None or result.get("_confidence", 0.0) >= best.get("_confidence", 0.0):
+            best = result
+    return best
@@ -5,21 +5,28 @@ Main entry point for the extraction pipeline.
 Polls SQS for S3 event notifications when new PDFs arrive.
 """
 
+import copy
 import os
+import hashlib
 import json
 import logging
+import signal
+import socket
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 from urllib.parse import unquote_plus
 
-import boto3
 import click
 import structlog
 
-from .docling_parser import DoclingParser
-from .contract_schema import ContractData, validate_contract
-from .s3_handler import S3Handler
+from . import tracing
+
+# boto3, pydantic and Docling are imported where they are first needed so
+# that --help and other lightweight commands start quickly.
 
 # Configure structured logging
 structlog.configure(
@@ -27,6 +34,7 @@ structlog.configure(
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
+        tracing.add_trace_context,
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
@@ -42,6 +50,146 @@ structlog.configure(
 
 logger = structlog.get_logger(__name__)
 
+EXTRACTOR_VERSION = "1.0.0"
+
+
+class ExtractionError(Exception):
+    """
+    A PDF could not be extracted.
+    
+    Attributes:
+        s3_key: Key of the failed PDF
+        reason: Short failure description
+        retryable: False when retrying cannot succeed (e.g. quarantined input)
+    """
+    
+    def __init__(self, s3_key: str, reason: str, retryable: bool = True):
+        super().__init__(f"{s3_key}: {reason}")
+        self.s3_key = s3_key
+        self.reason = reason
+        self.retryable = retryable
+
+
+# Metadata that changes on every run even when the contract does not
+VOLATILE_METADATA_FIELDS = ("extracted_at", "content_fingerprint", "tier_seconds")
+
+# S3 user metadata key holding the fingerprint of an uploaded output
+FINGERPRINT_METADATA_KEY = "content-fingerprint"
+
+# Outputs missing a payer are spread over this many stable buckets
+FALLBACK_BUCKETS = 16
+
+# contract_date value for outputs without an effective date. Partition
+# columns are date-typed, and Hive, Glue and Spectrum read this value as NULL.
+NULL_DATE_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def content_fingerprint(data: dict) -> str:
+    """
+    Stable SHA-256 of a contract's content, ignoring when it was extracted.
+    
+    Columnar fields are expanded to rows so the fingerprint does not depend
+    on how the records are held in memory.
+    """
+    from .records import ColumnarRecords
+    
+    canonical = {}
+    for key, value in data.items():
+        if isinstance(value, ColumnarRecords):
+            value = value.to_dicts()
+        elif key == "extraction_metadata" and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k not in VOLATILE_METADATA_FIELDS}
+        canonical[key] = value
+    
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def finalize_contract(extracted_data: dict, source_file: str) -> Tuple[bool, List[str]]:
+    """
+    Attach extraction metadata, drop internal fields and validate in place.
+    
+    Args:
+        extracted_data: Parser output (including internal fields)
+        source_file: S3 key or local path of the source PDF
+        
+    Returns:
+        Tuple of (is_valid, list of error messages)
+    """
+    # Add metadata
+    extracted_data["extraction_metadata"] = {
+        "extracted_at": datetime.utcnow().isoformat() + "Z",
+        "confidence_score": extracted_data.get("_confidence", 0.0),
+        "source_file": source_file,
+        "extractor_version": EXTRACTOR_VERSION
+    }
+    if "_tier" in extracted_data:
+        extracted_data["extraction_metadata"]["parser_tier"] = extracted_data["_tier"]
+    if "_tier_seconds" in extracted_data:
+        extracted_data["extraction_metadata"]["tier_seconds"] = extracted_data["_tier_seconds"]
+    
+    # Remove internal fields
+    for field in ("_confidence", "_tier", "_tier_seconds", "_rate_pages"):
+        extracted_data.pop(field, None)
+    
+    extracted_data["extraction_metadata"]["content_fingerprint"] = content_fingerprint(extracted_data)
+    
+    # Validate against schema
+    from .contract_schema import validate_contract
+    return validate_contract(extracted_data)
+
+
+def forwarded_attributes(message: dict) -> dict:
+    """
+    send_message arguments carrying a received message's attributes.
+    
+    Only the value fields SendMessage accepts are copied (receive also
+    returns the reserved list fields).
+    """
+    attributes = {
+        name: {field: value for field, value in attribute.items() if field in ("DataType", "StringValue", "BinaryValue")}
+        for name, attribute in (message.get('MessageAttributes') or {}).items()
+    }
+    return {'MessageAttributes': attributes} if attributes else {}
+
+
+def fallback_partition(source_key: str) -> str:
+    """
+    Stable payer partition value for outputs without a payer_id.
+    
+    Hashing the source key spreads unattributed contracts over
+    FALLBACK_BUCKETS partitions instead of one hot one, and keeps each
+    source in the same partition when it is re-extracted on a later day.
+    """
+    bucket = int(hashlib.sha256(source_key.encode("utf-8")).hexdigest()[:8], 16) % FALLBACK_BUCKETS
+    return f"unknown-{bucket:02d}"
+
+
+def generate_output_key(data: dict, source_key: str) -> str:
+    """
+    Generate partitioned output key.
+    
+    Format: contracts/payer={payer_id}/contract_date={YYYY-MM-DD}/{filename}.json
+    
+    A missing payer_id becomes unknown-NN (see fallback_partition); a
+    missing effective_date becomes NULL_DATE_PARTITION, so contract_date
+    only ever holds dates.
+    """
+    payer_id = (data.get("payer_id") or fallback_partition(source_key)).replace("/", "-")
+    effective_date = data.get("effective_date") or NULL_DATE_PARTITION
+    
+    # Extract filename without extension
+    filename = os.path.basename(source_key).replace(".pdf", "").replace(".PDF", "")
+    
+    output_key = (
+        f"contracts/"
+        f"payer={payer_id}/"
+        f"contract_date={effective_date}/"
+        f"{filename}.json"
+    )
+    
+    return output_key
+
 
 class ContractExtractor:
     """
@@ -59,21 +207,231 @@ class ContractExtractor:
         self,
         raw_bucket: str,
         processed_bucket: str,
-        aws_region: str = "us-east-2"
+        aws_region: str = "us-east-2",
+        parse_cache_dir: Optional[str] = None,
+        worker_limits=None,
+        quarantine_file: Optional[str] = None,
+        table_structure: str = "all",
+        partition_index: bool = True,
+        escalation=None,
+        converter_pool_size: int = 1,
+        converter_max_uses: Optional[int] = None
     ):
+        """
+        Args:
+            worker_limits: Optional supervisor.WorkerLimits; when set, PDFs
+                are parsed in a supervised child process with a timeout,
+                memory ceiling and periodic recycling
+            quarantine_file: JSON Lines file of keys that broke a worker;
+                quarantined keys are skipped
+            table_structure: Table-structure mode: "all" pages, "auto"
+                (only pages that look like rate tables) or "off"
+            partition_index: Keep the processed bucket's partition index
+                up to date as outputs are written (batched, see
+                maybe_flush_partition_index); when off, a gap marker tells
+                loaders the index is missing this writer's outputs
+            escalation: Optional escalation.EscalationPolicy; when set,
+                cheaper parser tiers run first and heavier ones only when
+                confidence or required fields fall short
+            converter_pool_size: Docling converters kept in this process, so
+                this many PDFs can be parsed concurrently by poller threads
+            converter_max_uses: Rebuild a converter after this many
+                conversions to bound memory growth
+        """
         self.raw_bucket = raw_bucket
         self.processed_bucket = processed_bucket
         self.aws_region = aws_region
-        self.s3_handler = S3Handler(aws_region)
-        self.parser = DoclingParser()
+        self.parse_cache_dir = parse_cache_dir
+        self.table_structure = table_structure
+        self.escalation = escalation
+        self.converter_pool_size = converter_pool_size
+        self.converter_max_uses = converter_max_uses
+        self._s3_handler = None
+        self._parser = None
+        self.upload_stats = {"uploaded": 0, "unchanged": 0}
+        self.partition_index = partition_index
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._index_store = None
+        self._index_delta = None
+        self._index_pending = 0
+        self._index_pending_since = None
+        self._index_pending_started = None
+        self._index_retry_at = 0.0
+        self._gap_markers = None
+        self._gap_first_write = None
+        self._gap_refreshed = None
+        self.quarantine = None
+        self.supervisor = None
+        # Guards the lazily created parser and the output bookkeeping when
+        # messages are handled on several threads
+        self._lock = threading.RLock()
+        # Serializes index flushes and gap markers; held during S3 calls,
+        # so upload threads never wait on it
+        self._flush_lock = threading.Lock()
+        
+        if quarantine_file or worker_limits is not None:
+            from .supervisor import QuarantineList, SupervisedParser
+            
+            if quarantine_file:
+                self.quarantine = QuarantineList(quarantine_file)
+            if worker_limits is not None:
+                self.supervisor = SupervisedParser(
+                    worker_limits,
+                    parse_cache_dir,
+                    self.quarantine,
+                    table_structure=table_structure,
+                    escalation=escalation
+                )
         
         logger.info(
             "Initialized ContractExtractor",
             raw_bucket=raw_bucket,
             processed_bucket=processed_bucket,
-            region=aws_region
+            region=aws_region,
+            parse_cache_dir=parse_cache_dir,
+            table_structure=table_structure,
+            parser_tiers=list(escalation.tiers) if escalation else None
         )
     
+    @property
+    def s3_handler(self):
+        """S3 handler, created on first use."""
+        if self._s3_handler is None:
+            from .s3_handler import S3Handler
+            self._s3_handler = S3Handler(self.aws_region)
+        return self._s3_handler
+    
+    @property
+    def parser(self):
+        """Docling parser, created on first use."""
+        with self._lock:
+            if self._parser is None:
+                from .docling_parser import DoclingParser
+                from .parse_cache import ParseCache
+                
+                parse_cache = ParseCache(self.parse_cache_dir) if self.parse_cache_dir else None
+                self._parser = DoclingParser(
+                    parse_cache=parse_cache,
+                    table_structure=self.table_structure,
+                    escalation=self.escalation,
+                    converter_pool_size=self.converter_pool_size,
+                    converter_max_uses=self.converter_max_uses
+                )
+            return self._parser
+    
+    def maybe_flush_partition_index(self):
+        """
+        Flush pending index updates once enough have built up or the oldest is due.
+        
+        Batching keeps the shared index object from being read and
+        conditionally rewritten on every upload.
+        """
+        from .partition_index import FLUSH_EVERY_UPLOADS, FLUSH_INTERVAL_SECONDS
+        
+        with self._lock:
+            if not self._index_pending or time.monotonic() < self._index_retry_at:
+                return
+            due = (
+                self._index_pending >= FLUSH_EVERY_UPLOADS
+                or time.monotonic() - self._index_pending_started >= FLUSH_INTERVAL_SECONDS
+            )
+        if due:
+            self.flush_partition_index(wait=False)
+    
+    def flush_partition_index(self, wait: bool = True):
+        """
+        Merge index updates recorded since the last flush into the bucket index.
+        
+        The pending delta is swapped out under self._lock and merged into
+        the bucket outside it, so upload threads keep recording updates
+        during the S3 round trips. A failed merge folds the delta back in
+        front of anything recorded meanwhile.
+        
+        Args:
+            wait: Wait for a flush running on another thread instead of
+                leaving the updates to it
+        """
+        if not self._flush_lock.acquire(blocking=wait):
+            return
+        
+        try:
+            from .partition_index import FLUSH_INTERVAL_SECONDS, PartitionIndex, S3IndexStore, utc_stamp
+            
+            with self._lock:
+                if not self._index_delta:
+                    return
+                delta, pending = self._index_delta, self._index_pending
+                pending_since, pending_started = self._index_pending_since, self._index_pending_started
+                self._index_delta = PartitionIndex()
+                self._index_pending = 0
+                self._index_pending_since = None
+                self._index_pending_started = None
+            
+            if self._index_store is None:
+                self._index_store = S3IndexStore(self.s3_handler, self.processed_bucket)
+            
+            try:
+                flushed = self._index_store.update(delta)
+            except Exception as e:
+                logger.warning("Partition index update failed", error=str(e))
+                flushed = False
+            
+            if flushed:
+                if self._gap_first_write is not None:
+                    self._clear_gap()
+                return
+            
+            # Keep the delta for the next flush, and tell loaders the index is behind
+            with self._lock:
+                delta.merge(self._index_delta)
+                self._index_delta = delta
+                self._index_pending += pending
+                self._index_pending_since = pending_since
+                self._index_pending_started = pending_started
+                # Back off instead of retrying on every upload
+                self._index_retry_at = time.monotonic() + FLUSH_INTERVAL_SECONDS
+            self._record_gap(pending_since, utc_stamp(), "flush_failed")
+        finally:
+            self._flush_lock.release()
+    
+    def _gap_store(self):
+        if self._gap_markers is None:
+            from .partition_index import GapMarkers
+            self._gap_markers = GapMarkers(self.s3_handler, self.processed_bucket)
+        return self._gap_markers
+    
+    def _record_gap(self, first_write: str, last_write: str, reason: str):
+        """Write this writer's gap marker (under self._flush_lock); failures are logged."""
+        if self._gap_first_write is None or first_write < self._gap_first_write:
+            self._gap_first_write = first_write
+        try:
+            self._gap_store().record(self.writer_id, self._gap_first_write, last_write, reason)
+            self._gap_refreshed = time.monotonic()
+        except Exception as e:
+            logger.error("Could not record partition index gap", writer=self.writer_id, error=str(e))
+    
+    def _clear_gap(self):
+        try:
+            self._gap_store().clear(self.writer_id)
+            self._gap_first_write = None
+            self._gap_refreshed = None
+        except Exception as e:
+            logger.warning("Could not clear partition index gap", writer=self.writer_id, error=str(e))
+    
+    def _record_unindexed_write(self):
+        """Keep the gap marker of a writer running without the index current."""
+        from .partition_index import GAP_REFRESH_SECONDS, utc_stamp
+        
+        # Another thread refreshing the marker covers this write too
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            if self._gap_refreshed is None or time.monotonic() - self._gap_refreshed >= GAP_REFRESH_SECONDS:
+                now = utc_stamp()
+                self._record_gap(now, now, "index_disabled")
+        finally:
+            self._flush_lock.release()
+    
     def process_pdf(self, s3_key: str) -> Optional[dict]:
         """
         Process a single PDF contract.
@@ -84,61 +442,64 @@ class ContractExtractor:
         Returns:
             Extracted contract data as dict, or None if extraction failed
         """
+        try:
+            return self.extract_pdf(s3_key)
+        except ExtractionError:
+            return None
+    
+    def extract_pdf(self, s3_key: str) -> dict:
+        """
+        Process a single PDF contract, raising on failure.
+        
+        Args:
+            s3_key: S3 key of the PDF file
+            
+        Returns:
+            Extracted contract data as dict
+            
+        Raises:
+            ExtractionError: if the PDF could not be processed
+        """
+        with tracing.span("extract_pdf", bucket=self.raw_bucket, key=s3_key):
+            return self._extract_pdf(s3_key)
+    
+    def _extract_pdf(self, s3_key: str) -> dict:
+        """extract_pdf() inside its trace span."""
         logger.info("Processing PDF", s3_key=s3_key)
         
+        if self.quarantine is not None and s3_key in self.quarantine:
+            logger.warning("Skipping quarantined PDF", s3_key=s3_key)
+            raise ExtractionError(s3_key, "quarantined", retryable=False)
+        
         try:
             # Download PDF to temp location
-            local_path = self.s3_handler.download_file(
-                self.raw_bucket, 
-                s3_key
-            )
+            with tracing.span("download", key=s3_key) as stage:
+                local_path = self.s3_handler.download_file(
+                    self.raw_bucket, 
+                    s3_key
+                )
+                stage.set(bytes=os.path.getsize(local_path))
             
-            # Parse PDF with Docling
-            extracted_data = self.parser.parse_contract(local_path)
+            # Parse PDF with Docling (in a supervised worker if configured)
+            parser = self.supervisor if self.supervisor is not None else self.parser
+            with tracing.span("parse", key=s3_key, supervised=self.supervisor is not None) as stage:
+                extracted_data = parser.parse_contract(local_path, source=s3_key)
+                if extracted_data is not None:
+                    stage.set(
+                        parser_tier=extracted_data.get("_tier"),
+                        confidence=extracted_data.get("_confidence")
+                    )
             
             if extracted_data is None:
                 logger.error("Failed to extract data from PDF", s3_key=s3_key)
-                return None
-            
-            # Add metadata
-            extracted_data["extraction_metadata"] = {
-                "extracted_at": datetime.utcnow().isoformat() + "Z",
-                "confidence_score": extracted_data.get("_confidence", 0.0),
-                "source_file": s3_key,
-                "extractor_version": "1.0.0"
-            }
-            
-            # Remove internal fields
-            extracted_data.pop("_confidence", None)
-            
-            # Validate against schema
-            is_valid, errors = validate_contract(extracted_data)
+                # A worker kill quarantines the key; retrying would only repeat it
+                quarantined = self.quarantine is not None and s3_key in self.quarantine
+                raise ExtractionError(s3_key, "parser returned no data", retryable=not quarantined)
             
-            if not is_valid:
-                logger.warning(
-                    "Contract validation errors",
-                    s3_key=s3_key,
-                    errors=errors
-                )
-            
-            # Generate output path with partitioning
-            output_key = self._generate_output_key(extracted_data, s3_key)
-            
-            # Upload to processed bucket
-            self.s3_handler.upload_json(
-                self.processed_bucket,
-                output_key,
-                extracted_data
-            )
-            
-            logger.info(
-                "Successfully processed PDF",
-                s3_key=s3_key,
-                output_key=output_key,
-                contract_id=extracted_data.get("contract_id")
-            )
+            return self._finalize_and_upload(extracted_data, s3_key)
             
-            return extracted_data
+        except ExtractionError:
+            raise
             
         except Exception as e:
             logger.exception(
@@ -146,40 +507,177 @@ class ContractExtractor:
                 s3_key=s3_key,
                 error=str(e)
             )
-            return None
+            raise ExtractionError(s3_key, f"{type(e).__name__}: {e}") from e
         
         finally:
             # Cleanup temp file
             if 'local_path' in locals() and os.path.exists(local_path):
                 os.remove(local_path)
     
-    def _generate_output_key(self, data: dict, source_key: str) -> str:
+    def metrics(self) -> dict:
+        """
+        Cache and worker counters for this process.
+        
+        Supervised workers keep their own parser caches and log them on exit.
+        """
+        metrics = {f"outputs_{name}": value for name, value in self.upload_stats.items()}
+        
+        if self._parser is not None:
+            metrics.update(self._parser.cache_stats())
+        if self.supervisor is not None:
+            metrics.update({f"worker_{name}": value for name, value in self.supervisor.stats.items()})
+        
+        return metrics
+    
+    def reextract_cached(self) -> list:
+        """
+        Re-run the extraction stages over the parse cache, once per cached PDF.
+        
+        Skips download and PDF conversion entirely, so regex or column
+        mapping changes can be rolled out without reconverting PDFs. Each
+        PDF is extracted from the entry the current converter version and
+        pipeline would read (stale versions and other variants are
+        skipped), and an output is written for every source key its bytes
+        were seen under.
+        
+        Returns:
+            List of re-extracted contract IDs (one per source key)
         """
-        Generate partitioned S3 output key.
+        if self.parser.parse_cache is None:
+            raise ValueError("Re-extraction requires a parse cache directory")
         
-        Format: contracts/payer={payer_id}/contract_date={YYYY-MM-DD}/{filename}.json
+        from .parse_cache import entry_sources
+        
+        processed = []
+        skipped = 0
+        
+        for digest, entries in self.parser.parse_cache.iter_documents():
+            sources = sorted({source for entry in entries.values() for source in entry_sources(entry)})
+            
+            with tracing.span("reextract", digest=digest, sources=len(sources)):
+                try:
+                    extracted_data = self.parser.extract_cached(digest, entries)
+                except Exception as e:
+                    logger.exception("Error re-extracting cached document", digest=digest, sources=sources, error=str(e))
+                    continue
+                
+                if extracted_data is None:
+                    skipped += 1
+                    logger.info("No current parse cache entry", digest=digest, keys=sorted(entries))
+                    continue
+                
+                for s3_key in sources:
+                    try:
+                        result = self._finalize_and_upload(copy.deepcopy(extracted_data), s3_key, flush_index=False)
+                        processed.append(result.get("contract_id"))
+                    except Exception as e:
+                        logger.exception("Error re-extracting cached document", digest=digest, s3_key=s3_key, error=str(e))
+        
+        self.flush_partition_index()
+        logger.info("Re-extraction complete", count=len(processed), skipped=skipped, **self.metrics())
+        return processed
+    
+    def _finalize_and_upload(self, extracted_data: dict, s3_key: str, flush_index: bool = True) -> dict:
+        """
+        Attach metadata, validate, and upload extracted contract data.
+        
+        Args:
+            extracted_data: Parser output (including internal fields)
+            s3_key: S3 key of the source PDF
+            flush_index: Flush the partition index if a batch is due,
+                rather than leaving it to a later flush_partition_index()
+            
+        Returns:
+            The finalized contract data
         """
-        payer_id = data.get("payer_id", "unknown")
-        effective_date = data.get("effective_date", datetime.utcnow().date().isoformat())
+        with tracing.span("validate", key=s3_key) as stage:
+            is_valid, errors = finalize_contract(extracted_data, s3_key)
+            stage.set(valid=is_valid, errors=len(errors))
         
-        # Extract filename without extension
-        filename = os.path.basename(source_key).replace(".pdf", "").replace(".PDF", "")
+        if not is_valid:
+            logger.warning(
+                "Contract validation errors",
+                s3_key=s3_key,
+                errors=errors
+            )
         
-        output_key = (
-            f"contracts/"
-            f"payer={payer_id}/"
-            f"contract_date={effective_date}/"
-            f"{filename}.json"
+        # Generate output path with partitioning
+        output_key = self._generate_output_key(extracted_data, s3_key)
+        fingerprint = extracted_data["extraction_metadata"]["content_fingerprint"]
+        
+        with tracing.span("upload", key=output_key) as stage:
+            # Re-extractions usually reproduce the previous output; skip the write
+            # so S3, the warehouse load and dbt snapshots see no change
+            previous = self.s3_handler.head_object(self.processed_bucket, output_key)
+            unchanged = previous is not None and previous["metadata"].get(FINGERPRINT_METADATA_KEY) == fingerprint
+            stage.set(unchanged=unchanged)
+            
+            if unchanged:
+                with self._lock:
+                    self.upload_stats["unchanged"] += 1
+                logger.info(
+                    "Output unchanged, skipping upload",
+                    s3_key=s3_key,
+                    output_key=output_key,
+                    fingerprint=fingerprint
+                )
+                return extracted_data
+            
+            # Upload to processed bucket
+            size_bytes = self.s3_handler.upload_json(
+                self.processed_bucket,
+                output_key,
+                extracted_data,
+                metadata={FINGERPRINT_METADATA_KEY: fingerprint}
+            )
+            stage.set(bytes=size_bytes)
+            with self._lock:
+                self.upload_stats["uploaded"] += 1
+        
+        if self.partition_index:
+            from .partition_index import PartitionIndex, update_from_output, utc_stamp
+            
+            with self._lock:
+                if self._index_delta is None:
+                    self._index_delta = PartitionIndex()
+                updated_at = utc_stamp()
+                self._index_delta.apply(update_from_output(
+                    output_key,
+                    extracted_data,
+                    size_bytes,
+                    previous["size"] if previous is not None else None
+                ), updated_at=updated_at)
+                if not self._index_pending:
+                    self._index_pending_since = updated_at
+                    self._index_pending_started = time.monotonic()
+                self._index_pending += 1
+            if flush_index:
+                self.maybe_flush_partition_index()
+        else:
+            self._record_unindexed_write()
+        
+        logger.info(
+            "Successfully processed PDF",
+            s3_key=s3_key,
+            output_key=output_key,
+            contract_id=extracted_data.get("contract_id")
         )
         
-        return output_key
+        return extracted_data
+    
+    def _generate_output_key(self, data: dict, source_key: str) -> str:
+        """Generate partitioned S3 output key (see generate_output_key)."""
+        return generate_output_key(data, source_key)
     
-    def process_s3_event(self, event: dict) -> list:
+    def process_s3_event(self, event: dict, raise_errors: bool = False) -> list:
         """
         Process S3 event notification (from SQS message).
         
         Args:
             event: S3 event notification payload
+            raise_errors: Raise ExtractionError on the first failed PDF
+                instead of skipping it (used by the SQS poller so failed
+                messages are retried or dead-lettered)
             
         Returns:
             List of processed contract IDs
@@ -207,7 +705,7 @@ class ContractExtractor:
                 logger.info("Skipping non-PDF file", key=key)
                 continue
             
-            result = self.process_pdf(key)
+            result = self.extract_pdf(key) if raise_errors else self.process_pdf(key)
             
             if result:
                 processed.append(result.get("contract_id"))
@@ -226,19 +724,79 @@ class SQSPoller:
         extractor: ContractExtractor,
         aws_region: str = "us-east-2",
         wait_time: int = 20,
-        max_messages: int = 10
+        max_messages: int = 10,
+        scheduler=None,
+        large_queue_url: Optional[str] = None,
+        max_receives: int = 5,
+        dlq_url: Optional[str] = None,
+        failure_store=None,
+        retry_backoff_seconds: int = 30,
+        shard_router=None,
+        shard_id: Optional[str] = None,
+        membership=None,
+        concurrency: int = 1
     ):
+        """
+        Args:
+            scheduler: Optional ContractScheduler; received messages are
+                then run small-lane first, fair across key prefixes and
+                shortest-first within a prefix
+            large_queue_url: Optional queue for a dedicated large-document
+                worker group; large-lane messages are forwarded there
+                instead of being processed by this poller
+            max_receives: Dead-letter a failing message on this delivery
+            dlq_url: Dead-letter queue for messages that keep failing
+            failure_store: Optional dead_letter.FailureStore recording
+                dead-lettered messages locally
+            retry_backoff_seconds: Base visibility delay before a failed
+                message is retried; doubles with each delivery
+            shard_router: Optional sharding.ShardRouter; when set this
+                poller only routes intake messages to shard queues (and
+                re-routes the queues of departed shards) without extracting
+            shard_id: Shard this worker consumes; heartbeats are sent for it
+            membership: sharding.ShardMembership for heartbeats
+            concurrency: Messages of a received batch handled at once on
+                threads; match the extractor's converter pool size
+        """
         self.queue_url = queue_url
         self.extractor = extractor
         self.aws_region = aws_region
         self.wait_time = wait_time
         self.max_messages = max_messages
+        self.scheduler = scheduler
+        self.large_queue_url = large_queue_url
+        if large_queue_url and large_queue_url == queue_url:
+            # The large-document group itself: forwarding would loop messages forever
+            logger.info("Large queue is this poller's queue; processing large documents locally")
+            self.large_queue_url = None
+        self.max_receives = max_receives
+        self.dlq_url = dlq_url
+        self.failure_store = failure_store
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.shard_router = shard_router
+        self.shard_id = shard_id
+        self.membership = membership
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._last_heartbeat = None
+        self._heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
+        self.concurrency = concurrency
+        self._executor = None
+        
+        import boto3
         self.sqs_client = boto3.client('sqs', region_name=aws_region)
         
         logger.info(
             "Initialized SQSPoller",
             queue_url=queue_url,
-            wait_time=wait_time
+            wait_time=wait_time,
+            scheduled=scheduler is not None,
+            large_queue_url=large_queue_url,
+            max_receives=max_receives,
+            dlq_url=dlq_url,
+            shard_router=sorted(shard_router.shard_queues) if shard_router else None,
+            shard_id=shard_id,
+            concurrency=concurrency
         )
     
     def poll_forever(self):
@@ -247,25 +805,54 @@ class SQSPoller:
         """
         logger.info("Starting SQS polling loop")
         
-        while True:
-            try:
-                self._poll_once()
-            except Exception as e:
-                logger.exception("Error in polling loop", error=str(e))
-                time.sleep(5)  # Brief pause before retrying
+        try:
+            while True:
+                try:
+                    self._poll_once()
+                except Exception as e:
+                    logger.exception("Error in polling loop", error=str(e))
+                    time.sleep(5)  # Brief pause before retrying
+        finally:
+            if self.extractor is not None:
+                self.extractor.flush_partition_index()
+            self.leave_shard()
+    
+    def leave_shard(self):
+        """
+        Stop heartbeats and remove this worker's shard heartbeat so the
+        router stops counting it.
+        """
+        self._stop_heartbeats()
+        if self.membership is None or not self.shard_id or self._last_heartbeat is None:
+            return
+        
+        try:
+            self.membership.leave(self.shard_id, self.worker_id)
+            self._last_heartbeat = None
+            logger.info("Left shard", shard=self.shard_id, worker_id=self.worker_id)
+        except Exception as e:
+            logger.warning("Could not remove shard heartbeat", shard=self.shard_id, error=str(e))
     
     def _poll_once(self):
         """
         Poll SQS once and process any messages.
         """
-        response = self.sqs_client.receive_message(
-            QueueUrl=self.queue_url,
-            MaxNumberOfMessages=self.max_messages,
-            WaitTimeSeconds=self.wait_time,
-            MessageAttributeNames=['All']
-        )
+        self._shard_housekeeping()
+        if self.extractor is not None:
+            # Idle workers still flush index updates once they are due
+            self.extractor.maybe_flush_partition_index()
         
-        messages = response.get('Messages', [])
+        with tracing.span("sqs.receive", queue_url=self.queue_url, wait_seconds=self.wait_time) as receive:
+            response = self.sqs_client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=self.max_messages,
+                WaitTimeSeconds=self.wait_time,
+                AttributeNames=['ApproximateReceiveCount'],
+                MessageAttributeNames=['All']
+            )
+            
+            messages = response.get('Messages', [])
+            receive.set(messages=len(messages))
         
         if not messages:
             logger.debug("No messages received")
@@ -273,27 +860,399 @@ class SQSPoller:
         
         logger.info(f"Received {len(messages)} messages")
         
+        if self.shard_router is not None:
+            self._route_messages(messages, self.queue_url)
+            return
+        
+        if self.scheduler is None:
+            self._handle_messages(messages)
+        else:
+            self._run_scheduled(messages)
+        
+        logger.info("Extractor metrics", **self.extractor.metrics())
+    
+    def _shard_housekeeping(self):
+        """
+        Start this worker's shard heartbeats and, when routing, follow membership.
+        """
+        self._start_heartbeats()
+        
+        if self.shard_router is not None:
+            self.shard_router.refresh()
+            for shard in sorted(self.shard_router.departed_shards()):
+                self._drain_shard(shard)
+    
+    def _start_heartbeats(self):
+        """
+        Send a first shard heartbeat and keep sending them on a daemon thread.
+        
+        Heartbeats must not wait for the polling loop: a single batch of
+        Docling parses can outlast the membership TTL, and the router
+        would then take a busy shard off the ring.
+        """
+        if self.membership is None or not self.shard_id or self._heartbeat_thread is not None:
+            return
+        
+        self._heartbeat_stop.clear()
+        self._send_heartbeat()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            name=f"shard-heartbeat-{self.shard_id}",
+            daemon=True
+        )
+        self._heartbeat_thread.start()
+    
+    def _heartbeat_loop(self):
+        from .sharding import HEARTBEAT_SECONDS
+        
+        while not self._heartbeat_stop.wait(HEARTBEAT_SECONDS):
+            self._send_heartbeat()
+    
+    def _send_heartbeat(self):
+        try:
+            self.membership.heartbeat(self.shard_id, self.worker_id)
+            self._last_heartbeat = time.monotonic()
+        except Exception as e:
+            logger.warning("Shard heartbeat failed", shard=self.shard_id, error=str(e))
+    
+    def _stop_heartbeats(self):
+        """Stop the heartbeat thread, waiting for a heartbeat in flight."""
+        if self._heartbeat_thread is None:
+            return
+        
+        self._heartbeat_stop.set()
+        self._heartbeat_thread.join()
+        self._heartbeat_thread = None
+    
+    def _drain_shard(self, shard: str, max_batches: int = 10):
+        """
+        Re-route messages waiting in a departed shard's queue to live shards.
+        """
+        queue_url = self.shard_router.queue_for(shard)
+        
+        for _ in range(max_batches):
+            messages = self.sqs_client.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=0,
+                MessageAttributeNames=['All']
+            ).get('Messages', [])
+            if not messages:
+                return
+            
+            logger.info("Draining departed shard", shard=shard, messages=len(messages))
+            self._route_messages(messages, queue_url)
+    
+    def _route_messages(self, messages: list, source_queue_url: str):
+        """
+        Send each message's S3 records to the queues of the shards owning their keys.
+        """
+        routed = {}
+        
         for message in messages:
             try:
-                self._process_message(message)
+                records = self._parse_body(message).get('Records')
+                if not records:
+                    raise ValueError("Message does not contain S3 Records")
                 
-                # Delete message after successful processing
+                by_shard = {}
+                for record in records:
+                    key = unquote_plus(record['s3']['object']['key'])
+                    by_shard.setdefault(self.shard_router.shard_for(key), []).append(record)
+            except (ValueError, TypeError, KeyError) as e:
+                if source_queue_url == self.queue_url:
+                    receive_count = int(message.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+                    self._dead_letter(message, e, receive_count)
+                else:
+                    logger.warning("Unroutable message left in shard queue", message_id=message['MessageId'], error=str(e))
+                continue
+            
+            extra = forwarded_attributes(message)
+            
+            unsent = []
+            for shard, shard_records in by_shard.items():
+                # Keep the original body (and any SNS envelope) when nothing is split
+                body = message['Body'] if len(by_shard) == 1 else json.dumps({'Records': shard_records})
+                try:
+                    self.sqs_client.send_message(
+                        QueueUrl=self.shard_router.queue_for(shard),
+                        MessageBody=body,
+                        **extra
+                    )
+                    routed[shard] = routed.get(shard, 0) + len(shard_records)
+                except Exception as e:
+                    logger.warning(
+                        "Shard send failed",
+                        message_id=message['MessageId'],
+                        shard=shard,
+                        records=len(shard_records),
+                        error=str(e)
+                    )
+                    unsent.extend(shard_records)
+            
+            if unsent and len(unsent) == sum(len(r) for r in by_shard.values()):
+                # Nothing was sent; the message is redelivered after its visibility timeout
+                continue
+            
+            if unsent:
+                # Some shards already have their records: put back only the rest,
+                # so the redelivery cannot send those records twice
+                try:
+                    self.sqs_client.send_message(
+                        QueueUrl=source_queue_url,
+                        MessageBody=json.dumps({'Records': unsent}),
+                        **extra
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Could not requeue unrouted records; message will be redelivered whole",
+                        message_id=message['MessageId'],
+                        records=len(unsent),
+                        error=str(e)
+                    )
+                    continue
+            
+            try:
                 self.sqs_client.delete_message(
-                    QueueUrl=self.queue_url,
+                    QueueUrl=source_queue_url,
                     ReceiptHandle=message['ReceiptHandle']
                 )
-                logger.info("Message processed and deleted", message_id=message['MessageId'])
-                
             except Exception as e:
-                logger.exception(
-                    "Error processing message",
-                    message_id=message['MessageId'],
-                    error=str(e)
+                logger.warning("Could not delete routed message", message_id=message['MessageId'], error=str(e))
+        
+        logger.info("Routed messages to shards", source=source_queue_url, records=routed)
+    
+    def _run_scheduled(self, messages: list):
+        """
+        Order a received batch through the scheduler and process it.
+        """
+        from .scheduler import LANE_LARGE
+        
+        for message in messages:
+            job = self.scheduler.submit(self._build_job(message))
+            
+            # Hand large documents to the dedicated worker group; one that
+            # cannot be forwarded stays queued and is processed here
+            if job.lane == LANE_LARGE and self.large_queue_url and self._forward_message(message, self.large_queue_url):
+                self.scheduler.take(job)
+        
+        ordered = []
+        while True:
+            job = self.scheduler.next_job()
+            if job is None:
+                break
+            ordered.append(job.message)
+        self._handle_messages(ordered)
+        
+        logger.info("Scheduler lane latency", lanes=self.scheduler.lane_stats())
+    
+    def _handle_messages(self, messages: list):
+        """
+        Handle messages in order, or on up to `concurrency` threads
+        (started in order) when configured.
+        """
+        if self.concurrency <= 1 or len(messages) <= 1:
+            for message in messages:
+                self._handle_message(message)
+            return
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="message")
+        list(self._executor.map(self._handle_message, messages))
+    
+    def _handle_message(self, message: dict):
+        """
+        Process one message and delete it on success.
+        
+        Each message is the root of its own trace.
+        """
+        receive_count = int(message.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+        
+        with tracing.span(
+            "sqs.message",
+            message_id=message['MessageId'],
+            queue_url=self.queue_url,
+            receive_count=receive_count,
+            body_bytes=len(message['Body'])
+        ) as root:
+            self._handle_message_traced(message, receive_count, root)
+    
+    def _handle_message_traced(self, message: dict, receive_count: int, root):
+        """_handle_message() inside the message's root span."""
+        try:
+            self._process_message(message)
+            
+            # Delete message after successful processing
+            self.sqs_client.delete_message(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message['ReceiptHandle']
+            )
+            root.set(outcome="processed")
+            logger.info("Message processed and deleted", message_id=message['MessageId'])
+            
+        except Exception as e:
+            # Malformed bodies and quarantined inputs fail the same way every time
+            retryable = getattr(e, 'retryable', not isinstance(e, (ValueError, KeyError)))
+            root.set(outcome="failed", error=f"{type(e).__name__}: {e}"[:500])
+            
+            if not retryable or receive_count >= self.max_receives:
+                root.set(outcome="dead_lettered")
+                self._dead_letter(message, e, receive_count)
+                return
+            
+            logger.exception(
+                "Error processing message",
+                message_id=message['MessageId'],
+                receive_count=receive_count,
+                error=str(e)
+            )
+            self._delay_retry(message, receive_count)
+    
+    def _delay_retry(self, message: dict, receive_count: int):
+        """
+        Back off exponentially before the next delivery of a failed message.
+        """
+        # SQS caps visibility timeouts at 12 hours
+        delay = min(self.retry_backoff_seconds * 2 ** (receive_count - 1), 43200)
+        
+        try:
+            self.sqs_client.change_message_visibility(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message['ReceiptHandle'],
+                VisibilityTimeout=delay
+            )
+        except Exception as e:
+            logger.warning("Could not delay retry", message_id=message['MessageId'], error=str(e))
+    
+    def _dead_letter(self, message: dict, error: Exception, receive_count: int):
+        """
+        Record a message that will not be retried, then remove it from the queue.
+        
+        Without a DLQ or failure store, or when neither can take the
+        message, it is left for the queue's own redrive policy.
+        """
+        from .dead_letter import failure_record
+        
+        reason = getattr(error, 'reason', None) or f"{type(error).__name__}: {error}"
+        keys = [error.s3_key] if isinstance(error, ExtractionError) else []
+        
+        logger.error(
+            "Dead-lettering message",
+            message_id=message['MessageId'],
+            receive_count=receive_count,
+            reason=reason,
+            keys=keys
+        )
+        
+        if not self.dlq_url and self.failure_store is None:
+            return
+        
+        if self.dlq_url:
+            try:
+                self.sqs_client.send_message(
+                    QueueUrl=self.dlq_url,
+                    MessageBody=message['Body'],
+                    MessageAttributes={
+                        'FailureReason': {'DataType': 'String', 'StringValue': reason[:1000]},
+                        'ReceiveCount': {'DataType': 'Number', 'StringValue': str(receive_count)},
+                    }
                 )
+            except Exception as e:
+                # Keep the message; it comes back after its visibility timeout
+                # (or goes to the queue's redrive DLQ) and the batch carries on
+                logger.error("Could not dead-letter message", message_id=message['MessageId'], error=str(e))
+                return
+        
+        if self.failure_store is not None:
+            try:
+                self.failure_store.add(failure_record(message, reason, receive_count, keys))
+            except Exception as e:
+                logger.error("Could not record dead-lettered message", message_id=message['MessageId'], error=str(e))
+                if not self.dlq_url:
+                    return
+        
+        try:
+            self.sqs_client.delete_message(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message['ReceiptHandle']
+            )
+        except Exception as e:
+            logger.warning("Could not delete dead-lettered message", message_id=message['MessageId'], error=str(e))
     
-    def _process_message(self, message: dict):
+    def _forward_message(self, message: dict, queue_url: str) -> bool:
         """
-        Process a single SQS message containing S3 event.
+        Move a message to another queue (send, then delete the original).
+        
+        Message attributes travel with the body.
+        
+        Returns:
+            True if the message was sent; False if sending failed and the
+            caller still owns it
+        """
+        try:
+            self.sqs_client.send_message(
+                QueueUrl=queue_url,
+                MessageBody=message['Body'],
+                **forwarded_attributes(message)
+            )
+        except Exception as e:
+            logger.error("Could not forward message", message_id=message['MessageId'], queue_url=queue_url, error=str(e))
+            return False
+        
+        try:
+            self.sqs_client.delete_message(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message['ReceiptHandle']
+            )
+        except Exception as e:
+            # The forwarded copy is processed; this one comes back as a duplicate
+            logger.warning("Could not delete forwarded message", message_id=message['MessageId'], error=str(e))
+        
+        logger.info("Message forwarded", message_id=message['MessageId'], queue_url=queue_url)
+        return True
+    
+    def _build_job(self, message: dict):
+        """
+        Describe a message for the scheduler: object keys, total size and prefix.
+        
+        Sizes come from the S3 event when present, otherwise from a HEAD
+        request. Unparseable messages get size 0 so they fail fast.
+        """
+        from .scheduler import ScheduledJob, key_prefix
+        
+        keys = []
+        size_bytes = 0
+        
+        try:
+            records = self._parse_body(message).get('Records', [])
+        except (ValueError, TypeError):
+            records = []
+        
+        for record in records:
+            s3_info = record.get('s3', {})
+            bucket = s3_info.get('bucket', {}).get('name')
+            key = unquote_plus(s3_info.get('object', {}).get('key', ''))
+            size = s3_info.get('object', {}).get('size')
+            
+            if size is None and bucket and key:
+                try:
+                    size = self.extractor.s3_handler.get_object_size(bucket, key)
+                except Exception as e:
+                    logger.warning("Could not determine object size", key=key, error=str(e))
+            
+            keys.append(key)
+            size_bytes += size or 0
+        
+        return ScheduledJob(
+            message=message,
+            keys=keys,
+            size_bytes=size_bytes,
+            prefix=key_prefix(keys[0]) if keys else ""
+        )
+    
+    def _parse_body(self, message: dict) -> dict:
+        """
+        Decode an SQS message body, unwrapping SNS envelopes.
         """
         body = json.loads(message['Body'])
         
@@ -301,9 +1260,18 @@ class SQSPoller:
         if 'Message' in body:
             body = json.loads(body['Message'])
         
+        return body
+    
+    def _process_message(self, message: dict):
+        """
+        Process a single SQS message containing S3 event.
+        """
+        body = self._parse_body(message)
+        
         # Process S3 event
         if 'Records' in body:
-            processed = self.extractor.process_s3_event(body)
+            tracing.current_span().set(records=len(body['Records']))
+            processed = self.extractor.process_s3_event(body, raise_errors=True)
             logger.info(f"Processed {len(processed)} contracts from message")
         else:
             logger.warning("Message does not contain S3 Records", body=body)
@@ -350,6 +1318,154 @@ class SQSPoller:
     default=False,
     help="Poll SQS continuously for messages"
 )
+@click.option(
+    "--large-threshold-mb",
+    envvar="LARGE_DOCUMENT_MB",
+    type=float,
+    default=20.0,
+    help="PDFs at or above this size are scheduled in the large-document lane"
+)
+@click.option(
+    "--large-queue-url",
+    envvar="SQS_LARGE_QUEUE_URL",
+    default=None,
+    help="Queue for a dedicated large-document worker group (optional)"
+)
+@click.option(
+    "--dlq-url",
+    envvar="SQS_DLQ_URL",
+    default=None,
+    help="Dead-letter queue for messages that keep failing"
+)
+@click.option(
+    "--failure-file",
+    envvar="FAILURE_FILE",
+    default=None,
+    help="JSON Lines file recording dead-lettered messages"
+)
+@click.option(
+    "--max-receives",
+    envvar="MAX_RECEIVES",
+    type=int,
+    default=5,
+    help="Dead-letter a failing message after this many deliveries"
+)
+@click.option(
+    "--shard-queues",
+    envvar="SHARD_QUEUES",
+    default=None,
+    help="Route intake to shard queues instead of extracting (shard-a=url,shard-b=url)"
+)
+@click.option(
+    "--shard-by",
+    envvar="SHARD_BY",
+    type=click.Choice(["key", "prefix"]),
+    default="key",
+    help="Route on the whole key, or on its payer folder (needs incoming/<payer>/<file>.pdf keys)"
+)
+@click.option(
+    "--shard-id",
+    envvar="SHARD_ID",
+    default=None,
+    help="Shard this worker consumes; sends heartbeats so the router keeps it on the ring"
+)
+@click.option(
+    "--doc-timeout",
+    envvar="DOC_TIMEOUT_SECONDS",
+    type=float,
+    default=None,
+    help="Parse in a supervised worker, killing it after this many seconds per PDF"
+)
+@click.option(
+    "--max-worker-rss-mb",
+    envvar="MAX_WORKER_RSS_MB",
+    type=float,
+    default=None,
+    help="Kill the supervised worker when its RSS exceeds this many MiB"
+)
+@click.option(
+    "--worker-max-docs",
+    envvar="WORKER_MAX_DOCS",
+    type=int,
+    default=50,
+    help="Restart the supervised worker after this many PDFs"
+)
+@click.option(
+    "--quarantine-file",
+    envvar="QUARANTINE_FILE",
+    default=None,
+    help="JSON Lines file recording PDFs that broke a worker"
+)
+@click.option(
+    "--parse-cache-dir",
+    envvar="PARSE_CACHE_DIR",
+    default=None,
+    help="Directory for cached conversion intermediates (markdown + tables)"
+)
+@click.option(
+    "--table-structure",
+    envvar="TABLE_STRUCTURE",
+    type=click.Choice(["all", "auto", "off"]),
+    default="all",
+    help="Run table-structure recognition on all pages, only likely rate-table pages (auto), or none"
+)
+@click.option(
+    "--tiers",
+    envvar="PARSER_TIERS",
+    default=None,
+    help="Comma-separated parser tiers to escalate through, cheapest first (pypdf,docling,docling-ocr)"
+)
+@click.option(
+    "--min-confidence",
+    envvar="MIN_CONFIDENCE",
+    type=float,
+    default=0.8,
+    help="Escalate to the next parser tier below this confidence score"
+)
+@click.option(
+    "--required-fields",
+    envvar="REQUIRED_FIELDS",
+    default="provider_npi,effective_date",
+    help="Escalate to the next parser tier while any of these fields is missing"
+)
+@click.option(
+    "--converter-pool-size",
+    envvar="CONVERTER_POOL_SIZE",
+    type=int,
+    default=1,
+    help="Docling converters per process; also how many messages are handled concurrently"
+)
+@click.option(
+    "--converter-max-uses",
+    envvar="CONVERTER_MAX_USES",
+    type=int,
+    default=None,
+    help="Rebuild a Docling converter after this many conversions"
+)
+@click.option(
+    "--trace-file",
+    envvar="TRACE_FILE",
+    default=None,
+    help="Append trace spans as JSON Lines to this file"
+)
+@click.option(
+    "--otlp-endpoint",
+    envvar="OTEL_EXPORTER_OTLP_ENDPOINT",
+    default=None,
+    help="Export trace spans to this OTLP/HTTP collector (e.g. http://localhost:4318)"
+)
+@click.option(
+    "--partition-index/--no-partition-index",
+    envvar="PARTITION_INDEX",
+    default=True,
+    help="Maintain _partition_index.json in the processed bucket"
+)
+@click.option(
+    "--re-extract",
+    is_flag=True,
+    default=False,
+    help="Re-run extraction over every cached intermediate without reconverting PDFs"
+)
 def main(
     raw_bucket: str,
     processed_bucket: str,
@@ -357,7 +1473,30 @@ def main(
     aws_region: str,
     s3_key: str,
     event_file: str,
-    poll: bool
+    poll: bool,
+    large_threshold_mb: float,
+    large_queue_url: str,
+    dlq_url: str,
+    failure_file: str,
+    max_receives: int,
+    shard_queues: str,
+    shard_by: str,
+    shard_id: str,
+    doc_timeout: float,
+    max_worker_rss_mb: float,
+    worker_max_docs: int,
+    quarantine_file: str,
+    parse_cache_dir: str,
+    table_structure: str,
+    tiers: str,
+    min_confidence: float,
+    required_fields: str,
+    converter_pool_size: int,
+    converter_max_uses: int,
+    trace_file: str,
+    otlp_endpoint: str,
+    partition_index: bool,
+    re_extract: bool
 ):
     """
     PDF Contract Extraction Service
@@ -365,11 +1504,52 @@ def main(
     Extracts structured data from healthcare provider contracts
     and outputs partitioned JSON to S3.
     """
-    extractor = ContractExtractor(raw_bucket, processed_bucket, aws_region)
+    tracing.configure(trace_file, otlp_endpoint, os.environ.get("OTEL_SERVICE_NAME", tracing.DEFAULT_SERVICE_NAME))
+    
+    worker_limits = None
+    if doc_timeout or max_worker_rss_mb:
+        from .supervisor import WorkerLimits
+        
+        worker_limits = WorkerLimits(
+            timeout_seconds=doc_timeout or WorkerLimits.timeout_seconds,
+            max_rss_mb=max_worker_rss_mb,
+            max_documents=worker_max_docs
+        )
+    
+    from .escalation import EscalationPolicy
+    
+    try:
+        escalation = EscalationPolicy.from_options(tiers, min_confidence, required_fields)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint=["--tiers", "--min-confidence", "--required-fields"])
+    
+    extractor = ContractExtractor(
+        raw_bucket,
+        processed_bucket,
+        aws_region,
+        parse_cache_dir=parse_cache_dir,
+        worker_limits=worker_limits,
+        quarantine_file=quarantine_file,
+        table_structure=table_structure,
+        partition_index=partition_index,
+        escalation=escalation,
+        converter_pool_size=converter_pool_size,
+        converter_max_uses=converter_max_uses
+    )
+    
+    if re_extract:
+        # Replay cheap extraction stages over cached intermediates
+        if not parse_cache_dir:
+            click.echo("PARSE_CACHE_DIR is required for --re-extract", err=True)
+            raise SystemExit(1)
+        
+        processed = extractor.reextract_cached()
+        click.echo(f"Re-extracted {len(processed)} contracts")
     
-    if s3_key:
+    elif s3_key:
         # Process single file
         result = extractor.process_pdf(s3_key)
+        extractor.flush_partition_index()
         if result:
             click.echo(f"Processed: {result.get('contract_id')}")
         else:
@@ -381,6 +1561,7 @@ def main(
         with open(event_file) as f:
             event = json.load(f)
         processed = extractor.process_s3_event(event)
+        extractor.flush_partition_index()
         click.echo(f"Processed {len(processed)} contracts")
     
     elif poll or sqs_queue_url:
@@ -389,15 +1570,42 @@ def main(
             click.echo("SQS_QUEUE_URL is required for polling mode", err=True)
             raise SystemExit(1)
         
+        from .dead_letter import FailureStore
+        from .scheduler import ContractScheduler
+        from .sharding import ShardMembership, ShardRouter, parse_shard_queues
+        
+        membership = None
+        if shard_queues or shard_id:
+            membership = ShardMembership(extractor.s3_handler, processed_bucket)
+        
+        shard_router = None
+        if shard_queues:
+            try:
+                shard_router = ShardRouter(parse_shard_queues(shard_queues), shard_by, membership)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--shard-queues")
+        
         poller = SQSPoller(
             queue_url=sqs_queue_url,
             extractor=extractor,
-            aws_region=aws_region
+            aws_region=aws_region,
+            scheduler=ContractScheduler(int(large_threshold_mb * 1024 * 1024)),
+            large_queue_url=large_queue_url,
+            max_receives=max_receives,
+            dlq_url=dlq_url,
+            failure_store=FailureStore(failure_file) if failure_file else None,
+            shard_router=shard_router,
+            shard_id=shard_id,
+            membership=membership,
+            # Supervised parsing runs one document at a time
+            concurrency=converter_pool_size if worker_limits is None else 1
         )
+        # ECS stops tasks with SIGTERM; exit through poll_forever's cleanup
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
         poller.poll_forever()
         
     else:
-        click.echo("Specify --s3-key, --event-file, or --poll (with SQS_QUEUE_URL)", err=True)
+        click.echo("Specify --s3-key, --event-file, --re-extract, or --poll (with SQS_QUEUE_URL)", err=True)
         raise SystemExit(1)
 
 
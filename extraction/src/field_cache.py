@@ -0,0 +1,152 @@
+"""
+Field Extraction Cache
+
+Memoizes the text-only extraction stages (contract fields, amendments) so
+upload retries, CI validation runs and output regeneration after schema
+changes do not repeat the regex work for text that has already been seen.
+
+Entries are keyed by a SHA-256 of the stage name, the extraction ruleset
+version, the reference data fingerprint and the document text, so a rule
+or seed change naturally misses. Values are JSON-serializable and kept in
+a bounded in-memory LRU, optionally backed by gzipped files on disk.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def stage_key(stage: str, text: str, *versions: Any) -> str:
+    """Cache key for one extraction stage over a document text."""
+    digest = hashlib.sha256()
+    for part in (stage, *versions):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FieldCache:
+    """
+    Bounded LRU of extraction stage results with optional disk persistence.
+
+    Args:
+        max_entries: In-memory entry limit (least recently used evicted)
+        cache_dir: Directory for persisted entries; None keeps results in
+            memory only
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _remember(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for a key, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._load(key) if self.cache_dir is not None else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: Any):
+        """Store a JSON-serializable value."""
+        with self._lock:
+            self._remember(key, value)
+
+        if self.cache_dir is not None:
+            self._store(key, value)
+
+    def _load(self, key: str) -> Optional[Any]:
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Discarding unreadable field cache entry", key=key, error=str(e))
+            return None
+
+    def _store(self, key: str, value: Any):
+        """Write an entry atomically (write to temp file, then rename)."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters for metrics."""
+        with self._lock:
+            return {
+                "field_cache_hits": self.hits,
+                "field_cache_disk_hits": self.disk_hits,
+                "field_cache_misses": self.misses,
+                "field_cache_entries": len(self._entries),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_field_cache() -> Optional[FieldCache]:
+    """
+    Per-process field cache configured from the environment.
+
+    FIELD_CACHE_SIZE sets the in-memory entry limit (0 disables caching)
+    and FIELD_CACHE_DIR enables disk persistence.
+    """
+    max_entries = int(os.environ.get("FIELD_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    cache_dir = os.environ.get("FIELD_CACHE_DIR")
+
+    if max_entries <= 0 and not cache_dir:
+        return None
+
+    return FieldCache(max(max_entries, 0), cache_dir)
@@ -0,0 +1,159 @@
+"""
+Service Normalization
+
+Canonicalizes CPT/HCPCS codes and service categories at extraction time
+so rate rows arrive in the warehouse already matching
+ref_service_categories. Known spellings are answered from a lookup
+table built from the seeds; unseen variants are resolved once and kept
+in an LRU cache.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Words that do not distinguish one category from another
+GENERIC_WORDS = {"SERVICES", "SERVICE", "CARE", "AND", "&"}
+
+# Hand-maintained spellings that cannot be derived from the seed names
+CATEGORY_SYNONYMS = {
+    "IP": "INPATIENT",
+    "OP": "OUTPATIENT",
+    "ER": "EMERGENCY",
+    "ED": "EMERGENCY",
+    "LABORATORY": "LAB",
+    "RADIOLOGY": "IMAGING",
+    "BEHAVIORAL": "MENTAL",
+    "PCP": "PRIMARY",
+    "DURABLE MEDICAL EQUIPMENT": "DME",
+    "OB": "MATERNITY",
+}
+
+# 5-digit CPT, 4 digits + F/T/U (Category II/III, PLA), or HCPCS Level II
+CPT_RE = re.compile(r"(?:\d{5}|\d{4}[FTU]|[A-V]\d{4})(?![0-9A-Z])")
+CPT_NOISE_RE = re.compile(r"^(?:CPT|HCPCS)[\s:#\-]*|[\s#]")
+# Two-character modifiers after the code, e.g. "99213-25" or "27447 RT 59"
+CPT_MODIFIERS_RE = re.compile(r"(?:\s*[-\s,/]\s*[0-9A-Z]{2})+$")
+MODIFIER_RE = re.compile(r"[0-9A-Z]{2}")
+NON_WORD_RE = re.compile(r"[^A-Z0-9&]+")
+
+
+def _category_key(value: str) -> str:
+    """Uppercase and reduce punctuation/whitespace to single spaces."""
+    return NON_WORD_RE.sub(" ", value.upper()).strip()
+
+
+def _match_cpt(value: str) -> Optional[str]:
+    """The code in an uppercased cell, ignoring labels and spreadsheet noise."""
+    cleaned = CPT_NOISE_RE.sub("", value)
+    if cleaned.endswith(".0"):
+        cleaned = cleaned[:-2]
+
+    match = CPT_RE.match(cleaned)
+    return match.group(0) if match else None
+
+
+class ServiceNormalizer:
+    """
+    Lookup-table normalizer for service categories and CPT codes.
+
+    Args:
+        service_categories: category_code -> category_name (from the seed)
+        cache_size: Maximum number of unseen variants to remember
+    """
+
+    def __init__(self, service_categories: Dict[str, str], cache_size: int = 4096):
+        self.service_categories = dict(service_categories)
+        self._lookup: Dict[str, str] = {}
+
+        for code, name in self.service_categories.items():
+            key = _category_key(name)
+            self._lookup[_category_key(code)] = code
+            self._lookup[key] = code
+            self._lookup[" ".join(w for w in key.split() if w not in GENERIC_WORDS)] = code
+
+        for synonym, code in CATEGORY_SYNONYMS.items():
+            if code in self.service_categories:
+                self._lookup.setdefault(synonym, code)
+
+        self._lookup.pop("", None)
+        self._resolve_unseen = lru_cache(maxsize=cache_size)(self._resolve_category)
+        self.normalize_cpt = lru_cache(maxsize=cache_size)(self._normalize_cpt)
+
+    def normalize_category(self, value: Optional[str]) -> Optional[str]:
+        """
+        Map a raw service category to its category_code.
+
+        Unknown categories come back uppercased with punctuation and
+        whitespace collapsed, close to what stg_rate_schedules produces.
+        """
+        if value is None:
+            return None
+
+        key = _category_key(value)
+        code = self._lookup.get(key)
+        if code is not None:
+            return code
+        return self._resolve_unseen(key)
+
+    def _resolve_category(self, key: str) -> Optional[str]:
+        """
+        Resolve an unseen variant by its most specific known phrase.
+
+        Longer known phrases beat shorter ones ("durable medical equipment
+        rental" is DME, not whatever "medical" might map to). Among
+        phrases of the same length the rightmost wins, since the head noun
+        of an English noun phrase comes last: "outpatient surgery" is
+        SURGERY and "pediatric imaging" is IMAGING.
+        """
+        if not key:
+            return None
+
+        words = [w for w in key.split() if w not in GENERIC_WORDS]
+        for length in range(len(words), 0, -1):
+            for start in range(len(words) - length, -1, -1):
+                code = self._lookup.get(" ".join(words[start:start + length]))
+                if code is not None:
+                    return code
+
+        return key
+
+    def _normalize_cpt(self, value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Canonicalize a CPT/HCPCS code and split off its modifiers.
+
+        Strips labels, whitespace and trailing ".0" left by spreadsheet
+        exports; anything that is not code-shaped is returned trimmed.
+
+        Returns:
+            (code, modifier) where modifier joins multiple modifiers with
+            commas ("27447-RT-59" -> ("27447", "RT,59")), or is None
+        """
+        if value is None:
+            return None, None
+
+        raw = str(value).strip().upper()
+
+        # Only treat the suffix as modifiers if what precedes it is a code,
+        # so spaced-out codes such as "992 13" still normalize as before
+        suffix = CPT_MODIFIERS_RE.search(raw)
+        if suffix:
+            code = _match_cpt(raw[:suffix.start()])
+            if code is not None:
+                return code, ",".join(MODIFIER_RE.findall(suffix.group(0)))
+
+        code = _match_cpt(raw)
+        if code is not None:
+            return code, None
+        return str(value).strip() or None, None
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters for the unseen-variant caches."""
+        category = self._resolve_unseen.cache_info()
+        cpt = self.normalize_cpt.cache_info()
+        return {
+            "category_hits": category.hits,
+            "category_misses": category.misses,
+            "cpt_hits": cpt.hits,
+            "cpt_misses": cpt.misses,
+        }
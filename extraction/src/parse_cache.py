@@ -0,0 +1,160 @@
+"""
+Parse Cache
+
+Persists the expensive intermediate output of PDF conversion (document
+markdown plus extracted tables) so the cheap extraction stages can be
+replayed after a regex or column-mapping change without reconverting
+every PDF.
+
+Entries are gzipped JSON files keyed by the SHA-256 of the PDF bytes and
+the converter name and version, so upgrading Docling naturally misses.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def converter_version(converter: str) -> str:
+    """Installed version of the converter package (docling or pypdf)."""
+    try:
+        return version(converter)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Directory-backed store of conversion intermediates.
+
+    Each entry holds:
+        converter, tier, source, sources, text, tables
+
+    source is the first key the PDF was converted for; sources lists every
+    key the same bytes were seen under, so re-extraction can write an
+    output for each of them.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, pdf_path: str, converter: str, variant: Optional[str] = None) -> str:
+        """Cache key for a PDF under the given converter (and pipeline variant)."""
+        return self.key_for_digest(file_digest(pdf_path), converter, variant)
+
+    @staticmethod
+    def key_for_digest(digest: str, converter: str, variant: Optional[str] = None) -> str:
+        """Cache key for PDF bytes with the given SHA-256 under the installed converter version."""
+        key = f"{digest}-{converter}-{converter_version(converter)}"
+        return f"{key}-{variant}" if variant else key
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _load(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Read one entry; unreadable or outdated entries are treated as missing."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Discarding unreadable parse cache entry", path=str(path), error=str(e))
+            return None
+
+        if entry.get("format") != CACHE_FORMAT_VERSION:
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load an intermediate, or None if it is not cached."""
+        entry = self._load(self._path(key))
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, intermediate: Dict[str, Any]):
+        """Store an intermediate atomically (write to temp file, then rename)."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        entry = dict(intermediate, format=CACHE_FORMAT_VERSION, key=key)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        logger.debug("Stored parse intermediate", key=key, path=str(path))
+
+    def add_source(self, key: str, entry: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """
+        Record another source for a cached PDF (identical bytes under a new key).
+
+        Returns:
+            The entry, rewritten if the source was new
+        """
+        sources = entry_sources(entry)
+        if source in sources:
+            return entry
+
+        entry = dict(entry, sources=sources + [source])
+        self.put(key, entry)
+        return entry
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Yield every readable cached intermediate."""
+        for path in sorted(self.cache_dir.glob("*/*.json.gz")):
+            entry = self._load(path)
+            if entry is not None:
+                yield entry
+
+    def iter_documents(self) -> Iterator[Tuple[str, Dict[str, Dict[str, Any]]]]:
+        """
+        Yield (digest, {key: entry}) once per cached PDF.
+
+        A PDF may be cached under several converters, versions and
+        pipeline variants; grouping them lets callers pick the entry the
+        current configuration would read instead of replaying them all.
+        """
+        # Keys start with the fixed-length digest, so a PDF's entries sort together
+        for digest, entries in groupby(self.iter_entries(), key=lambda entry: entry["key"].split("-", 1)[0]):
+            yield digest, {entry["key"]: entry for entry in entries}
+
+
+def entry_sources(entry: Dict[str, Any]) -> List[str]:
+    """Every source recorded for a cache entry (older entries only have source)."""
+    return list(entry.get("sources") or [entry["source"]])
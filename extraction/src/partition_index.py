@@ -0,0 +1,379 @@
+"""
+Partition Index
+
+Compact summary of the partitioned contract output. For each partition
+(payer / contract_date folder) it keeps the object count, total bytes,
+effective and termination date bounds, and the time of the last write.
+Writers update it as they upload outputs, so loaders and Spectrum
+partition registration can find and prune partitions without listing
+the bucket.
+
+The index is a single JSON object. Writers batch their changes and merge
+them with optimistic concurrency: S3 conditional writes (If-Match /
+If-None-Match) for the bucket index, and an exclusive file lock for local
+batch output. Date bounds only ever widen; run `rebuild` to recompute the
+index exactly.
+
+The index is best effort, so writers that leave writes out of it (index
+disabled, or updates they could not flush) say so with a gap marker under
+_partition_index_gaps/. Loaders only trust the index for a window no
+marker overlaps.
+
+Usage (from the extraction/ directory):
+    python -m src.partition_index show --bucket $S3_PROCESSED_BUCKET
+    python -m src.partition_index rebuild --bucket $S3_PROCESSED_BUCKET
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+import structlog
+
+# File locking guards concurrent local batch runs; unavailable on Windows
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+INDEX_KEY = "_partition_index.json"
+INDEX_FORMAT_VERSION = 1
+GAP_PREFIX = "_partition_index_gaps/"
+
+# Writers flush pending updates after this many uploads, or once the oldest
+# pending update is this old (checked after each upload and each poll)
+FLUSH_EVERY_UPLOADS = 50
+FLUSH_INTERVAL_SECONDS = 30
+# Upper bound on how long a write takes to reach the index while flushes
+# succeed (flush interval plus one idle SQS long poll); loaders need a
+# settle window at least this long to rely on the index
+MAX_FLUSH_LAG_SECONDS = 60
+# Writers without the index refresh their gap marker this often
+GAP_REFRESH_SECONDS = 300
+
+
+@dataclass
+class IndexUpdate:
+    """One output write, as recorded in the partition index."""
+
+    key: str
+    size_bytes: int
+    replaced_bytes: Optional[int] = None
+    effective_date: Optional[str] = None
+    termination_date: Optional[str] = None
+
+
+def utc_stamp(value: Optional[datetime] = None) -> str:
+    """Fixed-width UTC timestamp, so stamps compare correctly as strings."""
+    if value is None:
+        value = datetime.utcnow()
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def partition_of(key: str) -> str:
+    """Partition path of an output key (its parent folder)."""
+    return key.rsplit("/", 1)[0] if "/" in key else ""
+
+
+def _empty_entry() -> Dict[str, Any]:
+    return {
+        "objects": 0,
+        "bytes": 0,
+        "min_effective_date": None,
+        "max_effective_date": None,
+        "max_termination_date": None,
+        "updated_at": None,
+    }
+
+
+def _widen(entry: Dict[str, Any], field: str, value: Optional[str], pick) -> None:
+    """Extend a bound with an ISO date/time string (ISO strings sort chronologically)."""
+    if value is None:
+        return
+    entry[field] = value if entry[field] is None else pick(entry[field], value)
+
+
+class PartitionIndex:
+    """
+    Per-partition counters and bounds.
+
+    Also used for pending deltas: counts in a delta are increments, and
+    merging a delta into the stored index adds them.
+    """
+
+    def __init__(self, partitions: Optional[Dict[str, Dict[str, Any]]] = None, rebuilt_at: Optional[str] = None):
+        self.partitions: Dict[str, Dict[str, Any]] = partitions or {}
+        # When `rebuild` last listed the bucket; writes before it are covered
+        self.rebuilt_at = rebuilt_at
+
+    def __len__(self) -> int:
+        return len(self.partitions)
+
+    def __bool__(self) -> bool:
+        return bool(self.partitions)
+
+    def apply(self, update: IndexUpdate, updated_at: Optional[str] = None):
+        """Record one output write."""
+        entry = self.partitions.setdefault(partition_of(update.key), _empty_entry())
+
+        if update.replaced_bytes is None:
+            entry["objects"] += 1
+            entry["bytes"] += update.size_bytes
+        else:
+            # Overwrite of an existing output: same count, size may differ
+            entry["bytes"] += update.size_bytes - update.replaced_bytes
+
+        _widen(entry, "min_effective_date", update.effective_date, min)
+        _widen(entry, "max_effective_date", update.effective_date, max)
+        _widen(entry, "max_termination_date", update.termination_date, max)
+        _widen(entry, "updated_at", updated_at or utc_stamp(), max)
+
+    def merge(self, delta: "PartitionIndex"):
+        """Add a pending delta into this index."""
+        for partition, change in delta.partitions.items():
+            entry = self.partitions.setdefault(partition, _empty_entry())
+            entry["objects"] += change["objects"]
+            entry["bytes"] += change["bytes"]
+            _widen(entry, "min_effective_date", change["min_effective_date"], min)
+            _widen(entry, "max_effective_date", change["max_effective_date"], max)
+            _widen(entry, "max_termination_date", change["max_termination_date"], max)
+            _widen(entry, "updated_at", change["updated_at"], max)
+
+    def updated_since(self, since: str) -> Iterator[str]:
+        """Partitions written at or after an ISO timestamp."""
+        for partition, entry in self.partitions.items():
+            if entry["updated_at"] is not None and entry["updated_at"] >= since:
+                yield partition
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": INDEX_FORMAT_VERSION,
+            "updated_at": utc_stamp(),
+            "rebuilt_at": self.rebuilt_at,
+            "partitions": self.partitions,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PartitionIndex":
+        if data.get("format") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported partition index format: {data.get('format')}")
+        return cls(
+            {name: dict(_empty_entry(), **entry) for name, entry in data["partitions"].items()},
+            rebuilt_at=data.get("rebuilt_at")
+        )
+
+
+def update_from_output(key: str, data: Dict[str, Any], size_bytes: int, replaced_bytes: Optional[int]) -> IndexUpdate:
+    """IndexUpdate for an output document that was just written."""
+    return IndexUpdate(
+        key=key,
+        size_bytes=size_bytes,
+        replaced_bytes=replaced_bytes,
+        effective_date=data.get("effective_date"),
+        termination_date=data.get("termination_date"),
+    )
+
+
+class S3IndexStore:
+    """Partition index kept as an object in the processed bucket."""
+
+    def __init__(self, s3_handler, bucket: str, key: str = INDEX_KEY, max_attempts: int = 5):
+        self.s3_handler = s3_handler
+        self.bucket = bucket
+        self.key = key
+        self.max_attempts = max_attempts
+
+    def load(self) -> Tuple[PartitionIndex, Optional[str]]:
+        """Current index and its ETag (None if no index exists yet)."""
+        from botocore.exceptions import ClientError
+
+        try:
+            response = self.s3_handler.s3_client.get_object(Bucket=self.bucket, Key=self.key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return PartitionIndex(), None
+            raise
+
+        return PartitionIndex.from_dict(json.loads(response["Body"].read())), response["ETag"]
+
+    def _put(self, index: PartitionIndex, **conditions) -> None:
+        self.s3_handler.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Body=json.dumps(index.to_dict(), separators=(",", ":")).encode("utf-8"),
+            ContentType="application/json",
+            **conditions
+        )
+
+    def update(self, delta: PartitionIndex) -> bool:
+        """
+        Merge a delta into the stored index.
+
+        Returns:
+            True if written; False if other writers kept winning the race
+            (the caller should keep the delta and retry later)
+        """
+        from botocore.exceptions import ClientError
+
+        for attempt in range(1, self.max_attempts + 1):
+            index, etag = self.load()
+            index.merge(delta)
+
+            try:
+                self._put(index, **({"IfMatch": etag} if etag else {"IfNoneMatch": "*"}))
+                return True
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                    raise
+                logger.debug("Partition index changed concurrently, retrying", attempt=attempt)
+
+        logger.warning("Partition index update deferred", bucket=self.bucket, partitions=len(delta))
+        return False
+
+    def replace(self, index: PartitionIndex):
+        """Overwrite the stored index unconditionally (used by rebuild)."""
+        self._put(index)
+
+
+class GapMarkers:
+    """
+    Writes the bucket index may be missing, one marker per writer.
+
+    A marker at _partition_index_gaps/<writer>.json holds the first and
+    last write (utc_stamp strings) its writer left out of the index. A
+    successful flush clears the writer's marker; rebuild clears markers
+    it covers.
+    """
+
+    def __init__(self, s3_handler, bucket: str, prefix: str = GAP_PREFIX):
+        self.s3_handler = s3_handler
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def record(self, writer: str, first_write: str, last_write: str, reason: str):
+        """Create or replace a writer's marker."""
+        self.s3_handler.upload_json(self.bucket, f"{self.prefix}{writer}.json", {
+            "writer": writer,
+            "first_write": first_write,
+            "last_write": last_write,
+            "reason": reason,
+        })
+
+    def clear(self, writer: str):
+        """Remove a writer's marker (a no-op if it has none)."""
+        self.s3_handler.delete_object(self.bucket, f"{self.prefix}{writer}.json")
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Every marker in the bucket."""
+        return [
+            self.s3_handler.read_json(self.bucket, obj["key"])
+            for obj in self.s3_handler.iter_objects(self.bucket, self.prefix, ".json")
+        ]
+
+
+def uncovered_gaps(index: PartitionIndex, gaps: List[Dict[str, Any]], since: str) -> List[Dict[str, Any]]:
+    """Markers with writes at or after `since` that the last rebuild did not cover."""
+    return [
+        gap for gap in gaps
+        if gap["last_write"] >= since and (index.rebuilt_at is None or gap["last_write"] >= index.rebuilt_at)
+    ]
+
+
+class LocalIndexStore:
+    """Partition index kept as a file next to local batch output."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> PartitionIndex:
+        try:
+            with open(self.path) as f:
+                return PartitionIndex.from_dict(json.load(f))
+        except FileNotFoundError:
+            return PartitionIndex()
+
+    def _write(self, index: PartitionIndex):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(index.to_dict(), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def update(self, delta: PartitionIndex) -> bool:
+        """Merge a delta into the index file under an exclusive lock."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        with open(self.path + ".lock", "w") as lock:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            index = self.load()
+            index.merge(delta)
+            self._write(index)
+
+        return True
+
+    def replace(self, index: PartitionIndex):
+        self._write(index)
+
+
+@click.group()
+def cli():
+    """Inspect or rebuild the partition index."""
+
+
+@cli.command()
+@click.option("--bucket", envvar="S3_PROCESSED_BUCKET", required=True, help="Processed bucket")
+@click.option("--aws-region", envvar="AWS_REGION", default="us-east-2", help="AWS region")
+def show(bucket: str, aws_region: str):
+    """Print per-partition counts and date bounds."""
+    from .s3_handler import S3Handler
+
+    index, _ = S3IndexStore(S3Handler(aws_region), bucket).load()
+
+    for partition, entry in sorted(index.partitions.items()):
+        click.echo(
+            f"{partition}  objects={entry['objects']}  bytes={entry['bytes']}  "
+            f"effective={entry['min_effective_date']}..{entry['max_effective_date']}  "
+            f"updated={entry['updated_at']}"
+        )
+
+
+@cli.command()
+@click.option("--bucket", envvar="S3_PROCESSED_BUCKET", required=True, help="Processed bucket")
+@click.option("--prefix", default="contracts/", show_default=True, help="Key prefix of the contract outputs")
+@click.option("--aws-region", envvar="AWS_REGION", default="us-east-2", help="AWS region")
+def rebuild(bucket: str, prefix: str, aws_region: str):
+    """Recompute the index from the objects in the bucket."""
+    from .s3_handler import S3Handler
+
+    s3_handler = S3Handler(aws_region)
+    index = PartitionIndex(rebuilt_at=utc_stamp())
+
+    for obj in s3_handler.iter_objects_parallel(bucket, prefix, ".json"):
+        data = json.loads(s3_handler.read_bytes(bucket, obj["key"]))
+        index.apply(
+            update_from_output(obj["key"], data, obj["size"], None),
+            updated_at=utc_stamp(obj["last_modified"])
+        )
+
+    S3IndexStore(s3_handler, bucket).replace(index)
+
+    gap_markers = GapMarkers(s3_handler, bucket)
+    for gap in gap_markers.load():
+        if gap["last_write"] < index.rebuilt_at:
+            gap_markers.clear(gap["writer"])
+
+    click.echo(f"Rebuilt index: {len(index)} partitions, {sum(e['objects'] for e in index.partitions.values())} objects")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,213 @@
+"""
+Compact Record Containers
+
+Column-oriented storage for the repeating parts of a contract (rate
+schedule lines and amendments). Fee-schedule exhibits can run to tens
+of thousands of lines, so rows are kept as parallel columns instead of
+one dict per line, and are validated and serialized straight from the
+columns.
+"""
+
+import json
+from array import array
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def _column_adapter(model, name: str) -> Optional[TypeAdapter]:
+    """
+    Validator for a whole column of one model field, with its type and
+    constraints (including Annotated metadata such as Field(gt=0)).
+
+    Model-level field_validators are not applied; the row models only use
+    them to normalize values, never to reject them.
+    """
+    field = model.model_fields.get(name)
+    if field is None:
+        return None
+    item = Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+    return TypeAdapter(List[item])
+
+
+class ColumnarRecords:
+    """
+    Base container holding one list per field.
+
+    Subclasses set FIELDS (output order) and may override _new_column
+    for typed storage, and _row_model to name the pydantic model a row
+    must satisfy.
+    """
+
+    FIELDS: Tuple[str, ...] = ()
+
+    __slots__ = ("_columns",)
+
+    def __init__(self):
+        self._columns = {name: self._new_column(name) for name in self.FIELDS}
+
+    def _new_column(self, name: str):
+        return []
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict[str, Any]]) -> "ColumnarRecords":
+        """Build a container from row dictionaries (e.g. a previous JSON output)."""
+        records = cls()
+        for row in rows:
+            records.append(**{name: row.get(name) for name in cls.FIELDS})
+        return records
+
+    def append(self, **values):
+        """Append one row; missing fields are stored as None."""
+        for name in self.FIELDS:
+            self._columns[name].append(values.get(name))
+
+    def column(self, name: str):
+        """Return the storage for a single field."""
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return len(self._columns[self.FIELDS[0]]) if self.FIELDS else 0
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Iterate rows as tuples in FIELDS order."""
+        return zip(*(self._columns[name] for name in self.FIELDS))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ColumnarRecords):
+            return NotImplemented
+        return self.FIELDS == other.FIELDS and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(rows={len(self)})"
+
+    def __getstate__(self):
+        return self._columns
+
+    def __setstate__(self, state):
+        self._columns = state
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize rows as dictionaries (for debugging and small tables)."""
+        return [dict(zip(self.FIELDS, row)) for row in self]
+
+    def iter_json(self) -> Iterator[str]:
+        """Yield one compact JSON object per row without building dicts."""
+        keys = [json.dumps(name) + ": " for name in self.FIELDS]
+        dumps = json.dumps
+
+        for row in self:
+            yield "{" + ", ".join(k + dumps(v, default=str) for k, v in zip(keys, row)) + "}"
+
+    @classmethod
+    def _row_model(cls):
+        """Pydantic model for one row, or None to skip validation."""
+        return None
+
+    def validate(self, prefix: str) -> List[Tuple[str, str, str]]:
+        """
+        Check every column against the row model's field types and
+        constraints, one validator call per column.
+
+        Returns:
+            List of (field path, message, error type) tuples, with paths
+            as pydantic reports them for a list of row dicts
+        """
+        model = self._row_model()
+        if model is None:
+            return []
+
+        errors = []
+        for name in self.FIELDS:
+            adapter = _column_adapter(model, name)
+            if adapter is None:
+                continue
+
+            column = self._columns[name]
+            try:
+                adapter.validate_python(column if isinstance(column, list) else list(column))
+            except ValidationError as e:
+                for error in e.errors(include_url=False, include_input=False):
+                    row = error["loc"][0]
+                    errors.append((row, (f"{prefix}.{row}.{name}", error["msg"], error["type"])))
+
+        # Report in row order, like validating the rows one after another
+        errors.sort(key=lambda error: error[0])
+        return [error for _, error in errors]
+
+
+class RateScheduleColumns(ColumnarRecords):
+    """Rate schedule lines, with amounts stored in a packed double array."""
+
+    FIELDS = ("service_category", "cpt_code", "rate_type", "rate_amount", "effective_date", "modifier")
+
+    __slots__ = ()
+
+    def _new_column(self, name: str):
+        if name == "rate_amount":
+            return array("d")
+        return []
+
+    def append(self, **values):
+        if values.get("rate_amount") is None:
+            raise ValueError("rate_amount is required for a rate schedule line")
+        super().append(**values)
+
+    @classmethod
+    def _row_model(cls):
+        from .contract_schema import RateSchedule
+
+        return RateSchedule
+
+
+class AmendmentColumns(ColumnarRecords):
+    """Amendments extracted from contract text."""
+
+    FIELDS = ("amendment_id", "effective_date", "description", "amendment_type")
+
+    __slots__ = ()
+
+    @classmethod
+    def _row_model(cls):
+        from .contract_schema import Amendment
+
+        return Amendment
+
+
+def _default(value: Any):
+    if isinstance(value, ColumnarRecords):
+        return value.to_dicts()
+    return str(value)
+
+
+def dumps_json(data: Dict[str, Any], indent: Optional[int] = 2, sort_keys: bool = False) -> str:
+    """
+    Serialize a contract dictionary, streaming columnar fields row by row.
+
+    Plain dictionaries produce the same output as
+    json.dumps(data, indent=indent, default=str).
+    """
+    if not any(isinstance(v, ColumnarRecords) for v in data.values()):
+        return json.dumps(data, indent=indent, default=_default, sort_keys=sort_keys)
+
+    pad = "\n" + " " * indent if indent else ""
+    row_pad = pad + " " * indent if indent else ""
+    items = sorted(data.items()) if sort_keys else data.items()
+
+    parts = []
+    for key, value in items:
+        if isinstance(value, ColumnarRecords):
+            if len(value):
+                body = "[" + row_pad + ("," + row_pad if indent else ", ").join(value.iter_json()) + pad + "]"
+            else:
+                body = "[]"
+        else:
+            body = json.dumps(value, indent=indent, default=_default, sort_keys=sort_keys)
+            if indent:
+                body = body.replace("\n", pad)
+        parts.append(json.dumps(key) + ": " + body)
+
+    closing = "\n}" if indent else "}"
+    return "{" + pad + ("," + pad if indent else ", ").join(parts) + closing
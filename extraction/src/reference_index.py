@@ -0,0 +1,341 @@
+"""
+Reference Index
+
+Loads the dbt reference seeds (payers, payer aliases and service
+categories) once per worker and resolves payer mentions in contract text
+with an Aho-Corasick multi-pattern matcher, so resolution is a single
+pass over the document regardless of how many payers are known.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+import structlog
+
+from .normalization import ServiceNormalizer
+
+# pyahocorasick is an optional C implementation of the automaton
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+# Seeds live in the dbt project; containers can point at a copy instead
+DEFAULT_SEED_DIR = Path(__file__).resolve().parents[2] / "dbt_project" / "seeds"
+
+# Snapshot of the seeds shipped with the extraction image, which is built
+# from extraction/ alone and so has no dbt project (regenerate with
+# `python -m src.reference_index snapshot` after editing the seeds)
+BUNDLED_SNAPSHOT = Path(__file__).resolve().parents[1] / "reference" / "snapshot.json"
+
+# Payer mentions this close to the start of the text are in the parties
+# clause and header, where the contracting payer is named
+PAYER_HEADER_CHARS = 1000
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so patterns match across line breaks and tabs."""
+    return WHITESPACE_RE.sub(" ", text.lower())
+
+
+@dataclass(frozen=True)
+class PayerMatch:
+    """A payer mention resolved to its canonical reference row."""
+
+    payer_id: str
+    payer_name: str
+    alias: str
+    start: int
+
+
+class AhoCorasickMatcher:
+    """
+    Case-insensitive whole-word multi-pattern matcher.
+
+    Uses pyahocorasick when installed, otherwise a pure-Python automaton.
+    Patterns map to an arbitrary value returned with each match.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        self._patterns = {normalize_text(p).strip(): v for p, v in patterns.items() if p.strip()}
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, value in self._patterns.items():
+                self._automaton.add_word(pattern, (pattern, value))
+            if self._patterns:
+                self._automaton.make_automaton()
+        else:
+            self._build()
+
+    def _build(self):
+        """Build goto, failure and output tables for the pure-Python automaton."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+
+        for pattern, value in self._patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((pattern, value))
+
+        # Breadth-first pass to compute failure links; depth-1 states fail to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0) if state else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _iter_raw(self, text: str) -> Iterator[Tuple[int, str, str]]:
+        """Yield (end index, pattern, value) for every occurrence."""
+        if not self._patterns:
+            return
+
+        if AHOCORASICK_AVAILABLE:
+            for end, (pattern, value) in self._automaton.iter(text):
+                yield end, pattern, value
+            return
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern, value in out[state]:
+                yield i, pattern, value
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield whole-word matches in a single pass.
+
+        Returns:
+            Iterator of (start offset in normalized text, pattern, value)
+        """
+        normalized = normalize_text(text)
+
+        for end, pattern, value in self._iter_raw(normalized):
+            start = end - len(pattern) + 1
+            if start > 0 and normalized[start - 1].isalnum():
+                continue
+            if end + 1 < len(normalized) and normalized[end + 1].isalnum():
+                continue
+            yield start, pattern, value
+
+
+class ReferenceIndex:
+    """
+    In-memory index over the reference seeds.
+
+    Built from the dbt seed CSVs or from a JSON snapshot of them.
+    """
+
+    def __init__(
+        self,
+        payers: Dict[str, str],
+        payer_aliases: Optional[Dict[str, str]] = None,
+        service_categories: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            payers: payer_id -> canonical payer_name
+            payer_aliases: alias -> payer_id
+            service_categories: category_code -> category_name
+        """
+        self.payers = dict(payers)
+        self.payer_aliases = dict(payer_aliases or {})
+        self.services = ServiceNormalizer(service_categories or {})
+
+        patterns = {name: payer_id for payer_id, name in self.payers.items()}
+        patterns.update(self.payer_aliases)
+        self._payer_matcher = AhoCorasickMatcher(patterns)
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Short digest of the reference contents, for keying derived caches."""
+        if self._fingerprint is None:
+            contents = json.dumps(
+                [self.payers, self.payer_aliases, self.services.service_categories],
+                sort_keys=True
+            )
+            self._fingerprint = hashlib.sha256(contents.encode("utf-8")).hexdigest()[:16]
+        return self._fingerprint
+
+    @classmethod
+    def from_seed_dir(cls, seed_dir: str) -> "ReferenceIndex":
+        """Load ref_payers.csv and the optional alias and service category seeds."""
+        seed_dir = Path(seed_dir)
+
+        with open(seed_dir / "ref_payers.csv", newline="") as f:
+            payers = {row["payer_id"]: row["payer_name"] for row in csv.DictReader(f)}
+
+        aliases = {}
+        alias_path = seed_dir / "ref_payer_aliases.csv"
+        if alias_path.exists():
+            with open(alias_path, newline="") as f:
+                aliases = {row["alias"]: row["payer_id"] for row in csv.DictReader(f)}
+
+        categories = {}
+        category_path = seed_dir / "ref_service_categories.csv"
+        if category_path.exists():
+            with open(category_path, newline="") as f:
+                categories = {row["category_code"]: row["category_name"] for row in csv.DictReader(f)}
+
+        return cls(payers, aliases, categories)
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> "ReferenceIndex":
+        """Load an index previously written by save_snapshot."""
+        with open(path) as f:
+            snapshot = json.load(f)
+        return cls(
+            snapshot["payers"],
+            snapshot.get("payer_aliases"),
+            snapshot.get("service_categories")
+        )
+
+    def save_snapshot(self, path: str):
+        """Write the index contents as JSON for containers without the dbt project."""
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "payers": self.payers,
+                    "payer_aliases": self.payer_aliases,
+                    "service_categories": self.services.service_categories,
+                },
+                f,
+                indent=2
+            )
+
+    def iter_payers(self, text: str) -> Iterator[PayerMatch]:
+        """Yield every payer mention, ordered by where the mention ends."""
+        for start, alias, payer_id in self._payer_matcher.iter_matches(text):
+            yield PayerMatch(payer_id, self.payers.get(payer_id, alias), alias, start)
+
+    def resolve_payer(self, text: str) -> Optional[PayerMatch]:
+        """
+        Resolve the payer named in a document.
+
+        Payers are ranked by mentions in the first PAYER_HEADER_CHARS
+        characters (the parties clause), then by mentions anywhere, then
+        by earliest mention, so a competitor named once in the recitals
+        or a prior-agreement reference does not outrank the payer the
+        contract is with. A mention inside a longer one counts only as
+        the longer alias ("Anthem Blue Cross" is not a "Blue Cross"
+        mention).
+
+        Returns:
+            The chosen payer's earliest mention, or None
+        """
+        ranks: Dict[str, list] = {}
+        covered_to = -1
+
+        for match in sorted(self.iter_payers(text), key=lambda m: (m.start, -len(m.alias))):
+            if match.start < covered_to:
+                continue
+            covered_to = match.start + len(match.alias)
+
+            rank = ranks.setdefault(match.payer_id, [0, 0, match])
+            rank[0] += match.start < PAYER_HEADER_CHARS
+            rank[1] += 1
+
+        if not ranks:
+            return None
+        return max(ranks.values(), key=lambda r: (r[0], r[1], -r[2].start))[2]
+
+
+@lru_cache(maxsize=1)
+def get_reference_index() -> Optional[ReferenceIndex]:
+    """
+    Load the reference index once per worker process.
+
+    Sources, in order: REFERENCE_SNAPSHOT (JSON file), REFERENCE_SEED_DIR,
+    the dbt project seeds next to the source tree, then the snapshot
+    bundled with the extraction image.
+
+    Returns:
+        ReferenceIndex, or None when no reference data is available
+    """
+    snapshot = os.environ.get("REFERENCE_SNAPSHOT")
+    seed_dir = os.environ.get("REFERENCE_SEED_DIR")
+
+    if not snapshot and not seed_dir:
+        if DEFAULT_SEED_DIR.is_dir():
+            seed_dir = str(DEFAULT_SEED_DIR)
+        else:
+            snapshot = str(BUNDLED_SNAPSHOT)
+
+    source = snapshot or seed_dir
+
+    try:
+        if snapshot:
+            index = ReferenceIndex.from_snapshot(snapshot)
+        else:
+            index = ReferenceIndex.from_seed_dir(seed_dir)
+    except (OSError, KeyError, ValueError) as e:
+        # Extraction still runs, but payers and service categories come
+        # back as raw text that the warehouse cannot join to its seeds
+        logger.error(
+            "Reference data not available; payer resolution and service normalization disabled",
+            source=source,
+            error=str(e)
+        )
+        return None
+
+    logger.info(
+        "Reference index loaded",
+        source=source,
+        payers=len(index.payers),
+        aliases=len(index.payer_aliases),
+        service_categories=len(index.services.service_categories),
+        native_matcher=AHOCORASICK_AVAILABLE
+    )
+    return index
+
+
+@click.group()
+def cli():
+    """Build the reference data snapshot."""
+
+
+@cli.command()
+@click.option("--seed-dir", default=str(DEFAULT_SEED_DIR), show_default=True, help="dbt seeds directory")
+@click.option("--output", default=str(BUNDLED_SNAPSHOT), show_default=True, help="Snapshot path")
+def snapshot(seed_dir: str, output: str):
+    """Write the seeds as a JSON snapshot (the image bundles the default output)."""
+    index = ReferenceIndex.from_seed_dir(seed_dir)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    index.save_snapshot(output)
+    click.echo(f"Wrote {output}: {len(index.payers)} payers, fingerprint {index.fingerprint}")
+
+
+if __name__ == "__main__":
+    cli()
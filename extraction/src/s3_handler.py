@@ -6,15 +6,50 @@ Manages S3 read/write operations for the extraction pipeline.
 
 import json
 import os
+import queue
 import tempfile
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import boto3
 from botocore.exceptions import ClientError
 import structlog
 
+from . import tracing
+from .records import dumps_json
+
 logger = structlog.get_logger(__name__)
 
+DEFAULT_LIST_WORKERS = 8
+LIST_PREFETCH_PAGES = 4
+
+DEFAULT_HEAD_WORKERS = 16
+DELETE_BATCH_SIZE = 1000  # delete_objects limit per request
+# Folders with at least this many keys to check are listed instead of
+# HEAD-ing every key (one LIST page covers up to 1000 keys)
+EXISTS_LIST_THRESHOLD = 20
+# Most LIST pages spent on one folder before its remaining keys are HEAD-ed,
+# so a huge folder with a handful of wanted keys cannot turn into a full scan
+EXISTS_MAX_LIST_PAGES = 5
+
+_END_OF_PREFIX = object()
+
+
+def _object_entry(obj: dict) -> Dict[str, Any]:
+    """Listing entry from a list_objects_v2 Contents item."""
+    return {
+        'key': obj['Key'],
+        'size': obj['Size'],
+        'etag': obj.get('ETag', '').strip('"'),
+        'last_modified': obj['LastModified'],
+    }
+
+
+def _before_start(prefix: str, start_after: Optional[str]) -> bool:
+    """True if every key under a prefix sorts at or before start_after."""
+    return start_after is not None and start_after > prefix and not start_after.startswith(prefix)
+
 
 class S3Handler:
     """
@@ -55,7 +90,9 @@ class S3Handler:
         logger.info("Downloading from S3", bucket=bucket, key=key, local_path=local_path)
         
         try:
-            self.s3_client.download_file(bucket, key, local_path)
+            with tracing.span("s3.download_file", bucket=bucket, key=key) as call:
+                self.s3_client.download_file(bucket, key, local_path)
+                call.set(bytes=os.path.getsize(local_path))
             logger.info("Download complete", local_path=local_path)
             return local_path
             
@@ -85,12 +122,13 @@ class S3Handler:
             extra_args['ContentType'] = content_type
         
         try:
-            self.s3_client.upload_file(
-                local_path, 
-                bucket, 
-                key,
-                ExtraArgs=extra_args if extra_args else None
-            )
+            with tracing.span("s3.upload_file", bucket=bucket, key=key, bytes=os.path.getsize(local_path)):
+                self.s3_client.upload_file(
+                    local_path, 
+                    bucket, 
+                    key,
+                    ExtraArgs=extra_args if extra_args else None
+                )
             logger.info("Upload complete", bucket=bucket, key=key)
             
         except ClientError as e:
@@ -102,26 +140,32 @@ class S3Handler:
             )
             raise
     
-    def upload_json(self, bucket: str, key: str, data: dict):
+    def upload_json(self, bucket: str, key: str, data: dict, metadata: Optional[dict] = None) -> int:
         """
         Upload JSON data to S3.
         
         Args:
             bucket: S3 bucket name
             key: S3 object key
-            data: Dictionary to serialize as JSON
+            data: Dictionary to serialize as JSON (may hold columnar records)
+            metadata: Optional S3 user metadata
+            
+        Returns:
+            Size of the uploaded object in bytes
         """
         logger.info("Uploading JSON to S3", bucket=bucket, key=key)
         
         try:
-            json_bytes = json.dumps(data, indent=2, default=str).encode('utf-8')
+            json_bytes = dumps_json(data).encode('utf-8')
             
-            self.s3_client.put_object(
-                Bucket=bucket,
-                Key=key,
-                Body=json_bytes,
-                ContentType='application/json'
-            )
+            with tracing.span("s3.put_object", bucket=bucket, key=key, bytes=len(json_bytes)):
+                self.s3_client.put_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Body=json_bytes,
+                    ContentType='application/json',
+                    Metadata=metadata or {}
+                )
             
             logger.info(
                 "JSON upload complete",
@@ -129,6 +173,7 @@ class S3Handler:
                 key=key,
                 size_bytes=len(json_bytes)
             )
+            return len(json_bytes)
             
         except ClientError as e:
             logger.error(
@@ -153,9 +198,11 @@ class S3Handler:
         logger.info("Reading JSON from S3", bucket=bucket, key=key)
         
         try:
-            response = self.s3_client.get_object(Bucket=bucket, Key=key)
-            content = response['Body'].read().decode('utf-8')
-            data = json.loads(content)
+            with tracing.span("s3.get_object", bucket=bucket, key=key) as call:
+                response = self.s3_client.get_object(Bucket=bucket, Key=key)
+                content = response['Body'].read()
+                call.set(bytes=len(content))
+            data = json.loads(content.decode('utf-8'))
             
             logger.info("JSON read complete", bucket=bucket, key=key)
             return data
@@ -183,25 +230,67 @@ class S3Handler:
         """
         logger.info("Listing S3 objects", bucket=bucket, prefix=prefix)
         
-        keys = []
-        paginator = self.s3_client.get_paginator('list_objects_v2')
+        keys = [obj['key'] for obj in self.iter_objects(bucket, prefix, suffix)]
         
-        try:
-            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                for obj in page.get('Contents', []):
-                    key = obj['Key']
-                    if suffix and not key.endswith(suffix):
-                        continue
-                    keys.append(key)
+        logger.info(
+            "List complete",
+            bucket=bucket,
+            prefix=prefix,
+            count=len(keys)
+        )
+        return keys
+    
+    def list_object_metadata(self, bucket: str, prefix: str = "", suffix: str = "") -> list:
+        """
+        List objects with their size, ETag and modification time.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix filter
+            suffix: Key suffix filter (e.g., ".json")
             
-            logger.info(
-                "List complete",
-                bucket=bucket,
-                prefix=prefix,
-                count=len(keys)
-            )
-            return keys
+        Returns:
+            List of dicts with key, size, etag and last_modified (UTC datetime)
+        """
+        return list(self.iter_objects(bucket, prefix, suffix))
+    
+    def iter_objects(
+        self,
+        bucket: str,
+        prefix: str = "",
+        suffix: str = "",
+        start_after: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream objects under a prefix in key order, one page at a time.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix filter
+            suffix: Key suffix filter (e.g., ".json")
+            start_after: Resume after this key (exclusive)
             
+        Yields:
+            Dicts with key, size, etag and last_modified (UTC datetime)
+        """
+        for page in self._iter_pages(bucket, prefix, start_after):
+            for obj in page:
+                if suffix and not obj['key'].endswith(suffix):
+                    continue
+                yield obj
+    
+    def _iter_pages(self, bucket: str, prefix: str, start_after: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        """Pages of listing entries under one prefix."""
+        params = {'Bucket': bucket, 'Prefix': prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        
+        try:
+            for page in paginator.paginate(**params):
+                yield [_object_entry(obj) for obj in page.get('Contents', [])]
+                
         except ClientError as e:
             logger.error(
                 "Failed to list S3 objects",
@@ -211,6 +300,171 @@ class S3Handler:
             )
             raise
     
+    def discover_prefixes(
+        self,
+        bucket: str,
+        prefix: str = "",
+        depth: int = 1,
+        start_after: Optional[str] = None
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Find sub-prefixes with delimiter listings, e.g. the payer= and
+        contract_date= partition folders under contracts/.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Prefix to split
+            depth: Number of "/" levels to descend
+            start_after: Skip prefixes and objects that sort at or before this key
+            
+        Returns:
+            Tuple of (sub-prefixes, objects found directly above the deepest
+            level), both sorted by key
+        """
+        prefixes = [prefix]
+        loose = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        
+        for _ in range(depth):
+            next_prefixes = []
+            for parent in prefixes:
+                for page in paginator.paginate(Bucket=bucket, Prefix=parent, Delimiter='/'):
+                    for common in page.get('CommonPrefixes', []):
+                        if not _before_start(common['Prefix'], start_after):
+                            next_prefixes.append(common['Prefix'])
+                    for obj in page.get('Contents', []):
+                        if start_after is None or obj['Key'] > start_after:
+                            loose.append(_object_entry(obj))
+            prefixes = next_prefixes
+        
+        return sorted(prefixes), sorted(loose, key=lambda obj: obj['key'])
+    
+    def iter_objects_parallel(
+        self,
+        bucket: str,
+        prefix: str = "",
+        suffix: str = "",
+        start_after: Optional[str] = None,
+        prefixes: Optional[Sequence[str]] = None,
+        depth: int = 1,
+        max_workers: int = DEFAULT_LIST_WORKERS
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream objects under a large prefix, listing sub-prefixes concurrently.
+        
+        Sub-prefixes are the given partition prefixes, or are discovered
+        with delimiter listings `depth` levels below `prefix`. Later prefixes
+        are listed ahead (a few pages each) while earlier ones are consumed,
+        and results are still yielded in key order, so the last key seen is
+        a valid `start_after` checkpoint for resuming.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix to list
+            suffix: Key suffix filter (e.g., ".json")
+            start_after: Resume after this key (exclusive)
+            prefixes: Known sub-prefixes to list instead of discovering them
+            depth: Delimiter levels to descend when discovering prefixes
+            max_workers: Concurrent listing threads
+            
+        Yields:
+            Dicts with key, size, etag and last_modified (UTC datetime)
+        """
+        if prefixes is None:
+            prefixes, loose = self.discover_prefixes(bucket, prefix, depth, start_after)
+        else:
+            prefixes = sorted(p for p in prefixes if not _before_start(p, start_after))
+            loose = []
+        
+        # Interleave loose objects with prefixes; keys under a prefix sort
+        # together with it, so the merged sequence stays in key order
+        segments = sorted(
+            [(p, None) for p in prefixes] + [(obj['key'], obj) for obj in loose],
+            key=lambda segment: segment[0]
+        )
+        
+        stop = threading.Event()
+        
+        def list_prefix(sub_prefix: str, pages: queue.Queue):
+            def put(item):
+                while not stop.is_set():
+                    try:
+                        pages.put(item, timeout=0.5)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+            
+            try:
+                for page in self._iter_pages(bucket, sub_prefix, start_after):
+                    if not put(page):
+                        return
+            except Exception as e:
+                put(e)
+                return
+            put(_END_OF_PREFIX)
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-list")
+        try:
+            # Submitted in key order, so the prefix being consumed is always
+            # running or finished and never waits behind prefetching ones
+            pending = []
+            for key, obj in segments:
+                if obj is None:
+                    pages = queue.Queue(maxsize=LIST_PREFETCH_PAGES)
+                    executor.submit(list_prefix, key, pages)
+                    pending.append((key, pages))
+                else:
+                    pending.append((key, obj))
+            
+            count = 0
+            for key, source in pending:
+                if isinstance(source, dict):
+                    if not suffix or key.endswith(suffix):
+                        count += 1
+                        yield source
+                    continue
+                
+                while True:
+                    page = source.get()
+                    if page is _END_OF_PREFIX:
+                        break
+                    if isinstance(page, Exception):
+                        raise page
+                    for obj in page:
+                        if suffix and not obj['key'].endswith(suffix):
+                            continue
+                        count += 1
+                        yield obj
+            
+            logger.info(
+                "Parallel list complete",
+                bucket=bucket,
+                prefix=prefix,
+                prefixes=len(prefixes),
+                count=count
+            )
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def read_bytes(self, bucket: str, key: str) -> bytes:
+        """
+        Read an object's body.
+        
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            
+        Returns:
+            Object contents
+        """
+        with tracing.span("s3.get_object", bucket=bucket, key=key) as call:
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            body = response['Body'].read()
+            call.set(bytes=len(body))
+        return body
+    
     def object_exists(self, bucket: str, key: str) -> bool:
         """
         Check if an object exists in S3.
@@ -230,6 +484,177 @@ class S3Handler:
                 return False
             raise
     
+    def objects_exist(
+        self,
+        bucket: str,
+        keys: Sequence[str],
+        max_workers: int = DEFAULT_HEAD_WORKERS,
+        list_threshold: int = EXISTS_LIST_THRESHOLD,
+        max_list_pages: int = EXISTS_MAX_LIST_PAGES
+    ) -> Dict[str, Optional[bool]]:
+        """
+        Check many keys for existence with few round-trips.
+        
+        Keys are grouped by folder. A folder with at least list_threshold
+        keys to check is listed over just the range its keys span, for at
+        most min(max_list_pages, keys in the folder) pages, so listing
+        never costs more requests than HEAD-ing. Keys the listing did not
+        reach, keys in small folders and keys at the bucket root (never
+        listed, as that would scan the whole bucket) are checked with
+        concurrent HEAD requests on a bounded pool.
+        
+        Args:
+            bucket: S3 bucket name
+            keys: Object keys to check
+            max_workers: Concurrent LIST and HEAD requests
+            list_threshold: Minimum keys in a folder to list it instead
+            max_list_pages: Listing budget per folder
+            
+        Returns:
+            Dict mapping each key to True if it exists, False if not, or
+            None if its check failed (e.g. 403 or 500; the error is logged)
+        """
+        by_folder: Dict[str, List[str]] = {}
+        for key in dict.fromkeys(keys):
+            folder = key.rsplit('/', 1)[0] + '/' if '/' in key else ''
+            by_folder.setdefault(folder, []).append(key)
+        
+        listed = [
+            folder for folder, group in by_folder.items()
+            if folder and len(group) >= list_threshold and max_list_pages > 0
+        ]
+        head_keys = [key for folder, group in by_folder.items() if folder not in listed for key in group]
+        
+        results: Dict[str, Optional[bool]] = {}
+        errors = 0
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-exists") as executor:
+            listings = executor.map(
+                lambda folder: self._list_range(bucket, folder, by_folder[folder], max_list_pages),
+                listed
+            )
+            for found, unresolved in listings:
+                results.update(found)
+                head_keys.extend(unresolved)
+            
+            for key, exists, error in executor.map(lambda k: self._check_exists(bucket, k), head_keys):
+                results[key] = exists
+                if error is not None:
+                    errors += 1
+                    logger.warning("Existence check failed", bucket=bucket, key=key, error=error)
+        
+        logger.info(
+            "Existence check complete",
+            bucket=bucket,
+            keys=len(results),
+            existing=sum(1 for exists in results.values() if exists),
+            errors=errors,
+            listed_folders=len(listed),
+            head_requests=len(head_keys)
+        )
+        return results
+    
+    def _list_range(
+        self,
+        bucket: str,
+        folder: str,
+        keys: List[str],
+        max_pages: int
+    ) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Resolve keys in one folder by listing the key range they span.
+        
+        Returns:
+            Tuple of (key -> exists for keys the listing covered, keys left
+            for HEAD requests because the page budget ran out or the
+            listing failed)
+        """
+        wanted = sorted(keys)
+        # Any string sorting just below the first key; a proper prefix of it
+        # still starts with the folder
+        start_after = wanted[0][:-1]
+        budget = min(max_pages, len(wanted))
+        
+        present = set()
+        listed_through = None
+        try:
+            for pages, page in enumerate(self._iter_pages(bucket, folder, start_after), start=1):
+                present.update(obj['key'] for obj in page)
+                listed_through = page[-1]['key'] if page else None
+                if listed_through is None or listed_through >= wanted[-1] or pages >= budget:
+                    break
+            else:
+                listed_through = None
+        except Exception as e:
+            logger.warning("Existence listing failed, using HEAD requests", bucket=bucket, prefix=folder, error=str(e))
+            return {}, wanted
+        
+        # listed_through is None once the listing reached the end of the folder
+        found = {
+            key: key in present for key in wanted
+            if listed_through is None or key <= listed_through
+        }
+        return found, [key for key in wanted if key not in found]
+    
+    def _check_exists(self, bucket: str, key: str) -> Tuple[str, Optional[bool], Optional[str]]:
+        """HEAD one key, returning (key, exists, error) instead of raising."""
+        try:
+            return key, self.object_exists(bucket, key), None
+        except Exception as e:
+            return key, None, str(e)
+    
+    def head_object(self, bucket: str, key: str) -> Optional[dict]:
+        """
+        Get an object's size and user metadata with a HEAD request.
+        
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            
+        Returns:
+            Dict with size and metadata, or None if the object does not exist
+        """
+        with tracing.span("s3.head_object", bucket=bucket, key=key) as call:
+            try:
+                response = self.s3_client.head_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                    call.set(found=False)
+                    return None
+                raise
+            call.set(found=True, size=response['ContentLength'])
+        return {'size': response['ContentLength'], 'metadata': response.get('Metadata', {})}
+    
+    def get_object_metadata(self, bucket: str, key: str) -> Optional[dict]:
+        """
+        Get an object's user metadata with a HEAD request.
+        
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            
+        Returns:
+            User metadata dict, or None if the object does not exist
+        """
+        head = self.head_object(bucket, key)
+        return head['metadata'] if head is not None else None
+    
+    def get_object_size(self, bucket: str, key: str) -> int:
+        """
+        Get the size of an object with a HEAD request.
+        
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            
+        Returns:
+            Object size in bytes
+        """
+        with tracing.span("s3.head_object", bucket=bucket, key=key) as call:
+            response = self.s3_client.head_object(Bucket=bucket, Key=key)
+            call.set(found=True, size=response['ContentLength'])
+        return response['ContentLength']
+    
     def delete_object(self, bucket: str, key: str):
         """
         Delete an object from S3.
@@ -252,3 +677,92 @@ class S3Handler:
                 error=str(e)
             )
             raise
+    
+    def delete_objects(self, bucket: str, keys: Sequence[str]) -> Dict[str, str]:
+        """
+        Delete many objects with batched delete_objects requests.
+        
+        Args:
+            bucket: S3 bucket name
+            keys: Object keys to delete (sent in chunks of 1000)
+            
+        Returns:
+            Dict of keys that could not be deleted, mapped to "Code: Message";
+            empty when everything was deleted
+        """
+        keys = list(dict.fromkeys(keys))
+        errors: Dict[str, str] = {}
+        
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            chunk = keys[start:start + DELETE_BATCH_SIZE]
+            errors.update(self._delete_chunk(bucket, chunk))
+        
+        logger.info(
+            "Bulk delete complete",
+            bucket=bucket,
+            requested=len(keys),
+            deleted=len(keys) - len(errors),
+            failed=len(errors)
+        )
+        return errors
+    
+    def delete_prefix(self, bucket: str, prefix: str, suffix: str = "") -> Tuple[int, Dict[str, str]]:
+        """
+        Delete everything under a prefix (e.g. an old partition) while listing it.
+        
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix to remove; must not be empty
+            suffix: Only delete keys with this suffix
+            
+        Returns:
+            Tuple of (number deleted, per-key errors)
+        """
+        if not prefix:
+            raise ValueError("Refusing to delete an entire bucket; pass a prefix")
+        
+        deleted = 0
+        errors: Dict[str, str] = {}
+        chunk: List[str] = []
+        
+        def flush():
+            nonlocal deleted
+            failed = self._delete_chunk(bucket, chunk)
+            deleted += len(chunk) - len(failed)
+            errors.update(failed)
+            chunk.clear()
+        
+        for obj in self.iter_objects(bucket, prefix, suffix):
+            chunk.append(obj['key'])
+            if len(chunk) == DELETE_BATCH_SIZE:
+                flush()
+        if chunk:
+            flush()
+        
+        logger.info("Prefix delete complete", bucket=bucket, prefix=prefix, deleted=deleted, failed=len(errors))
+        return deleted, errors
+    
+    def _delete_chunk(self, bucket: str, keys: List[str]) -> Dict[str, str]:
+        """One delete_objects request; returns per-key errors."""
+        try:
+            with tracing.span("s3.delete_objects", bucket=bucket, keys=len(keys)):
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+                )
+        except ClientError as e:
+            logger.error(
+                "Failed to delete S3 objects",
+                bucket=bucket,
+                keys=len(keys),
+                error=str(e)
+            )
+            raise
+        
+        errors = {
+            error['Key']: f"{error.get('Code')}: {error.get('Message')}"
+            for error in response.get('Errors', [])
+        }
+        for key, error in errors.items():
+            logger.warning("Failed to delete S3 object", bucket=bucket, key=key, error=error)
+        return errors
@@ -0,0 +1,253 @@
+"""
+Shard Routing
+
+Spreads intake across N shard queues, each consumed by its own worker
+group, so every group sees a stable slice of the key space and its
+parse cache and reference lookups stay warm for that slice.
+
+Keys are placed on a consistent-hash ring by the full key (the default)
+or by their payer prefix, the parent folder of keys laid out as
+incoming/<payer>/<file>.pdf. Adding or removing a shard only moves the
+keys of the ring segments it owns.
+
+Worker groups announce themselves with heartbeat objects in S3
+(_shards/{shard}/{worker}). The router keeps only shards with a recent
+heartbeat on the ring; when a shard goes quiet its queued messages are
+re-routed to the remaining shards, and it rejoins on its next heartbeat.
+"""
+
+import bisect
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+import structlog
+
+from .scheduler import key_prefix
+
+logger = structlog.get_logger(__name__)
+
+SHARD_BY_PREFIX = "prefix"
+SHARD_BY_KEY = "key"
+SHARD_BY_MODES = (SHARD_BY_PREFIX, SHARD_BY_KEY)
+
+DEFAULT_VNODES = 64
+HEARTBEAT_PREFIX = "_shards/"
+HEARTBEAT_SECONDS = 30
+HEARTBEAT_TTL_SECONDS = 90
+REFRESH_SECONDS = 30
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+def routing_key(s3_key: str, by: str = SHARD_BY_KEY) -> str:
+    """
+    Part of an S3 key that decides its shard.
+
+    Prefix routing needs a payer folder below the intake root
+    (incoming/<payer>/<file>.pdf). Keys without one, such as flat
+    incoming/<file>.pdf intake, are routed by the whole key so they still
+    spread over every shard instead of all hashing to "incoming".
+    """
+    if by == SHARD_BY_PREFIX and s3_key.count("/") >= 2:
+        return key_prefix(s3_key)
+    return s3_key
+
+
+def parse_shard_queues(spec: str) -> Dict[str, str]:
+    """Parse "shard-a=url,shard-b=url" into a shard -> queue URL mapping."""
+    queues = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f"Expected shard=queue_url, got {entry!r}")
+        queues[name.strip()] = url.strip()
+    return queues
+
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes.
+
+    Args:
+        shards: Initial shard names
+        vnodes: Points per shard; more points even out the key spread
+    """
+
+    def __init__(self, shards: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._shards: Set[str] = set()
+        for shard in shards:
+            self.add(shard)
+
+    @property
+    def shards(self) -> Set[str]:
+        return set(self._shards)
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def add(self, shard: str):
+        if shard in self._shards:
+            return
+        self._shards.add(shard)
+        for i in range(self.vnodes):
+            point = _hash(f"{shard}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, shard)
+
+    def remove(self, shard: str):
+        if shard not in self._shards:
+            return
+        self._shards.discard(shard)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != shard]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def shard_for(self, key: str) -> str:
+        """Owner of a routing key (first ring point clockwise from its hash)."""
+        if not self._points:
+            raise LookupError("Hash ring has no shards")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ShardMembership:
+    """
+    Worker heartbeats kept as small objects in S3.
+
+    Args:
+        s3_handler: S3Handler for the bucket holding the heartbeats
+        bucket: Bucket for the heartbeats (the processed bucket)
+        ttl_seconds: A shard is live while any worker heartbeat is younger
+    """
+
+    def __init__(self, s3_handler, bucket: str, ttl_seconds: int = HEARTBEAT_TTL_SECONDS):
+        self.s3_handler = s3_handler
+        self.bucket = bucket
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, shard: str, worker_id: str) -> str:
+        return f"{HEARTBEAT_PREFIX}{shard}/{worker_id}"
+
+    def heartbeat(self, shard: str, worker_id: str):
+        """Record that a worker of a shard is alive."""
+        self.s3_handler.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(shard, worker_id),
+            Body=json.dumps({"shard": shard, "worker": worker_id, "at": time.time()}).encode("utf-8"),
+            ContentType="application/json"
+        )
+
+    def leave(self, shard: str, worker_id: str):
+        """Remove a worker's heartbeat on clean shutdown."""
+        self.s3_handler.s3_client.delete_object(Bucket=self.bucket, Key=self._key(shard, worker_id))
+
+    def live_shards(self, delete_expired: bool = False) -> Dict[str, int]:
+        """
+        Shards with recent heartbeats, mapped to their live worker count.
+
+        Args:
+            delete_expired: Remove heartbeats older than the TTL (left by
+                workers that stopped without leaving, e.g. after a crash)
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        live: Dict[str, int] = {}
+        expired: List[str] = []
+
+        for obj in self.s3_handler.iter_objects(self.bucket, HEARTBEAT_PREFIX):
+            shard = obj["key"][len(HEARTBEAT_PREFIX):].split("/", 1)[0]
+            if obj["last_modified"] >= cutoff:
+                live[shard] = live.get(shard, 0) + 1
+            else:
+                expired.append(obj["key"])
+
+        if delete_expired and expired:
+            errors = self.s3_handler.delete_objects(self.bucket, expired)
+            logger.info("Deleted expired shard heartbeats", deleted=len(expired) - len(errors), failed=len(errors))
+
+        return live
+
+
+class ShardRouter:
+    """
+    Maps S3 keys to shard queues, following shard membership.
+
+    Args:
+        shard_queues: Shard name -> SQS queue URL
+        by: Route on the whole key ("key") or its payer folder ("prefix")
+        membership: Optional ShardMembership; without it every configured
+            shard is always on the ring
+        refresh_seconds: How often membership is re-read
+        vnodes: Virtual nodes per shard
+    """
+
+    def __init__(
+        self,
+        shard_queues: Dict[str, str],
+        by: str = SHARD_BY_KEY,
+        membership: Optional[ShardMembership] = None,
+        refresh_seconds: float = REFRESH_SECONDS,
+        vnodes: int = DEFAULT_VNODES
+    ):
+        if not shard_queues:
+            raise ValueError("At least one shard queue is required")
+        if by not in SHARD_BY_MODES:
+            raise ValueError(f"Unknown shard routing mode: {by}")
+
+        self.shard_queues = dict(shard_queues)
+        self.by = by
+        self.membership = membership
+        self.refresh_seconds = refresh_seconds
+        self.vnodes = vnodes
+        self.ring = HashRing(self.shard_queues, vnodes)
+        self._refreshed_at: Optional[float] = None
+
+    def shard_for(self, s3_key: str) -> str:
+        return self.ring.shard_for(routing_key(s3_key, self.by))
+
+    def queue_for(self, shard: str) -> str:
+        return self.shard_queues[shard]
+
+    def departed_shards(self) -> Set[str]:
+        """Configured shards currently off the ring (their queues need draining)."""
+        return set(self.shard_queues) - self.ring.shards
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-read membership and rebuild the ring if it changed.
+
+        Returns:
+            True if the set of shards on the ring changed
+        """
+        if self.membership is None:
+            return False
+        now = time.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return False
+        self._refreshed_at = now
+
+        live = {shard for shard in self.membership.live_shards(delete_expired=True) if shard in self.shard_queues}
+        if not live:
+            # Nobody has reported in (e.g. at startup): keep queueing for every shard
+            live = set(self.shard_queues)
+
+        if live == self.ring.shards:
+            return False
+
+        logger.info(
+            "Shard membership changed",
+            joined=sorted(live - self.ring.shards),
+            departed=sorted(self.ring.shards - live)
+        )
+        self.ring = HashRing(sorted(live), self.vnodes)
+        return True
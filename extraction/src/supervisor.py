@@ -0,0 +1,370 @@
+"""
+Supervised Parser Workers
+
+Runs PDF parsing in a child process so a malformed document that hangs
+the converter or exhausts memory only costs that one document. The
+parent enforces a wall-clock timeout and an RSS ceiling per document,
+kills and replaces workers that exceed them, retries the document once
+on a fresh worker, recycles workers after a fixed number of documents
+to contain slow leaks, and records keys that fail every attempt in a
+quarantine list.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from . import tracing
+
+logger = structlog.get_logger(__name__)
+
+# How often the parent checks the worker's memory while waiting
+POLL_INTERVAL_SECONDS = 0.25
+
+# First message from a worker: setup finished, or setup raised
+WORKER_READY = "ready"
+WORKER_FAILED = "failed"
+
+
+@dataclass
+class WorkerLimits:
+    """Resource limits for a supervised parser worker."""
+
+    timeout_seconds: float = 600.0
+    max_rss_mb: Optional[float] = None
+    max_documents: int = 50
+    # Fresh-worker attempts after a crash, timeout or RSS kill before quarantining
+    retries: int = 1
+    # How long a new worker may take to load its models and report ready
+    startup_timeout_seconds: float = 300.0
+
+
+class QuarantineList:
+    """
+    Append-only JSON Lines record of documents that broke a worker.
+
+    Quarantined keys are skipped on later deliveries instead of being
+    retried against a fresh worker. The file is re-read when it changes,
+    so clearing it (e.g. during a replay) takes effect in running workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._keys: Dict[str, dict] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return
+
+        keys = {}
+        if mtime is not None:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        keys[entry["key"]] = entry
+
+        self._keys = keys
+        self._mtime = mtime
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str, reason: str, **details):
+        """Quarantine a key and persist the entry."""
+        entry = {
+            "key": key,
+            "reason": reason,
+            "quarantined_at": datetime.utcnow().isoformat() + "Z",
+            **details,
+        }
+
+        with self._lock:
+            self._keys[key] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._mtime = os.stat(self.path).st_mtime
+
+        logger.warning("Document quarantined", key=key, reason=reason, **details)
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process in MiB (Linux /proc), or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _worker_main(conn, parse_cache_dir: Optional[str], table_structure: str, escalation=None):
+    """
+    Child process loop: report ready, then receive (pdf_path, source,
+    trace_context) and reply with the parse result.
+
+    The first message is ("ready", pid) once the parser and its models are
+    loaded, or ("failed", error) if that setup raised. Spans are exported
+    from the child (configured from the same environment as the parent)
+    and continue the parent's trace.
+    """
+    tracing.configure_from_env()
+
+    try:
+        from .docling_parser import DoclingParser
+        from .parse_cache import ParseCache
+
+        parse_cache = ParseCache(parse_cache_dir) if parse_cache_dir else None
+        parser = DoclingParser(parse_cache=parse_cache, table_structure=table_structure, escalation=escalation)
+        parser.warm_up()
+    except Exception as e:
+        conn.send((WORKER_FAILED, f"{type(e).__name__}: {e}"))
+        return
+
+    conn.send((WORKER_READY, os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        pdf_path, source, trace_context = request
+        with tracing.attach(trace_context), tracing.span("worker.parse", pid=os.getpid(), key=source):
+            result = parser.parse_contract(pdf_path, source=source)
+        conn.send(result)
+
+    logger.info("Parser worker exiting", pid=os.getpid(), **parser.cache_stats())
+    tracing.flush()
+
+
+class WorkerStartupError(RuntimeError):
+    """The worker exited, failed or hung before reporting ready."""
+
+
+class SupervisedParser:
+    """
+    Drop-in for DoclingParser.parse_contract backed by a supervised worker.
+
+    A document that crashes, times out or exceeds the RSS limit is retried
+    on a freshly started worker before its key is quarantined, so one
+    transient failure (a neighbour's OOM, a slow disk) does not skip a
+    document for good. A worker that never becomes ready fails the
+    document without quarantining it: the fault is in the deployment,
+    not the PDF.
+
+    Args:
+        limits: Timeout, RSS, retry and recycling limits
+        parse_cache_dir: Parse cache directory passed to the worker
+        quarantine: Where to record documents that broke a worker
+        table_structure: Table-structure mode passed to the worker's parser
+        escalation: Tiered parsing policy passed to the worker's parser
+    """
+
+    worker_target = staticmethod(_worker_main)
+
+    def __init__(
+        self,
+        limits: WorkerLimits,
+        parse_cache_dir: Optional[str] = None,
+        quarantine: Optional[QuarantineList] = None,
+        table_structure: str = "all",
+        escalation=None
+    ):
+        self.limits = limits
+        self.parse_cache_dir = parse_cache_dir
+        self.quarantine = quarantine
+        self.table_structure = table_structure
+        self.escalation = escalation
+
+        # spawn keeps the parent's threads and any loaded torch state out of the worker
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._documents = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "documents": 0,
+            "timeouts": 0,
+            "rss_kills": 0,
+            "crashes": 0,
+            "retries": 0,
+            "recycles": 0,
+            "startup_failures": 0,
+        }
+
+    def _start(self):
+        """
+        Start a worker and wait until it reports ready.
+
+        Raises:
+            WorkerStartupError: If the worker exits, reports a setup error
+                or is not ready within limits.startup_timeout_seconds
+        """
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=self.worker_target,
+            args=(child_conn, self.parse_cache_dir, self.table_structure, self.escalation),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._documents = 0
+        logger.info("Started parser worker", pid=self._process.pid)
+
+        started = time.monotonic()
+        error = None
+
+        while not self._conn.poll(POLL_INTERVAL_SECONDS):
+            if not self._process.is_alive():
+                error = f"exited with code {self._process.exitcode} before it was ready"
+                break
+            if time.monotonic() - started > self.limits.startup_timeout_seconds:
+                error = f"not ready after {self.limits.startup_timeout_seconds:g}s"
+                break
+
+        if error is None:
+            try:
+                status, detail = self._conn.recv()
+            except (EOFError, OSError):
+                status, detail = WORKER_FAILED, f"exited with code {self._process.exitcode} before it was ready"
+            if status == WORKER_READY:
+                logger.info("Parser worker ready", pid=self._process.pid, seconds=round(time.monotonic() - started, 1))
+                return
+            error = detail
+
+        self.stats["startup_failures"] += 1
+        self._stop(kill=True)
+        raise WorkerStartupError(error)
+
+    def _stop(self, kill: bool = False):
+        if self._process is None:
+            return
+
+        if kill:
+            self._process.kill()
+        else:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def close(self):
+        """Shut down the worker process."""
+        with self._lock:
+            self._stop()
+
+    def _run(self, pdf_path: str, source: Optional[str]) -> Tuple[Any, Optional[Tuple[str, dict]]]:
+        """
+        Send one document to the ready worker and wait for its reply.
+
+        Returns:
+            (result, None) on a reply, or (None, (reason, details)) when the
+            worker crashed, timed out or exceeded the RSS limit
+        """
+        self._conn.send((pdf_path, source, tracing.current_context()))
+        # The worker is already ready, so the clock covers this document only
+        started = time.monotonic()
+
+        while not self._conn.poll(POLL_INTERVAL_SECONDS):
+            elapsed = time.monotonic() - started
+
+            if not self._process.is_alive():
+                self.stats["crashes"] += 1
+                return None, ("worker_crashed", {"exit_code": self._process.exitcode})
+
+            if elapsed > self.limits.timeout_seconds:
+                self.stats["timeouts"] += 1
+                return None, ("timeout", {"seconds": round(elapsed, 1)})
+
+            if self.limits.max_rss_mb is not None:
+                rss_mb = read_rss_mb(self._process.pid)
+                if rss_mb is not None and rss_mb > self.limits.max_rss_mb:
+                    self.stats["rss_kills"] += 1
+                    return None, ("rss_limit", {"rss_mb": round(rss_mb, 1)})
+
+        try:
+            return self._conn.recv(), None
+        except (EOFError, OSError):
+            self.stats["crashes"] += 1
+            return None, ("worker_crashed", {"exit_code": self._process.exitcode})
+
+    def parse_contract(self, pdf_path: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Parse a PDF in the worker, enforcing the configured limits.
+
+        Returns:
+            Extracted contract data, or None if parsing failed, the worker
+            could not be started, or the document broke a worker on every
+            attempt (the key is then quarantined)
+        """
+        key = source or pdf_path
+        attempts = self.limits.retries + 1
+
+        with self._lock:
+            for attempt in range(1, attempts + 1):
+                if self._process is None or not self._process.is_alive():
+                    try:
+                        self._start()
+                    except WorkerStartupError as e:
+                        # Nothing is known about the document, so leave it for redelivery
+                        logger.error("Parser worker failed to start", key=key, attempt=attempt, error=str(e))
+                        return None
+
+                result, failure = self._run(pdf_path, source)
+
+                if failure is None:
+                    self.stats["documents"] += 1
+                    self._documents += 1
+
+                    if self._documents >= self.limits.max_documents:
+                        logger.info("Recycling parser worker", documents=self._documents)
+                        self.stats["recycles"] += 1
+                        self._stop()
+
+                    return result
+
+                reason, details = failure
+                logger.error("Killing parser worker", key=key, reason=reason, attempt=attempt, **details)
+                self._stop(kill=True)
+
+                if attempt < attempts:
+                    self.stats["retries"] += 1
+                    logger.info("Retrying document on a fresh worker", key=key, reason=reason)
+
+            if self.quarantine is not None:
+                self.quarantine.add(key, reason, attempts=attempts, **details)
+            return None
@@ -0,0 +1,149 @@
+"""
+Rate Table Page Selection
+
+Cheap heuristics that decide which pages of a contract are worth running
+Docling's table-structure model on. Most tables in a provider contract are
+signature blocks, addresses and notice contacts that extraction discards,
+while rate exhibits are identified by fee-schedule vocabulary next to
+dollar amounts or CPT/HCPCS codes.
+
+Table-structure modes:
+    all   Table structure on every page (Docling default)
+    auto  Table structure only on pages that look like rate tables
+    off   No table structure; text only
+"""
+
+import os
+import re
+import tempfile
+from typing import Any, Iterable, List, Optional, Sequence
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+TABLE_STRUCTURE_ALL = "all"
+TABLE_STRUCTURE_AUTO = "auto"
+TABLE_STRUCTURE_OFF = "off"
+TABLE_STRUCTURE_MODES = (TABLE_STRUCTURE_ALL, TABLE_STRUCTURE_AUTO, TABLE_STRUCTURE_OFF)
+
+# Header words that mark a table as a rate table (see _extract_rate_schedules)
+RATE_INDICATORS = ("rate", "amount", "fee", "price", "cpt", "service")
+
+RATE_KEYWORD_RE = re.compile(
+    r"\b(?:rates?|fee\s+schedules?|fees?|reimburse\w*|allowables?|cpt|hcpcs|drg|per\s+diem|"
+    r"service\s+categor\w*|compensation|exhibit)\b",
+    re.IGNORECASE
+)
+AMOUNT_RE = re.compile(r"\$\s?\d[\d,]*(?:\.\d{2})?|\b\d+(?:\.\d+)?\s?%")
+CODE_RE = re.compile(r"\b(?:\d{5}|[A-V]\d{4})\b")
+
+# Pages with less extracted text than this are treated as scanned images
+MIN_TEXT_CHARS = 20
+
+
+def is_rate_table(headers: Iterable[str]) -> bool:
+    """Whether a table's header row looks like a rate schedule."""
+    joined = " ".join(str(h).lower() for h in headers)
+    return any(indicator in joined for indicator in RATE_INDICATORS)
+
+
+def page_looks_like_rates(text: str, min_values: int = 2) -> bool:
+    """
+    Keyword heuristic for a page holding a rate table.
+
+    A page qualifies when it mentions rate vocabulary and carries at least
+    min_values dollar amounts, percentages or procedure codes.
+    """
+    if not RATE_KEYWORD_RE.search(text):
+        return False
+
+    values = len(AMOUNT_RE.findall(text)) + len(CODE_RE.findall(text))
+    return values >= min_values
+
+
+def page_may_hold_rates(text: str) -> bool:
+    """Whether a page's extracted text looks like a rate table or has no usable text layer."""
+    return len(text.strip()) < MIN_TEXT_CHARS or page_looks_like_rates(text)
+
+
+def open_pdf(pdf_path: str, reader: Optional[Any] = None):
+    """pypdf reader for a PDF, reusing an already-open reader if given."""
+    if reader is not None:
+        return reader
+
+    from pypdf import PdfReader
+
+    return PdfReader(pdf_path)
+
+
+def find_rate_pages(pdf_path: str, reader: Optional[Any] = None) -> List[int]:
+    """
+    1-based page numbers that look like they hold rate tables.
+
+    Uses pypdf text extraction, which is orders of magnitude cheaper than
+    table-structure recognition. Pages without a text layer are included
+    so scanned exhibits still get full table recognition.
+
+    Args:
+        pdf_path: Path to the PDF
+        reader: Reader already opened on pdf_path, to avoid parsing it again
+    """
+    reader = open_pdf(pdf_path, reader)
+    pages = []
+
+    for page_no, page in enumerate(reader.pages, start=1):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logger.warning("Page text extraction failed", path=pdf_path, page=page_no, error=str(e))
+            text = ""
+
+        if page_may_hold_rates(text):
+            pages.append(page_no)
+
+    logger.debug("Rate page prescan", path=pdf_path, pages=pages, total=len(reader.pages))
+    return pages
+
+
+def page_runs(pages: Iterable[int]) -> List[List[int]]:
+    """Split page numbers into runs of consecutive pages, e.g. [2, 3, 7] -> [[2, 3], [7]]."""
+    runs: List[List[int]] = []
+
+    for page_no in sorted(set(pages)):
+        if runs and page_no == runs[-1][-1] + 1:
+            runs[-1].append(page_no)
+        else:
+            runs.append([page_no])
+
+    return runs
+
+
+def write_page_subset(pdf_path: str, pages: Sequence[int], reader: Optional[Any] = None) -> str:
+    """
+    Write the given 1-based pages of a PDF to a temporary file.
+
+    Args:
+        pdf_path: Path to the PDF
+        pages: Pages to copy, in order
+        reader: Reader already opened on pdf_path, so several subsets can
+            be cut from one parse of the document
+
+    Returns:
+        Path to the new PDF (caller removes it)
+    """
+    from pypdf import PdfWriter
+
+    reader = open_pdf(pdf_path, reader)
+    writer = PdfWriter()
+    for page_no in pages:
+        writer.add_page(reader.pages[page_no - 1])
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        try:
+            writer.write(f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+        return f.name
@@ -0,0 +1,375 @@
+"""
+Tracing
+
+Lightweight spans for following one message through receive, download,
+conversion, extraction, validation and upload. Spans nest through a
+context variable, carry attributes such as message ID, key, page count
+and byte sizes, and are handed to a background exporter thread in
+batches when their trace's root span ends (or the local root, for spans
+continuing a trace from another process, see attach()):
+
+    TRACE_FILE                   JSON Lines file, one span per line
+    OTEL_EXPORTER_OTLP_ENDPOINT  OTLP/HTTP JSON collector (e.g. Jaeger or
+                                 an OpenTelemetry Collector on :4318)
+
+With neither set, span() returns a shared no-op span and costs almost
+nothing. Log lines written inside a span carry its trace_id and span_id
+(see add_trace_context), so CloudWatch lines can be joined to traces.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_SERVICE_NAME = "contract-extractor"
+BATCH_SIZE = 512
+# Batches waiting for the exporter thread; further batches are dropped
+MAX_QUEUED_BATCHES = 64
+FLUSH_TIMEOUT_SECONDS = 10.0
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_processor = None
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+class SpanContext:
+    """IDs of a span in another process, used as the parent of local spans."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "local_root", "start_ns", "end_ns", "attributes", "status"
+    )
+
+    def __init__(self, name: str, parent, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        # The outermost span in this process; its end triggers export
+        self.local_root = parent is None or isinstance(parent, SpanContext)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.status = "OK"
+
+    def set(self, **attributes):
+        """Add or replace attributes (None values are dropped)."""
+        self.attributes.update((k, v) for k, v in attributes.items() if v is not None)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span in OTLP/JSON field naming."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2 if self.status == "ERROR" else 1},
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled."""
+
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class FileExporter:
+    """Appends spans to a JSON Lines file (one OTLP/JSON span per line)."""
+
+    def __init__(self, path: str, service_name: str = DEFAULT_SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        lines = "".join(
+            json.dumps(dict(span.to_dict(), service=self.service_name), separators=(",", ":")) + "\n"
+            for span in spans
+        )
+        # One append per batch keeps lines from concurrent processes whole
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+
+class OTLPExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = DEFAULT_SERVICE_NAME, timeout: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else endpoint + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "contract-extraction"},
+                    "spans": [span.to_dict() for span in spans],
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class _BatchProcessor:
+    """
+    Buffers finished spans and queues them for export when a local root
+    span ends.
+
+    Exporting (an OTLP POST can take seconds) runs on a background thread,
+    so ending a span never waits on the collector. The queue is bounded:
+    when the exporter falls behind, batches are dropped and counted rather
+    than holding memory or blocking message threads.
+    """
+
+    def __init__(self, exporters: list, batch_size: int = BATCH_SIZE, max_queued: int = MAX_QUEUED_BATCHES):
+        self.exporters = exporters
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self.exported = 0
+        self.failed = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if not span.local_root and len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._enqueue(batch)
+
+    def _enqueue(self, batch: List[Span], timeout: Optional[float] = None):
+        try:
+            self._queue.put(batch, block=timeout is not None, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.dropped += len(batch)
+            logger.warning("Span export queue full, dropping spans", spans=len(batch), dropped=self.dropped)
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """
+        Queue buffered spans and wait for everything queued to be exported.
+
+        Returns:
+            False if the exporter did not catch up within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._enqueue(batch, timeout)
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.monotonic()))
+
+    def shutdown(self, timeout: float = FLUSH_TIMEOUT_SECONDS):
+        """Flush and stop the exporter thread."""
+        self.flush(timeout)
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+            else:
+                self._export(item)
+
+    def _export(self, batch: List[Span]):
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                # Tracing must never fail the pipeline
+                self.failed += len(batch)
+                logger.warning("Span export failed", exporter=type(exporter).__name__, spans=len(batch), error=str(e))
+
+
+def configure(
+    trace_file: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None,
+    service_name: str = DEFAULT_SERVICE_NAME
+) -> bool:
+    """
+    Enable span export (or disable it when no destination is given).
+
+    Returns:
+        True if tracing is enabled
+    """
+    global _processor
+
+    exporters = []
+    if trace_file:
+        exporters.append(FileExporter(trace_file, service_name))
+    if otlp_endpoint:
+        exporters.append(OTLPExporter(otlp_endpoint, service_name))
+
+    if _processor is not None:
+        _processor.shutdown()
+    _processor = _BatchProcessor(exporters) if exporters else None
+
+    if exporters:
+        logger.info("Tracing enabled", trace_file=trace_file, otlp_endpoint=otlp_endpoint, service=service_name)
+    return _processor is not None
+
+
+def configure_from_env() -> bool:
+    """configure() from TRACE_FILE, OTEL_EXPORTER_OTLP_ENDPOINT and OTEL_SERVICE_NAME."""
+    return configure(
+        os.environ.get("TRACE_FILE"),
+        os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"),
+        os.environ.get("OTEL_SERVICE_NAME", DEFAULT_SERVICE_NAME)
+    )
+
+
+def enabled() -> bool:
+    return _processor is not None
+
+
+def flush():
+    """Export buffered and queued spans (e.g. before exit)."""
+    if _processor is not None:
+        _processor.flush()
+
+
+# The exporter thread is a daemon; export what is left when the process exits
+atexit.register(flush)
+
+
+def current_span():
+    """Innermost active span, or the no-op span."""
+    active = _current_span.get()
+    return active if isinstance(active, Span) else NOOP_SPAN
+
+
+def current_context() -> Optional[Tuple[str, str]]:
+    """(trace_id, span_id) of the active span, to pass to another process; None when not tracing."""
+    active = _current_span.get()
+    return (active.trace_id, active.span_id) if active is not None else None
+
+
+@contextmanager
+def attach(context: Optional[Tuple[str, str]]) -> Iterator[None]:
+    """
+    Continue a trace from another process: spans opened inside become
+    children of the remote span (see current_context). None is a no-op.
+    """
+    if context is None:
+        yield
+        return
+
+    token = _current_span.set(SpanContext(*context))
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """
+    Time a block as a child of the current span (or as a new trace root).
+
+    Exceptions mark the span as failed and propagate unchanged.
+    """
+    processor = _processor
+    if processor is None:
+        yield NOOP_SPAN
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "ERROR"
+        current.set(**{"exception.type": type(e).__name__, "exception.message": str(e)[:500]})
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        processor.on_end(current)
+
+
+def add_trace_context(logger, method_name: str, event_dict: dict) -> dict:
+    """structlog processor adding the active trace_id and span_id."""
+    active = _current_span.get()
+    if active is not None:
+        event_dict.setdefault("trace_id", active.trace_id)
+        event_dict.setdefault("span_id", active.span_id)
+    return event_dict
@@ -0,0 +1,612 @@
+"""
+Warehouse Loader
+
+Bulk-loads extracted contract JSON from the processed bucket into
+raw_contracts. Each run lists output objects written since the last
+watermark and writes a COPY manifest for them. The manifest is loaded into
+a staging table with one COPY, and the staging rows are merged into
+raw_contracts, replacing older extractions of the same contract.
+
+The listing is consumed as it streams in, in key order, and a manifest is
+loaded whenever max_files pending objects have accumulated. Each manifest
+commits a checkpoint (the last key it covers, and the pass's cutoff) in
+the same transaction as its merge, so an interrupted run resumes listing
+after that key. The watermark only advances when a pass completes.
+
+Redshift reads the manifest with COPY ... MANIFEST. The Postgres stand-in
+from docker-compose.yml cannot read S3, so the same manifest entries are
+streamed through COPY FROM STDIN instead.
+
+Usage (from the extraction/ directory):
+    python -m src.warehouse_loader --processed-bucket $S3_PROCESSED_BUCKET --iam-role $REDSHIFT_IAM_ROLE
+    python -m src.warehouse_loader --processed-bucket contracts-processed-local --dialect postgres --port 5439
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+import structlog
+
+# psycopg2 speaks to both Redshift and Postgres
+try:
+    import psycopg2
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+TARGET_TABLE = "public.raw_contracts"
+STAGING_TABLE = "raw_contracts_staging"
+STATE_TABLE = "public.raw_contracts_load_state"
+MANIFEST_PREFIX = "manifests/raw_contracts/"
+
+RAW_COLUMNS = (
+    "contract_id",
+    "payer_name",
+    "payer_id",
+    "provider_npi",
+    "provider_name",
+    "effective_date",
+    "termination_date",
+    "rate_schedules",
+    "amendments",
+    "extraction_metadata",
+)
+NESTED_COLUMNS = frozenset({"rate_schedules", "amendments", "extraction_metadata"})
+
+COLUMN_LIST = ", ".join(RAW_COLUMNS)
+
+# Allowance for clock skew between writers (index timestamps) and S3 LastModified
+INDEX_SKEW = timedelta(minutes=15)
+
+
+@dataclass(frozen=True, order=True)
+class Watermark:
+    """Position of the last loaded object, ordered by (last_modified, key)."""
+
+    last_modified: datetime
+    key: str
+
+
+@dataclass(frozen=True)
+class ListingCheckpoint:
+    """Progress of an unfinished listing pass, for resuming it."""
+
+    start_after: str
+    cutoff: datetime
+    loaded: Watermark
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one manifest load."""
+
+    manifest: str
+    files: int
+    rows: int
+    watermark: Watermark
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize an S3 timestamp to naive UTC for TIMESTAMP columns."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def iter_pending(
+    objects: Iterable[Dict[str, Any]],
+    watermark: Optional[Watermark],
+    cutoff: datetime
+) -> Iterator[Tuple[Watermark, Dict[str, Any]]]:
+    """
+    Objects past the watermark and written before cutoff, in input order.
+
+    Objects newer than cutoff are left for the next run, so a write landing
+    in the same second as the watermark cannot be skipped.
+    """
+    for obj in objects:
+        mark = Watermark(to_utc_naive(obj["last_modified"]), obj["key"])
+        if (watermark is None or mark > watermark) and mark.last_modified <= cutoff:
+            yield mark, obj
+
+
+def pending_objects(
+    objects: List[Dict[str, Any]],
+    watermark: Optional[Watermark],
+    cutoff: datetime
+) -> List[Tuple[Watermark, Dict[str, Any]]]:
+    """iter_pending, oldest first."""
+    return sorted(iter_pending(objects, watermark, cutoff), key=lambda item: item[0])
+
+
+def build_manifest(bucket: str, objects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Redshift COPY manifest for the given objects."""
+    return {
+        "entries": [
+            {
+                "url": f"s3://{bucket}/{obj['key']}",
+                "mandatory": True,
+                "meta": {"content_length": obj["size"]},
+            }
+            for obj in objects
+        ]
+    }
+
+
+def split_s3_url(url: str) -> Tuple[str, str]:
+    """Split s3://bucket/key into (bucket, key)."""
+    bucket, _, key = url[len("s3://"):].partition("/")
+    return bucket, key
+
+
+class RedshiftDialect:
+    """Loads the staging table with COPY ... MANIFEST from S3."""
+
+    name = "redshift"
+    # Formatted with the table alias
+    extracted_at_sql = "{}.extraction_metadata.extracted_at::varchar"
+
+    def __init__(self, iam_role: str, region: str):
+        self.iam_role = iam_role
+        self.region = region
+
+    def copy_manifest(self, cursor, manifest_url: str, manifest: Dict[str, Any], s3_handler):
+        cursor.execute(
+            f"COPY {STAGING_TABLE} ({COLUMN_LIST}) FROM %s "
+            f"IAM_ROLE %s FORMAT AS JSON 'auto' MANIFEST REGION %s",
+            (manifest_url, self.iam_role, self.region)
+        )
+
+
+class PostgresDialect:
+    """Streams the manifest entries into the staging table with COPY FROM STDIN."""
+
+    name = "postgres"
+    extracted_at_sql = "{}.extraction_metadata->>'extracted_at'"
+
+    def copy_manifest(self, cursor, manifest_url: str, manifest: Dict[str, Any], s3_handler):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        for entry in manifest["entries"]:
+            bucket, key = split_s3_url(entry["url"])
+            data = json.loads(s3_handler.read_bytes(bucket, key))
+
+            writer.writerow([
+                json.dumps(data.get(name)) if name in NESTED_COLUMNS and data.get(name) is not None
+                else data.get(name)
+                for name in RAW_COLUMNS
+            ])
+
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {STAGING_TABLE} ({COLUMN_LIST}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+class _Counted:
+    """Iterator wrapper that counts the items it has yielded."""
+
+    def __init__(self, items: Iterable[Any]):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+
+
+class WarehouseLoader:
+    """
+    Incremental, idempotent loader for raw_contracts.
+
+    Args:
+        connection: DB-API connection (psycopg2) to Redshift or Postgres
+        s3_handler: S3Handler for listing outputs and writing manifests
+        bucket: Processed bucket holding the contract JSON
+        dialect: RedshiftDialect or PostgresDialect
+        prefix: Key prefix of the contract outputs
+        loader_name: Watermark name, so several loaders can share the state table
+        max_files: Files per manifest
+        settle_seconds: Objects younger than this wait for the next run
+        use_partition_index: List only partitions the partition index
+            shows as written since the watermark, when the index can be
+            shown to cover that window (no gap markers from writers
+            without the index or with failed flushes, and a settle window
+            longer than the writers' flush lag); otherwise list the prefix
+    """
+
+    def __init__(
+        self,
+        connection,
+        s3_handler,
+        bucket: str,
+        dialect,
+        prefix: str = "contracts/",
+        loader_name: str = "raw_contracts",
+        max_files: int = 10000,
+        settle_seconds: int = 60,
+        use_partition_index: bool = False
+    ):
+        self.connection = connection
+        self.s3_handler = s3_handler
+        self.bucket = bucket
+        self.dialect = dialect
+        self.prefix = prefix
+        self.loader_name = loader_name
+        self.max_files = max_files
+        self.settle_seconds = settle_seconds
+        self.use_partition_index = use_partition_index
+
+    def ensure_state_table(self):
+        """Create the watermark table if it does not exist, adding checkpoint columns to older ones."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+                "loader VARCHAR(100), "
+                "last_modified TIMESTAMP, "
+                "last_key VARCHAR(1024), "
+                "manifest VARCHAR(1024), "
+                "files INTEGER, "
+                "rows_loaded INTEGER, "
+                "loaded_at TIMESTAMP, "
+                "list_after VARCHAR(1024), "
+                "list_cutoff TIMESTAMP)"
+            )
+
+            # Redshift has no ADD COLUMN IF NOT EXISTS
+            schema, table = STATE_TABLE.split(".")
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_schema = %s AND table_name = %s",
+                (schema, table)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            for column, column_type in (("list_after", "VARCHAR(1024)"), ("list_cutoff", "TIMESTAMP")):
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE {STATE_TABLE} ADD COLUMN {column} {column_type}")
+
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+    def read_watermark(self, cursor) -> Optional[Watermark]:
+        """Position reached by the last completed pass, or None before the first load."""
+        cursor.execute(
+            f"SELECT last_modified, last_key FROM {STATE_TABLE} WHERE loader = %s AND list_after IS NULL "
+            "ORDER BY last_modified DESC, last_key DESC LIMIT 1",
+            (self.loader_name,)
+        )
+        row = cursor.fetchone()
+        return Watermark(row[0], row[1]) if row else None
+
+    def read_checkpoint(self, cursor) -> Optional[ListingCheckpoint]:
+        """Checkpoint of an interrupted pass, or None if the last pass completed."""
+        cursor.execute(
+            f"SELECT last_modified, last_key, list_after, list_cutoff FROM {STATE_TABLE} WHERE loader = %s "
+            "ORDER BY loaded_at DESC LIMIT 1",
+            (self.loader_name,)
+        )
+        row = cursor.fetchone()
+        if row is None or row[2] is None:
+            return None
+        return ListingCheckpoint(row[2], row[3], Watermark(row[0], row[1]))
+
+    def load_pending(self) -> List[LoadResult]:
+        """
+        Load every settled output written since the watermark.
+
+        Returns:
+            One LoadResult per manifest (empty when already caught up)
+        """
+        cursor = self.connection.cursor()
+        try:
+            watermark = self.read_watermark(cursor)
+            checkpoint = self.read_checkpoint(cursor)
+            self.connection.rollback()
+        finally:
+            cursor.close()
+
+        if checkpoint is not None:
+            # Finish the interrupted pass with its own cutoff, so the
+            # already-loaded key range needs no second look
+            cutoff, start_after, loaded = checkpoint.cutoff, checkpoint.start_after, checkpoint.loaded
+            logger.info("Resuming interrupted load", start_after=start_after, cutoff=str(cutoff))
+        else:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+            start_after, loaded = None, watermark
+
+        counted = _Counted(self._list_candidates(watermark, start_after))
+        results = []
+        batch: List[Tuple[Watermark, Dict[str, Any]]] = []
+
+        for item in iter_pending(counted, watermark, cutoff):
+            # Load a full batch only once more is pending, so the last
+            # batch of the pass is the one that completes it
+            if len(batch) >= self.max_files:
+                results.append(self._load_batch(batch, loaded, cutoff, list_after=batch[-1][1]["key"]))
+                loaded = results[-1].watermark
+                batch = []
+            batch.append(item)
+
+        if batch:
+            results.append(self._load_batch(batch, loaded, cutoff))
+        elif checkpoint is not None:
+            self._complete_pass(loaded)
+
+        logger.info(
+            "Warehouse load finished",
+            listed=counted.count,
+            pending=sum(r.files for r in results),
+            manifests=len(results),
+            watermark=str(watermark) if watermark else None
+        )
+        return results
+
+    def _list_candidates(
+        self,
+        watermark: Optional[Watermark],
+        start_after: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream output objects in key order, restricted to recently written
+        partitions when the index allows.
+        """
+        if self.use_partition_index and watermark is not None:
+            partitions = self._indexed_partitions(watermark)
+            if partitions is not None:
+                return self.s3_handler.iter_objects_parallel(
+                    self.bucket, suffix=".json", start_after=start_after, prefixes=[p + "/" for p in partitions]
+                )
+
+        return self.s3_handler.iter_objects_parallel(self.bucket, self.prefix, ".json", start_after=start_after)
+
+    def _indexed_partitions(self, watermark: Watermark) -> Optional[List[str]]:
+        """
+        Partitions the index shows as written since the watermark.
+
+        Returns:
+            Sorted partition paths, or None when the index cannot be shown
+            to cover the window and the loader should list the prefix
+        """
+        from .partition_index import (
+            MAX_FLUSH_LAG_SECONDS,
+            GapMarkers,
+            S3IndexStore,
+            uncovered_gaps,
+            utc_stamp,
+        )
+
+        if self.settle_seconds < MAX_FLUSH_LAG_SECONDS:
+            # Writers may still hold updates for objects older than the cutoff
+            logger.warning(
+                "Settle window shorter than the index flush lag; listing instead",
+                settle_seconds=self.settle_seconds,
+                max_flush_lag_seconds=MAX_FLUSH_LAG_SECONDS
+            )
+            return None
+
+        index, _ = S3IndexStore(self.s3_handler, self.bucket).load()
+        if not index:
+            return None
+
+        since = utc_stamp(watermark.last_modified - INDEX_SKEW)
+        gaps = uncovered_gaps(index, GapMarkers(self.s3_handler, self.bucket).load(), since)
+        if gaps:
+            logger.warning(
+                "Partition index is missing writes; listing instead",
+                writers=sorted(gap["writer"] for gap in gaps),
+                reasons=sorted({gap["reason"] for gap in gaps})
+            )
+            return None
+
+        partitions = sorted(p for p in index.updated_since(since) if (p + "/").startswith(self.prefix))
+        logger.info("Listing partitions from index", partitions=len(partitions), indexed=len(index))
+        return partitions
+
+    def _load_batch(
+        self,
+        batch: List[Tuple[Watermark, Dict[str, Any]]],
+        loaded: Optional[Watermark],
+        cutoff: datetime,
+        list_after: Optional[str] = None
+    ) -> LoadResult:
+        """
+        COPY one manifest into staging and merge it in a single transaction.
+
+        Args:
+            batch: Pending (mark, object) pairs, in key order
+            loaded: Newest mark loaded so far in this pass
+            cutoff: The pass's settle cutoff
+            list_after: Last key covered, when more of the pass follows;
+                None completes the pass and advances the watermark
+        """
+        objects = [obj for _, obj in batch]
+        watermark = max([mark for mark, _ in batch] + ([loaded] if loaded else []))
+        loaded_at = datetime.utcnow()
+
+        manifest = build_manifest(self.bucket, objects)
+        manifest_key = f"{MANIFEST_PREFIX}{loaded_at.strftime('%Y%m%dT%H%M%S%f')}.manifest"
+        manifest_url = f"s3://{self.bucket}/{manifest_key}"
+        self.s3_handler.upload_json(self.bucket, manifest_key, manifest)
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+            cursor.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE {TARGET_TABLE})")
+
+            self.dialect.copy_manifest(cursor, manifest_url, manifest, self.s3_handler)
+
+            # Manifests follow key order, not write order, so an older
+            # extraction can arrive after a newer one: replace only rows at
+            # least as old as the incoming extraction
+            staged_at = self.dialect.extracted_at_sql.format("s")
+            target_at = self.dialect.extracted_at_sql.format("raw_contracts")
+            cursor.execute(
+                f"DELETE FROM {TARGET_TABLE} USING {STAGING_TABLE} s "
+                f"WHERE raw_contracts.contract_id = s.contract_id "
+                f"AND COALESCE({target_at}, '') <= COALESCE({staged_at}, '')"
+            )
+
+            # Keep only the latest extraction of a contract within the batch
+            cursor.execute(
+                f"INSERT INTO {TARGET_TABLE} ({COLUMN_LIST}) "
+                f"SELECT {COLUMN_LIST} FROM ("
+                f"SELECT s.*, ROW_NUMBER() OVER ("
+                f"PARTITION BY s.contract_id ORDER BY {staged_at} DESC"
+                f") AS _row_number FROM {STAGING_TABLE} s WHERE s.contract_id IS NOT NULL"
+                ") latest WHERE _row_number = 1 AND NOT EXISTS ("
+                f"SELECT 1 FROM {TARGET_TABLE} t WHERE t.contract_id = latest.contract_id)"
+            )
+            rows = cursor.rowcount
+
+            self._record_state(cursor, watermark, manifest_url, len(objects), rows, loaded_at, list_after, cutoff)
+
+            self.connection.commit()
+
+        except Exception:
+            self.connection.rollback()
+            logger.exception("Warehouse load failed", manifest=manifest_url, files=len(objects))
+            raise
+
+        finally:
+            cursor.close()
+
+        logger.info(
+            "Warehouse load complete",
+            manifest=manifest_url,
+            files=len(objects),
+            rows=rows,
+            watermark_key=watermark.key,
+            list_after=list_after
+        )
+        return LoadResult(manifest_url, len(objects), rows, watermark)
+
+    def _record_state(
+        self,
+        cursor,
+        watermark: Watermark,
+        manifest_url: Optional[str],
+        files: int,
+        rows: int,
+        loaded_at: datetime,
+        list_after: Optional[str] = None,
+        cutoff: Optional[datetime] = None
+    ):
+        """Insert a state row; rows with list_after are checkpoints of an unfinished pass."""
+        cursor.execute(
+            f"INSERT INTO {STATE_TABLE} "
+            "(loader, last_modified, last_key, manifest, files, rows_loaded, loaded_at, list_after, list_cutoff) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (
+                self.loader_name, watermark.last_modified, watermark.key, manifest_url, files, rows, loaded_at,
+                list_after, cutoff if list_after is not None else None
+            )
+        )
+
+    def _complete_pass(self, loaded: Watermark):
+        """Close a resumed pass that found nothing left to load."""
+        cursor = self.connection.cursor()
+        try:
+            self._record_state(cursor, loaded, None, 0, 0, datetime.utcnow())
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+@click.command()
+@click.option("--processed-bucket", envvar="S3_PROCESSED_BUCKET", required=True, help="S3 bucket with contract JSON")
+@click.option("--prefix", default="contracts/", show_default=True, help="Key prefix of the contract outputs")
+@click.option(
+    "--dialect",
+    envvar="WAREHOUSE_DIALECT",
+    type=click.Choice(["redshift", "postgres"]),
+    default="redshift",
+    show_default=True,
+    help="Warehouse type (postgres for the local docker-compose stand-in)"
+)
+@click.option("--host", envvar="REDSHIFT_HOST", default="localhost", help="Warehouse host")
+@click.option("--port", envvar="REDSHIFT_PORT", type=int, default=5439, help="Warehouse port")
+@click.option("--user", envvar="REDSHIFT_USER", default="admin", help="Warehouse user")
+@click.option("--password", envvar="REDSHIFT_PASSWORD", default=None, help="Warehouse password")
+@click.option("--database", envvar="REDSHIFT_DATABASE", default="contracts_dw", help="Warehouse database")
+@click.option("--iam-role", envvar="REDSHIFT_IAM_ROLE", default=None, help="IAM role Redshift uses to read S3")
+@click.option("--aws-region", envvar="AWS_REGION", default="us-east-2", help="AWS region")
+@click.option("--max-files", type=int, default=10000, show_default=True, help="Files per COPY manifest")
+@click.option(
+    "--use-partition-index",
+    is_flag=True,
+    default=False,
+    help="List only partitions written since the watermark, per _partition_index.json"
+)
+@click.option(
+    "--settle-seconds",
+    type=int,
+    default=60,
+    show_default=True,
+    help="Leave objects younger than this for the next run"
+)
+def main(
+    processed_bucket: str,
+    prefix: str,
+    dialect: str,
+    host: str,
+    port: int,
+    user: str,
+    password: str,
+    database: str,
+    iam_role: str,
+    aws_region: str,
+    max_files: int,
+    use_partition_index: bool,
+    settle_seconds: int
+):
+    """Load new contract JSON into raw_contracts."""
+    if not PSYCOPG2_AVAILABLE:
+        click.echo("psycopg2 is required for warehouse loads", err=True)
+        raise SystemExit(1)
+
+    if dialect == "redshift" and not iam_role:
+        click.echo("REDSHIFT_IAM_ROLE is required for Redshift COPY", err=True)
+        raise SystemExit(1)
+
+    from .s3_handler import S3Handler
+
+    connection = psycopg2.connect(host=host, port=port, user=user, password=password, dbname=database)
+
+    try:
+        loader = WarehouseLoader(
+            connection,
+            S3Handler(aws_region),
+            processed_bucket,
+            RedshiftDialect(iam_role, aws_region) if dialect == "redshift" else PostgresDialect(),
+            prefix=prefix,
+            max_files=max_files,
+            settle_seconds=settle_seconds,
+            use_partition_index=use_partition_index
+        )
+        loader.ensure_state_table()
+        results = loader.load_pending()
+    finally:
+        connection.close()
+
+    click.echo(
+        f"Loaded {sum(r.files for r in results)} files "
+        f"({sum(r.rows for r in results)} rows) in {len(results)} manifests"
+    )
+
+
+if __name__ == "__main__":
+    main()
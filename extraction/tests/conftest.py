@@ -0,0 +1,89 @@
+"""
+Shared fixtures: moto-backed S3/SQS and the docker-compose Postgres stand-in.
+
+Warehouse tests connect to the "postgres" service from docker-compose.yml
+(localhost:5439) unless TEST_WAREHOUSE_* variables point elsewhere. Each
+session creates and drops its own database, so local data is untouched.
+They are skipped when no server is reachable.
+"""
+
+import os
+import uuid
+
+import pytest
+
+REGION = "us-east-1"
+INIT_SQL = os.path.join(os.path.dirname(__file__), "..", "..", "infrastructure", "init_db.sql")
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Moto in place of S3 and SQS for the duration of a test."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", REGION)
+    monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+
+    from moto import mock_aws
+
+    with mock_aws():
+        yield
+
+
+@pytest.fixture
+def s3_handler(aws):
+    from src.s3_handler import S3Handler
+
+    return S3Handler(REGION)
+
+
+def _warehouse_params() -> dict:
+    return {
+        "host": os.environ.get("TEST_WAREHOUSE_HOST", "localhost"),
+        "port": int(os.environ.get("TEST_WAREHOUSE_PORT", "5439")),
+        "user": os.environ.get("TEST_WAREHOUSE_USER", "admin"),
+        "password": os.environ.get("TEST_WAREHOUSE_PASSWORD", "password123"),
+        "dbname": os.environ.get("TEST_WAREHOUSE_DATABASE", "contracts_dw"),
+    }
+
+
+@pytest.fixture(scope="session")
+def warehouse_params():
+    """Connection parameters for a throwaway database on the Postgres stand-in."""
+    psycopg2 = pytest.importorskip("psycopg2")
+    params = _warehouse_params()
+
+    try:
+        admin = psycopg2.connect(connect_timeout=3, **params)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres stand-in not reachable (docker compose up postgres): {e}")
+
+    admin.autocommit = True
+    name = f"contracts_test_{uuid.uuid4().hex[:8]}"
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE {name}")
+
+    try:
+        yield dict(params, dbname=name)
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def warehouse(warehouse_params):
+    """Connection with freshly created raw_contracts tables (infrastructure/init_db.sql)."""
+    import psycopg2
+
+    connection = psycopg2.connect(**warehouse_params)
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS public.raw_contracts, public.raw_contracts_load_state")
+        with open(INIT_SQL) as f:
+            cursor.execute(f.read())
+    connection.commit()
+
+    try:
+        yield connection
+    finally:
+        connection.close()
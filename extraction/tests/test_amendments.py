@@ -0,0 +1,45 @@
+"""Amendment segmentation from contract text."""
+
+import pytest
+
+from src.docling_parser import DoclingParser
+
+
+@pytest.fixture
+def parser():
+    return DoclingParser(field_cache=None)
+
+
+def amendment_rows(parser, text: str) -> list:
+    return [(a["amendment_id"], a["effective_date"]) for a in parser._extract_amendments(text).to_dicts()]
+
+
+def test_cross_references_are_not_headers(parser):
+    text = (
+        "AMENDMENT 1: Rate increase. Effective 01/01/2024.\n"
+        "Rates in Exhibit A are as restated by Amendment 2 below and\n"
+        "remain subject to amendment 1 terms.\n"
+        "Amendment No. 2\n"
+        "Adds telehealth services. Effective 07/01/2024.\n"
+    )
+
+    assert amendment_rows(parser, text) == [("AMD-1", "2024-01-01"), ("AMD-2", "2024-07-01")]
+
+
+def test_repeated_header_is_reported_once(parser):
+    text = (
+        "Contents\n"
+        "Amendment 3: Termination terms\n"
+        "Amendment 4: Extension\n"
+        "\n"
+        "Amendment 3: Termination terms. Effective 03/15/2025.\n"
+        "Amendment 4: Extension. Effective 04/01/2025.\n"
+    )
+
+    assert amendment_rows(parser, text) == [("AMD-3", "2025-03-15"), ("AMD-4", "2025-04-01")]
+
+
+def test_colon_header_mid_line(parser):
+    text = "Changes are listed below. Amendment #5: Adds lab rates. Effective 02/01/2025."
+
+    assert amendment_rows(parser, text) == [("AMD-5", "2025-02-01")]
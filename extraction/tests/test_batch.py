@@ -0,0 +1,59 @@
+"""Local batch runs surviving worker crashes."""
+
+import os
+
+from src import batch
+from src.batch import BatchResult, run_local_batch
+
+
+def crash_on_poison(pdf_path: str, output_dir: str) -> BatchResult:
+    """Stands in for _process_one; a "poison" PDF kills its worker outright."""
+    if "poison" in os.path.basename(pdf_path):
+        os._exit(1)
+    return BatchResult(pdf_path, 0.01, output_key=os.path.basename(pdf_path))
+
+
+def test_worker_crash_fails_only_the_crashing_document(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "_init_worker", lambda *args: None)
+    monkeypatch.setattr(batch, "_process_one", crash_on_poison)
+
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    names = [f"{n:02d}.pdf" for n in range(6)] + ["poison.pdf"]
+    for name in names:
+        (input_dir / name).write_bytes(b"%PDF-1.4")
+
+    summary = run_local_batch(str(input_dir), str(tmp_path / "out"), workers=2)
+
+    assert summary.total == len(names)
+    assert [os.path.basename(f["path"]) for f in summary.failures] == ["poison.pdf"]
+    assert "BrokenProcessPool" in summary.failures[0]["error"]
+    assert summary.succeeded == 6
+    assert summary.pool_restarts >= 1
+
+
+def test_same_filename_in_different_folders_gets_separate_outputs(tmp_path):
+    import shutil
+
+    sample_pdf = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+    input_dir = tmp_path / "in"
+    for folder in ("", "2024", os.path.join("2024", "q1")):
+        (input_dir / folder).mkdir(parents=True, exist_ok=True)
+        shutil.copy(sample_pdf, input_dir / folder / "contract.pdf")
+    output_dir = tmp_path / "out"
+
+    summary = run_local_batch(str(input_dir), str(output_dir), workers=1)
+
+    assert summary.succeeded == 3
+    outputs = sorted(p.name for p in (output_dir / "contracts").rglob("*.json"))
+    assert outputs == ["2024__contract.json", "2024__q1__contract.json", "contract.json"]
+
+
+def test_output_names_follow_the_input_root(tmp_path):
+    (tmp_path / "a").mkdir()
+
+    assert batch.input_root(str(tmp_path)) == str(tmp_path)
+    assert batch.input_root(str(tmp_path / "**" / "*.pdf")) == str(tmp_path)
+    assert batch.input_root(str(tmp_path / "a" / "x.pdf")) == str(tmp_path / "a")
+    assert batch.output_source(str(tmp_path / "a" / "x.pdf"), str(tmp_path)) == "a__x.pdf"
+    assert batch.output_source(str(tmp_path / "x.pdf"), str(tmp_path)) == "x.pdf"
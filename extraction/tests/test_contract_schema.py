@@ -0,0 +1,67 @@
+"""Cached single and batch contract validation."""
+
+import json
+
+import pytest
+
+from src.contract_schema import (
+    ContractValidationResult,
+    ValidationErrorRecord,
+    validate_contract,
+    validate_contract_data,
+    validate_contracts,
+)
+
+VALID = {
+    "contract_id": "C-1",
+    "payer_name": "Aetna",
+    "provider_npi": "1234567890",
+    "effective_date": "2024-01-01",
+    "termination_date": "2025-12-31",
+    "rate_schedules": [
+        {"cpt_code": "99213", "rate_type": "per_diem", "rate_amount": 450.0, "effective_date": "January 1, 2024"}
+    ],
+    "amendments": [{"amendment_id": "AMD-1", "effective_date": "01/01/2025"}],
+}
+
+INVALID = dict(VALID, provider_npi="12345", effective_date="2024-02-30")
+
+
+def test_error_record_fields_and_message():
+    (npi, date) = validate_contract_data(INVALID)
+
+    assert npi == ValidationErrorRecord("provider_npi", npi.message, "string_too_short")
+    assert date.field == "effective_date" and date.error_type == "value_error"
+    assert str(date) == "effective_date: Value error, Date must be in YYYY-MM-DD format"
+
+
+def test_nested_dates_stay_free_text():
+    assert validate_contract_data(VALID) == []
+
+
+@pytest.mark.parametrize("encode", [json.dumps, lambda d: json.dumps(d).encode("utf-8")])
+def test_json_input_matches_dict_input(encode):
+    assert validate_contract_data(encode(VALID)) == []
+    assert validate_contract_data(encode(INVALID)) == validate_contract_data(INVALID)
+
+
+def test_malformed_json_is_reported_not_raised():
+    (error,) = validate_contract_data(b'{"contract_id": ')
+
+    assert error.error_type == "json_invalid"
+
+
+def test_validate_contracts_keeps_input_order():
+    results = validate_contracts([VALID, json.dumps(INVALID), json.dumps(VALID).encode("utf-8")])
+
+    assert [(r.index, r.is_valid) for r in results] == [(0, True), (1, False), (2, True)]
+    assert results[1] == ContractValidationResult(1, False, validate_contract_data(INVALID))
+    assert validate_contracts([]) == []
+
+
+def test_validate_contract_returns_messages():
+    assert validate_contract(VALID) == (True, [])
+
+    is_valid, errors = validate_contract(INVALID)
+    assert not is_valid
+    assert errors == [str(error) for error in validate_contract_data(INVALID)]
@@ -0,0 +1,183 @@
+"""Converter pool checkout, recycling and concurrent message handling."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.converter_pool import ConverterPool, merge_stats
+
+REGION = "us-east-1"
+
+
+class Converter:
+    """Fails the test if two borrowers ever hold it at once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def convert(self, seconds: float = 0.01):
+        assert self._lock.acquire(blocking=False), "converter shared between threads"
+        try:
+            time.sleep(seconds)
+        finally:
+            self._lock.release()
+
+
+def test_checkout_blocks_until_a_converter_is_returned():
+    pool = ConverterPool(Converter, size=1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with pool.borrow():
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait()
+
+    threading.Timer(0.1, release.set).start()
+    with pool.borrow(timeout=5) as converter:
+        assert isinstance(converter, Converter)
+    thread.join()
+
+    stats = pool.stats()
+    assert stats["converter_pool_waits"] == 1
+    assert stats["converter_pool_max_wait_seconds"] >= 0.05
+    assert stats["converter_pool_created"] == 1
+
+
+def test_checkout_times_out_while_every_converter_is_busy():
+    pool = ConverterPool(Converter, size=1, name="docling-test")
+
+    with pool.borrow():
+        with pytest.raises(TimeoutError, match="No docling-test free"):
+            with pool.borrow(timeout=0.05):
+                pass
+
+    with pool.borrow(timeout=0.05):
+        pass
+
+
+def test_converters_are_recycled_after_max_uses():
+    pool = ConverterPool(Converter, size=1, max_uses=2)
+    seen = []
+
+    for _ in range(3):
+        with pool.borrow() as converter:
+            seen.append(converter)
+
+    assert seen[0] is seen[1] and seen[2] is not seen[0]
+    stats = pool.stats()
+    assert (stats["converter_pool_created"], stats["converter_pool_recycled"]) == (2, 1)
+    assert stats["converter_pool_live"] == 1
+
+
+def test_failed_factory_frees_its_slot():
+    attempts = []
+
+    def flaky_factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("model download failed")
+        return Converter()
+
+    pool = ConverterPool(flaky_factory, size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.borrow(timeout=0.05):
+            pass
+    assert pool.stats()["converter_pool_live"] == 0
+
+    with pool.borrow(timeout=0.05) as converter:
+        assert isinstance(converter, Converter)
+    assert pool.stats()["converter_pool_created"] == 1
+
+
+def test_merge_stats_sums_counters_and_keeps_longest_wait():
+    pools = [ConverterPool(Converter, size=2, name=f"pool-{n}") for n in range(2)]
+    for pool in pools:
+        with pool.borrow(), pool.borrow():
+            pass
+    pools[0].max_wait_seconds = 0.5
+    pools[1].max_wait_seconds = 0.2
+
+    merged = merge_stats(pools)
+
+    assert merged["converter_pool_checkouts"] == 4
+    assert merged["converter_pool_created"] == 4
+    assert merged["converter_pool_live"] == 4
+    assert merged["converter_pool_max_wait_seconds"] == 0.5
+
+
+def test_concurrent_borrowers_never_share_a_converter():
+    pool = ConverterPool(Converter, size=3)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                with pool.borrow() as converter:
+                    converter.convert(0.001)
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = pool.stats()
+    assert stats["converter_pool_checkouts"] == 160
+    assert stats["converter_pool_created"] <= 3
+    assert stats["converter_pool_waits"] > 0
+
+
+def test_poller_handles_a_batch_on_threads_and_deletes_each_message(aws, monkeypatch):
+    import boto3
+
+    from src.extractor import SQSPoller
+
+    sqs = boto3.client("sqs", region_name=REGION)
+    queue_url = sqs.create_queue(QueueName="pooled")["QueueUrl"]
+    for n in range(6):
+        sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps({"n": n}))
+
+    pool = ConverterPool(Converter, size=3)
+    poller = SQSPoller(queue_url, None, REGION, wait_time=0, concurrency=3)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+    handled = []
+
+    def process(message):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        try:
+            with pool.borrow(timeout=5) as converter:
+                converter.convert(0.05)
+        finally:
+            with lock:
+                in_flight.pop()
+                handled.append(json.loads(message["Body"])["n"])
+
+    monkeypatch.setattr(poller, "_process_message", process)
+    messages = []
+    while len(messages) < 6:
+        messages += sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)["Messages"]
+
+    poller._handle_messages(messages)
+
+    assert sorted(handled) == list(range(6))
+    assert max(peak) > 1
+    attributes = sqs.get_queue_attributes(
+        QueueUrl=queue_url,
+        AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"]
+    )["Attributes"]
+    assert attributes == {"ApproximateNumberOfMessages": "0", "ApproximateNumberOfMessagesNotVisible": "0"}
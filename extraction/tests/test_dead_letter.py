@@ -0,0 +1,126 @@
+"""Dead-lettering and failure store replay against moto SQS."""
+
+import glob
+import json
+
+import pytest
+
+from src.dead_letter import FailureStore, replay_failure_store
+
+REGION = "us-east-1"
+
+
+@pytest.fixture
+def sqs(aws):
+    import boto3
+
+    return boto3.client("sqs", region_name=REGION)
+
+
+@pytest.fixture
+def queue_url(sqs):
+    return sqs.create_queue(QueueName="work")["QueueUrl"]
+
+
+def record(n: int) -> dict:
+    return {"message_id": f"m-{n}", "body": json.dumps({"n": n}), "reason": "boom", "receive_count": 5}
+
+
+def received(sqs, queue_url) -> list:
+    bodies = []
+    while True:
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+        if not messages:
+            return sorted(json.loads(m["Body"])["n"] for m in bodies)
+        bodies.extend(messages)
+        for message in messages:
+            sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+
+
+def test_failures_recorded_during_replay_are_kept(sqs, queue_url, tmp_path, monkeypatch):
+    store = FailureStore(str(tmp_path / "failures.jsonl"))
+    for n in range(12):
+        store.add(record(n))
+
+    send_message_batch = sqs.send_message_batch
+
+    def send_while_dead_lettering(**kwargs):
+        # A worker dead-letters another message while the replay is sending
+        store.add(record(100 + len(kwargs["Entries"])))
+        return send_message_batch(**kwargs)
+
+    monkeypatch.setattr(sqs, "send_message_batch", send_while_dead_lettering)
+
+    assert replay_failure_store(sqs, store, queue_url) == 12
+    assert received(sqs, queue_url) == list(range(12))
+    assert sorted(r["message_id"] for r in store.iter_records()) == ["m-102", "m-110"]
+    assert glob.glob(str(tmp_path / "failures.jsonl.replay-*")) == []
+
+
+def test_partial_replay_keeps_only_unsent_records(sqs, queue_url, tmp_path, monkeypatch):
+    store = FailureStore(str(tmp_path / "failures.jsonl"))
+    for n in range(15):
+        store.add(record(n))
+
+    send_message_batch = sqs.send_message_batch
+    calls = []
+
+    def second_batch_fails(**kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("SQS unavailable")
+        return send_message_batch(**kwargs)
+
+    monkeypatch.setattr(sqs, "send_message_batch", second_batch_fails)
+
+    assert replay_failure_store(sqs, store, queue_url) == 10
+    (replay_file,) = glob.glob(str(tmp_path / "failures.jsonl.replay-*"))
+    assert len(list(store.iter_records(replay_file))) == 5
+
+    # The next replay sends the remainder once, and nothing twice
+    monkeypatch.undo()
+    assert replay_failure_store(sqs, store, queue_url) == 5
+    assert received(sqs, queue_url) == list(range(15))
+    assert glob.glob(str(tmp_path / "failures.jsonl.replay-*")) == []
+
+
+def test_failed_dead_letter_send_leaves_message_and_handles_the_rest(sqs, queue_url, monkeypatch):
+    from src.extractor import SQSPoller
+
+    dlq_url = sqs.create_queue(QueueName="work-dlq")["QueueUrl"]
+    for n in range(3):
+        sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps({"n": n}))
+    messages = []
+    while len(messages) < 3:
+        messages += sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)["Messages"]
+    messages.sort(key=lambda m: json.loads(m["Body"])["n"])
+
+    poller = SQSPoller(queue_url, None, REGION, wait_time=0, dlq_url=dlq_url)
+    processed = []
+
+    def process(message):
+        n = json.loads(message["Body"])["n"]
+        if n == 0:
+            raise ValueError("malformed body")
+        processed.append(n)
+
+    send_message = poller.sqs_client.send_message
+
+    def throttled_dlq(**kwargs):
+        if kwargs["QueueUrl"] == dlq_url:
+            raise RuntimeError("Throttling")
+        return send_message(**kwargs)
+
+    monkeypatch.setattr(poller, "_process_message", process)
+    monkeypatch.setattr(poller.sqs_client, "send_message", throttled_dlq)
+
+    poller._handle_messages(messages)
+
+    assert processed == [1, 2]
+    attributes = sqs.get_queue_attributes(
+        QueueUrl=queue_url,
+        AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"]
+    )["Attributes"]
+    # Only the poison message is still owned by the queue, awaiting redrive
+    assert attributes == {"ApproximateNumberOfMessages": "0", "ApproximateNumberOfMessagesNotVisible": "1"}
+    assert received(sqs, dlq_url) == []
@@ -0,0 +1,113 @@
+"""Parser tier escalation policy and tiered parsing."""
+
+import pytest
+
+from src.escalation import (
+    TIER_DOCLING,
+    TIER_DOCLING_OCR,
+    TIER_PYPDF,
+    EscalationPolicy,
+    max_confidence,
+    pick_best,
+)
+
+HEADER_FIELDS = {
+    "contract_id": "C-1",
+    "payer_name": "Aetna",
+    "provider_npi": "1234567890",
+    "provider_name": "Example Clinic",
+    "effective_date": "2024-01-01",
+    "termination_date": "2025-01-01",
+}
+
+
+def test_pypdf_ceiling_excludes_rate_schedules():
+    assert max_confidence(TIER_PYPDF) == 0.85
+    assert max_confidence(TIER_DOCLING_OCR) == 1.0
+
+
+def test_default_policy_can_accept_pypdf():
+    policy = EscalationPolicy.from_options("pypdf,docling,docling-ocr")
+
+    assert policy.min_confidence <= max_confidence(TIER_PYPDF)
+    assert policy.escalation_reasons(dict(HEADER_FIELDS, _confidence=0.85)) == []
+
+
+def test_unreachable_threshold_for_early_tier_is_rejected():
+    with pytest.raises(ValueError, match="pypdf scores at most 0.85"):
+        EscalationPolicy.from_options("pypdf,docling-ocr", min_confidence=0.9)
+
+    # The last tier is kept whatever it scores
+    assert EscalationPolicy.from_options("docling,pypdf", min_confidence=0.9).tiers == (TIER_DOCLING, TIER_PYPDF)
+
+
+def test_required_field_an_early_tier_cannot_extract_is_rejected():
+    with pytest.raises(ValueError, match="rate_schedules"):
+        EscalationPolicy.from_options("pypdf,docling", required_fields="provider_npi,rate_schedules")
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError, match="Unknown parser tiers"):
+        EscalationPolicy.from_options("pypdf,tesseract")
+
+
+def test_pick_best_prefers_later_tier_on_ties():
+    cheap = {"_confidence": 0.8, "_tier": TIER_PYPDF}
+    heavy = {"_confidence": 0.8, "_tier": TIER_DOCLING}
+
+    assert pick_best([cheap, heavy]) is heavy
+    assert pick_best([]) is None
+
+
+def test_tiered_pypdf_result_with_all_header_fields_is_accepted(monkeypatch):
+    from src.docling_parser import DoclingParser
+
+    policy = EscalationPolicy.from_options("pypdf,docling,docling-ocr")
+    parser = DoclingParser(field_cache=None, escalation=policy)
+    monkeypatch.setattr(parser, "_cached_contract_fields", lambda text: dict(HEADER_FIELDS))
+
+    tiered = parser.extract_from_intermediate({"converter": "pypdf", "text": "", "tables": [], "tier": TIER_PYPDF})
+    assert tiered["_confidence"] == 0.85
+    assert policy.escalation_reasons(tiered) == []
+
+    # Without tiering the fallback parser keeps its penalty
+    untiered = DoclingParser(field_cache=None)
+    monkeypatch.setattr(untiered, "_cached_contract_fields", lambda text: dict(HEADER_FIELDS))
+    assert untiered.extract_from_intermediate({"converter": "pypdf", "text": "", "tables": []})["_confidence"] < 0.6
+
+
+def test_pypdf_escalates_when_rate_pages_have_no_schedules(monkeypatch):
+    import os
+
+    from src import docling_parser
+    from src.docling_parser import DoclingParser
+
+    sample_pdf = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+    rate_table = {
+        "headers": ["Service Category", "CPT Code", "Rate Type", "Rate Amount"],
+        "rows": [["Inpatient", "99213", "Per Diem", "$450.00"]],
+        "page": 1,
+    }
+
+    monkeypatch.setattr(docling_parser, "DOCLING_AVAILABLE", True)
+    policy = EscalationPolicy.from_options("pypdf,docling,docling-ocr")
+    parser = DoclingParser(field_cache=None, escalation=policy)
+    monkeypatch.setattr(parser, "_cached_contract_fields", lambda text: dict(HEADER_FIELDS))
+    tiers_run = []
+
+    def convert_tier(tier):
+        tiers_run.append(tier)
+        pypdf = parser.convert(sample_pdf, tier=TIER_PYPDF)
+        if tier == TIER_PYPDF:
+            return pypdf
+        return {"converter": "docling", "text": pypdf["text"], "tables": [rate_table], "tier": tier}
+
+    pypdf_result = parser.extract_from_intermediate(parser.convert(sample_pdf, tier=TIER_PYPDF))
+    assert pypdf_result["_confidence"] == max_confidence(TIER_PYPDF)
+    assert "rate pages without rate schedules" in policy.escalation_reasons(pypdf_result)
+
+    result = parser._parse_tiered(sample_pdf, convert_tier)
+
+    assert tiers_run == [TIER_PYPDF, TIER_DOCLING]
+    assert result["_tier"] == TIER_DOCLING
+    assert len(result["rate_schedules"]) == 1
@@ -0,0 +1,109 @@
+"""Field extraction cache: LRU, disk persistence and parser integration."""
+
+import pytest
+
+from src import field_cache
+from src.docling_parser import DoclingParser
+from src.field_cache import FieldCache, get_field_cache, stage_key
+
+NO_ID_TEXT = "Provider: Example Medical Center\nNPI: 1234567890\nEffective Date: 01/01/2024\n"
+
+
+@pytest.fixture
+def env_cache(monkeypatch):
+    """get_field_cache() re-read from the environment for one test."""
+    get_field_cache.cache_clear()
+    yield monkeypatch
+    get_field_cache.cache_clear()
+
+
+def test_stage_key_separates_stages_versions_and_text():
+    keys = {
+        stage_key("contract_fields", "text", 1),
+        stage_key("contract_fields", "text", 2),
+        stage_key("amendments", "text", 1),
+        stage_key("contract_fields", "other", 1),
+        stage_key("contract_fields", "text", 1, "seeds"),
+    }
+
+    assert len(keys) == 5
+    assert stage_key("contract_fields", "text", 1) == stage_key("contract_fields", "text", 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FieldCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats() == {
+        "field_cache_hits": 3,
+        "field_cache_disk_hits": 0,
+        "field_cache_misses": 1,
+        "field_cache_entries": 2,
+    }
+
+
+def test_entries_persist_across_instances(tmp_path):
+    FieldCache(cache_dir=str(tmp_path)).put("k" * 64, {"contract_id": "C-1"})
+
+    reloaded = FieldCache(cache_dir=str(tmp_path))
+
+    assert reloaded.get("k" * 64) == {"contract_id": "C-1"}
+    assert reloaded.get("m" * 64) is None
+    assert reloaded.stats()["field_cache_disk_hits"] == 1
+    assert reloaded.stats()["field_cache_misses"] == 1
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    cache = FieldCache(cache_dir=str(tmp_path))
+    path = cache._path("k" * 64)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not gzip")
+
+    assert cache.get("k" * 64) is None
+    assert cache.misses == 1
+
+
+def test_environment_settings(env_cache, tmp_path):
+    env_cache.setenv("FIELD_CACHE_SIZE", "7")
+    env_cache.setenv("FIELD_CACHE_DIR", str(tmp_path))
+    cache = get_field_cache()
+    assert (cache.max_entries, cache.cache_dir) == (7, tmp_path)
+
+    get_field_cache.cache_clear()
+    env_cache.setenv("FIELD_CACHE_SIZE", "0")
+    env_cache.delenv("FIELD_CACHE_DIR")
+    assert get_field_cache() is None
+
+    get_field_cache.cache_clear()
+    env_cache.delenv("FIELD_CACHE_SIZE")
+    assert get_field_cache().max_entries == field_cache.DEFAULT_MAX_ENTRIES
+
+
+def test_parser_reuses_cached_fields_without_generated_contract_id(tmp_path, monkeypatch):
+    from datetime import datetime
+
+    from src import docling_parser
+
+    ticks = iter(range(3))
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2024, 1, 1, 0, 0, next(ticks))
+
+    monkeypatch.setattr(docling_parser, "datetime", Clock)
+    first = DoclingParser(field_cache=FieldCache(cache_dir=str(tmp_path)))
+    second = DoclingParser(field_cache=FieldCache(cache_dir=str(tmp_path)))
+
+    results = [first._cached_contract_fields(NO_ID_TEXT), first._cached_contract_fields(NO_ID_TEXT),
+               second._cached_contract_fields(NO_ID_TEXT)]
+
+    assert [r["contract_id"] for r in results] == ["CTR-20240101000000", "CTR-20240101000001", "CTR-20240101000002"]
+    assert all(r["provider_npi"] == "1234567890" for r in results)
+    assert (first.field_cache.hits, second.field_cache.disk_hits) == (1, 1)
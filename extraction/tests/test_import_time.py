@@ -0,0 +1,70 @@
+"""
+Import-time budget for the lightweight extractor commands.
+
+Runs them under ``python -X importtime`` and fails if any heavy
+dependency (Docling, torch, pydantic, boto3) is loaded on the way or if
+their total import time exceeds the budget. IMPORT_TIME_BUDGET_MS
+overrides the budget on slow machines.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+EXTRACTION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands that must not pay for the extraction stack
+LIGHTWEIGHT_COMMANDS = {
+    "import": ["-c", "import src.extractor"],
+    "help": ["-m", "src.extractor", "--help"],
+}
+
+HEAVY_MODULES = ["docling", "torch", "pydantic", "boto3", "botocore"]
+
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "300"))
+
+
+def measure_imports(args: list) -> tuple:
+    """
+    Run a Python command with -X importtime.
+
+    Returns:
+        Tuple of (total import time in ms, set of imported top-level packages)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=EXTRACTION_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    total_us = 0
+    packages = set()
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        packages.add(name.strip().split(".")[0])
+
+        # Top-level imports are not indented; their cumulative times add up
+        # to the total without double counting nested imports.
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+
+    return total_us / 1000, packages
+
+
+@pytest.mark.parametrize("command", sorted(LIGHTWEIGHT_COMMANDS))
+def test_lightweight_command_skips_heavy_imports(command):
+    # The first run may still be writing bytecode caches
+    runs = [measure_imports(LIGHTWEIGHT_COMMANDS[command]) for _ in range(2)]
+    total_ms = min(total for total, _ in runs)
+    packages = set.union(*(packages for _, packages in runs))
+
+    assert sorted(p for p in HEAVY_MODULES if p in packages) == []
+    assert total_ms <= BUDGET_MS, f"{command}: {total_ms:.1f} ms exceeds {BUDGET_MS:.1f} ms budget"
@@ -0,0 +1,45 @@
+"""CPT code and service category normalization."""
+
+import pytest
+
+from src.normalization import ServiceNormalizer
+
+CATEGORIES = {
+    "OUTPATIENT": "Outpatient Services",
+    "SURGERY": "Surgical Services",
+    "IMAGING": "Imaging Services",
+    "PEDIATRIC": "Pediatric Services",
+    "DME": "Durable Medical Equipment",
+    "MENTAL": "Mental Health Services",
+}
+
+
+@pytest.fixture
+def normalizer():
+    return ServiceNormalizer(CATEGORIES)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("99213", ("99213", None)),
+    ("CPT #99213.0", ("99213", None)),
+    ("992 13", ("99213", None)),
+    ("99213-25", ("99213", "25")),
+    ("99213 25", ("99213", "25")),
+    ("27447-RT-59", ("27447", "RT,59")),
+    ("HCPCS: G0101 - GA", ("G0101", "GA")),
+    ("see exhibit", ("see exhibit", None)),
+    (None, (None, None)),
+])
+def test_cpt_modifiers_are_split_off(normalizer, value, expected):
+    assert normalizer.normalize_cpt(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Outpatient Surgery", "SURGERY"),
+    ("Pediatric Imaging", "IMAGING"),
+    ("Durable Medical Equipment Rental", "DME"),
+    ("Mental Health - Outpatient", "MENTAL"),
+    ("Unlisted", "UNLISTED"),
+])
+def test_unseen_category_resolves_to_most_specific_phrase(normalizer, value, expected):
+    assert normalizer.normalize_category(value) == expected
@@ -0,0 +1,162 @@
+"""Batched partition index flushes, gap markers and the loader's coverage check."""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import partition_index
+from src.partition_index import GAP_PREFIX, INDEX_KEY, GapMarkers, S3IndexStore
+
+BUCKET = "index-test-processed"
+
+
+def contract(contract_id: str, effective_date="2024-01-01") -> dict:
+    return {
+        "contract_id": contract_id,
+        "payer_name": "Aetna",
+        "payer_id": "AETNA-001",
+        "provider_npi": "1234567890",
+        "provider_name": "Example Clinic",
+        "effective_date": effective_date,
+        "termination_date": None,
+        "rate_schedules": [],
+        "amendments": [],
+        "_confidence": 0.9,
+    }
+
+
+@pytest.fixture
+def extractor(s3_handler):
+    from src.extractor import ContractExtractor
+
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    extractor = ContractExtractor("raw", BUCKET, "us-east-1")
+    extractor._s3_handler = s3_handler
+    return extractor
+
+
+def upload(extractor, *contract_ids):
+    for contract_id in contract_ids:
+        extractor._finalize_and_upload(contract(contract_id), f"incoming/{contract_id}.pdf")
+
+
+def index_objects(s3_handler) -> int:
+    index, _ = S3IndexStore(s3_handler, BUCKET).load()
+    return sum(entry["objects"] for entry in index.partitions.values())
+
+
+def make_loader(s3_handler, settle_seconds=120):
+    from src.warehouse_loader import PostgresDialect, WarehouseLoader, Watermark
+
+    loader = WarehouseLoader(None, s3_handler, BUCKET, PostgresDialect(), settle_seconds=settle_seconds,
+                             use_partition_index=True)
+    return loader, Watermark(datetime.utcnow() - timedelta(hours=1), "")
+
+
+def test_uploads_are_batched_until_a_flush_is_due(extractor, s3_handler, monkeypatch):
+    upload(extractor, "C-1", "C-2")
+
+    assert s3_handler.head_object(BUCKET, INDEX_KEY) is None
+
+    monkeypatch.setattr(partition_index, "FLUSH_EVERY_UPLOADS", 3)
+    upload(extractor, "C-3")
+
+    assert index_objects(s3_handler) == 3
+
+
+def test_idle_flush_after_interval(extractor, s3_handler, monkeypatch):
+    upload(extractor, "C-1")
+    monkeypatch.setattr(partition_index, "FLUSH_INTERVAL_SECONDS", 0)
+
+    extractor.maybe_flush_partition_index()
+
+    assert index_objects(s3_handler) == 1
+
+
+def test_failed_flush_marks_gap_until_a_later_flush(extractor, s3_handler, monkeypatch):
+    upload(extractor, "C-1")
+    monkeypatch.setattr(S3IndexStore, "update", lambda self, delta: False)
+    extractor.flush_partition_index()
+
+    (gap,) = GapMarkers(s3_handler, BUCKET).load()
+    assert gap["writer"] == extractor.writer_id and gap["reason"] == "flush_failed"
+
+    # The loader cannot rely on the index while the gap is open
+    S3IndexStore(s3_handler, BUCKET).replace(partition_index.PartitionIndex({"contracts/x": {}}))
+    loader, watermark = make_loader(s3_handler)
+    assert loader._indexed_partitions(watermark) is None
+
+    monkeypatch.undo()
+    extractor.flush_partition_index()
+
+    assert GapMarkers(s3_handler, BUCKET).load() == []
+    assert index_objects(s3_handler) == 1
+    assert loader._indexed_partitions(watermark) == ["contracts/payer=AETNA-001/contract_date=2024-01-01"]
+
+
+def test_writer_without_index_marks_gap_and_rebuild_covers_it(s3_handler):
+    from click.testing import CliRunner
+
+    from src.extractor import ContractExtractor
+
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    extractor = ContractExtractor("raw", BUCKET, "us-east-1", partition_index=False)
+    extractor._s3_handler = s3_handler
+    upload(extractor, "C-1", "C-2")
+
+    assert [obj["key"] for obj in s3_handler.iter_objects(BUCKET, GAP_PREFIX)] == [
+        f"{GAP_PREFIX}{extractor.writer_id}.json"
+    ]
+
+    result = CliRunner().invoke(partition_index.cli, ["rebuild", "--bucket", BUCKET, "--aws-region", "us-east-1"])
+    assert result.exit_code == 0, result.output
+
+    assert GapMarkers(s3_handler, BUCKET).load() == []
+    loader, watermark = make_loader(s3_handler)
+    assert loader._indexed_partitions(watermark) == ["contracts/payer=AETNA-001/contract_date=2024-01-01"]
+
+
+def test_short_settle_window_does_not_trust_index(extractor, s3_handler):
+    upload(extractor, "C-1")
+    extractor.flush_partition_index()
+
+    loader, watermark = make_loader(s3_handler, settle_seconds=0)
+
+    assert loader._indexed_partitions(watermark) is None
+
+
+def test_undated_contract_gets_null_date_partition():
+    from src.extractor import NULL_DATE_PARTITION, generate_output_key
+
+    key = generate_output_key(contract("C-1", effective_date=None), "incoming/C-1.pdf")
+
+    assert key == f"contracts/payer=AETNA-001/contract_date={NULL_DATE_PARTITION}/C-1.json"
+
+
+def test_uploads_proceed_while_flush_waits_on_s3(extractor, s3_handler, monkeypatch):
+    upload(extractor, "C-1")
+    entered, release = threading.Event(), threading.Event()
+    update = S3IndexStore.update
+
+    def slow_failing_update(self, delta):
+        entered.set()
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(S3IndexStore, "update", slow_failing_update)
+    flusher = threading.Thread(target=extractor.flush_partition_index)
+    flusher.start()
+    assert entered.wait(5)
+
+    # Recording an upload does not wait for the S3 round trip
+    upload(extractor, "C-2")
+    assert flusher.is_alive()
+    release.set()
+    flusher.join(5)
+
+    # The failed delta is folded back in with the newer update
+    assert extractor._index_pending == 2
+    monkeypatch.setattr(S3IndexStore, "update", update)
+    extractor.flush_partition_index()
+    assert index_objects(s3_handler) == 2
@@ -0,0 +1,66 @@
+"""Column-wise validation of rate schedules and amendments."""
+
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from src.contract_schema import Amendment, RateSchedule, validate_contract_data
+from src.records import AmendmentColumns, RateScheduleColumns
+
+RATE_ROWS = [
+    {"service_category": "LAB", "cpt_code": "80053", "rate_type": "FEE_SCHEDULE", "rate_amount": 12.5,
+     "effective_date": "2024-01-01", "modifier": None},
+    {"service_category": 7, "cpt_code": None, "rate_type": None, "rate_amount": 0.0,
+     "effective_date": "01/02/2024", "modifier": 25},
+    {"service_category": None, "cpt_code": ["99213"], "rate_type": "PER_DIEM", "rate_amount": float("nan"),
+     "effective_date": "2024-02-30", "modifier": "25"},
+]
+
+AMENDMENT_ROWS = [
+    {"amendment_id": "AMD-1", "effective_date": "2024-03-01", "description": "Rates", "amendment_type": "MODIFICATION"},
+    {"amendment_id": None, "effective_date": "March 1", "description": 3, "amendment_type": None},
+]
+
+
+def row_errors(model, rows: list, prefix: str) -> list:
+    """What pydantic reports for the same rows validated as a list of dicts."""
+    try:
+        TypeAdapter(List[model]).validate_python(rows)
+    except ValidationError as e:
+        return [
+            (f"{prefix}.{'.'.join(str(x) for x in error['loc'])}", error["msg"], error["type"])
+            for error in e.errors(include_url=False, include_input=False)
+        ]
+    return []
+
+
+@pytest.mark.parametrize("columns_type, model, rows", [
+    (RateScheduleColumns, RateSchedule, RATE_ROWS),
+    (AmendmentColumns, Amendment, AMENDMENT_ROWS),
+])
+def test_column_errors_match_row_model(columns_type, model, rows):
+    columns = columns_type.from_dicts(rows)
+
+    errors = columns.validate("items")
+
+    assert errors
+    assert sorted(errors) == sorted(row_errors(model, rows, "items"))
+
+
+def test_contract_reports_nested_column_errors():
+    amendments = AmendmentColumns.from_dicts(AMENDMENT_ROWS)
+    contract = {
+        "contract_id": "C-1",
+        "provider_npi": "1234567890",
+        "effective_date": "2024-01-01",
+        "rate_schedules": RateScheduleColumns.from_dicts(RATE_ROWS[:1]),
+        "amendments": amendments,
+    }
+
+    fields = [error.field for error in validate_contract_data(contract)]
+
+    assert "amendments.1.amendment_id" in fields
+    # Nested dates are free text, as before columnar storage
+    assert "amendments.1.effective_date" not in fields
+    assert fields == [error[0] for error in amendments.validate("amendments")]
@@ -0,0 +1,148 @@
+"""Parse cache grouping, re-extraction from cached intermediates and unchanged-output skips."""
+
+import os
+import shutil
+
+import pytest
+
+from src.parse_cache import ParseCache, entry_sources, file_digest
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+BUCKET = "reextract-test-processed"
+
+
+@pytest.fixture
+def cached_copies(tmp_path):
+    """Parse the sample PDF under two source keys, leaving one cache entry with both sources."""
+    from src.docling_parser import DoclingParser
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    parser = DoclingParser(parse_cache=cache, field_cache=None)
+    for name in ("a.pdf", "b.pdf"):
+        copy_path = tmp_path / name
+        shutil.copy(SAMPLE_PDF, copy_path)
+        assert parser.parse_contract(str(copy_path), source=f"incoming/{name}") is not None
+    return cache
+
+
+def test_identical_bytes_record_every_source(cached_copies):
+    entries = list(cached_copies.iter_entries())
+
+    assert len(entries) == 1
+    assert entries[0]["source"] == "incoming/a.pdf"
+    assert entry_sources(entries[0]) == ["incoming/a.pdf", "incoming/b.pdf"]
+
+
+def test_iter_documents_groups_every_entry_of_a_pdf(cached_copies):
+    (entry,) = cached_copies.iter_entries()
+    digest = file_digest(SAMPLE_PDF)
+    cached_copies.put(f"{digest}-pypdf-0.0.1", entry)
+    cached_copies.put(f"{digest}-docling-9.9.9-tables-auto", dict(entry, converter="docling"))
+
+    documents = list(cached_copies.iter_documents())
+
+    assert [d for d, _ in documents] == [digest]
+    assert len(documents[0][1]) == 3
+
+
+def test_extract_cached_ignores_stale_versions_and_other_variants(cached_copies):
+    from src.docling_parser import DoclingParser
+
+    (entry,) = cached_copies.iter_entries()
+    digest = file_digest(SAMPLE_PDF)
+    parser = DoclingParser(parse_cache=cached_copies, field_cache=None)
+
+    stale = {f"{digest}-pypdf-0.0.1": entry}
+    assert parser.extract_cached(digest, stale) is None
+
+    (_, current), = cached_copies.iter_documents()
+    assert parser.extract_cached(digest, current)["contract_id"]
+
+
+def test_reextract_writes_one_output_per_source(cached_copies, s3_handler):
+    from src.extractor import ContractExtractor
+
+    (entry,) = cached_copies.iter_entries()
+    cached_copies.put(f"{file_digest(SAMPLE_PDF)}-pypdf-0.0.1", dict(entry, sources=["incoming/old.pdf"]))
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+
+    extractor = ContractExtractor("raw", BUCKET, "us-east-1", parse_cache_dir=str(cached_copies.cache_dir))
+    extractor._s3_handler = s3_handler
+    processed = extractor.reextract_cached()
+
+    # Both keys for the current entry, plus the key only the stale entry saw
+    assert len(processed) == 3
+    outputs = [obj["key"] for obj in s3_handler.iter_objects(BUCKET, "contracts/")]
+    assert len(outputs) == 3
+
+
+def contract(**overrides) -> dict:
+    """Parser output for one contract, as _finalize_and_upload receives it."""
+    data = {
+        "contract_id": "CON-2024-001",
+        "payer_name": "Aetna",
+        "provider_npi": "1234567890",
+        "effective_date": "2024-01-01",
+        "rate_schedules": [{"cpt_code": "99213", "rate_amount": 450.0}],
+        "amendments": [],
+        "_confidence": 0.9,
+        "_tier": "pypdf",
+        "_tier_seconds": {"pypdf": 0.01},
+    }
+    data.update(overrides)
+    return data
+
+
+def test_fingerprint_ignores_run_metadata_only():
+    from src.extractor import content_fingerprint, finalize_contract
+
+    first, second = contract(), contract(_tier_seconds={"pypdf": 2.5})
+    finalize_contract(first, "incoming/a.pdf")
+    finalize_contract(second, "incoming/a.pdf")
+    second["extraction_metadata"]["extracted_at"] = "2030-01-01T00:00:00Z"
+
+    assert content_fingerprint(first) == content_fingerprint(second)
+    assert first["extraction_metadata"]["content_fingerprint"] == content_fingerprint(second)
+
+    second["provider_name"] = "Metro General Hospital"
+    assert content_fingerprint(first) != content_fingerprint(second)
+
+
+def test_unchanged_reextraction_skips_upload(s3_handler):
+    from src.extractor import ContractExtractor
+
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    extractor = ContractExtractor("raw", BUCKET, "us-east-1", partition_index=False)
+    extractor._s3_handler = s3_handler
+
+    first = extractor._finalize_and_upload(contract(), "incoming/a.pdf")
+    (output,) = s3_handler.iter_objects(BUCKET, "contracts/")
+    extractor._finalize_and_upload(contract(_tier_seconds={"pypdf": 3.0}), "incoming/a.pdf")
+
+    assert extractor.upload_stats == {"uploaded": 1, "unchanged": 1}
+    stored = s3_handler.read_json(BUCKET, output["key"])
+    assert stored["extraction_metadata"]["extracted_at"] == first["extraction_metadata"]["extracted_at"]
+
+    extractor._finalize_and_upload(contract(rate_schedules=[{"cpt_code": "99213", "rate_amount": 475.0}]),
+                                   "incoming/a.pdf")
+
+    assert extractor.upload_stats == {"uploaded": 2, "unchanged": 1}
+    assert s3_handler.read_json(BUCKET, output["key"])["rate_schedules"][0]["rate_amount"] == 475.0
+
+
+def test_batch_rerun_leaves_unchanged_outputs_alone(tmp_path):
+    from src.batch import run_local_batch
+
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    shutil.copy(SAMPLE_PDF, input_dir / "contract.pdf")
+    output_dir = tmp_path / "out"
+
+    first = run_local_batch(str(input_dir), str(output_dir), workers=1)
+    (output,) = (output_dir / "contracts").rglob("*.json")
+    written = output.read_bytes()
+    second = run_local_batch(str(input_dir), str(output_dir), workers=1)
+
+    assert (first.succeeded, first.unchanged) == (1, 0)
+    assert (second.succeeded, second.unchanged) == (1, 1)
+    assert output.read_bytes() == written
@@ -0,0 +1,67 @@
+"""Reference data loading and payer resolution."""
+
+import pytest
+from structlog.testing import capture_logs
+
+from src import reference_index
+from src.reference_index import BUNDLED_SNAPSHOT, DEFAULT_SEED_DIR, ReferenceIndex, get_reference_index
+
+
+@pytest.fixture
+def index():
+    return ReferenceIndex.from_seed_dir(str(DEFAULT_SEED_DIR))
+
+
+@pytest.fixture
+def fresh_reference_index(monkeypatch):
+    monkeypatch.delenv("REFERENCE_SNAPSHOT", raising=False)
+    monkeypatch.delenv("REFERENCE_SEED_DIR", raising=False)
+    get_reference_index.cache_clear()
+    yield
+    get_reference_index.cache_clear()
+
+
+def test_bundled_snapshot_matches_seeds(index):
+    # Regenerate with `python -m src.reference_index snapshot` after editing the seeds
+    assert ReferenceIndex.from_snapshot(str(BUNDLED_SNAPSHOT)).fingerprint == index.fingerprint
+
+
+def test_image_without_dbt_project_uses_bundled_snapshot(fresh_reference_index, monkeypatch, tmp_path, index):
+    monkeypatch.setattr(reference_index, "DEFAULT_SEED_DIR", tmp_path / "missing")
+
+    assert get_reference_index().fingerprint == index.fingerprint
+
+
+def test_missing_reference_data_is_logged_as_error(fresh_reference_index, monkeypatch, tmp_path):
+    monkeypatch.setenv("REFERENCE_SEED_DIR", str(tmp_path))
+
+    with capture_logs() as logs:
+        assert get_reference_index() is None
+
+    assert [log["log_level"] for log in logs] == ["error"]
+
+
+def test_parties_clause_outranks_earlier_mention(index):
+    text = (
+        "Replaces the 2019 Cigna network agreement.\n"
+        "This Agreement is made by and between Aetna Health Inc. and Example Clinic."
+        + " Filler." * 200 + " Aetna shall pay claims within 30 days."
+    )
+
+    assert index.resolve_payer(text).payer_id == "AETNA-001"
+
+
+def test_mention_count_breaks_header_ties(index):
+    header = "Provider agreement between Example Clinic, Cigna and Humana."
+    body = " Filler." * 200 + " Humana will reimburse." * 3
+
+    assert index.resolve_payer(header + body).payer_id == "HUMANA-001"
+
+
+def test_alias_inside_longer_alias_is_not_counted(index):
+    text = "Agreement with Anthem Blue Cross. Anthem Blue Cross shall pay."
+
+    match = index.resolve_payer(text)
+
+    assert match.payer_id == "ANTHEM-001"
+    assert match.start == text.lower().index("anthem")
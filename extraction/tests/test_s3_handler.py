@@ -0,0 +1,70 @@
+"""Bulk existence checks against moto S3."""
+
+import pytest
+from botocore.exceptions import ClientError
+
+BUCKET = "exists-test"
+
+
+@pytest.fixture
+def bucket(s3_handler):
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    return s3_handler
+
+
+def put(s3_handler, *keys):
+    for key in keys:
+        s3_handler.s3_client.put_object(Bucket=BUCKET, Key=key, Body=b"{}")
+
+
+def spy_listings(s3_handler, monkeypatch) -> list:
+    calls = []
+    iter_pages = s3_handler._iter_pages
+
+    def recording(bucket, prefix, start_after):
+        for page in iter_pages(bucket, prefix, start_after):
+            calls.append((prefix, start_after))
+            yield page
+
+    monkeypatch.setattr(s3_handler, "_iter_pages", recording)
+    return calls
+
+
+def test_listing_budget_falls_back_to_head(bucket, monkeypatch):
+    folder = [f"big/{n:05d}.json" for n in range(1200)]
+    put(bucket, *folder)
+    wanted = folder[::50] + ["big/00000-missing.json", "big/99999.json"]
+    calls = spy_listings(bucket, monkeypatch)
+
+    results = bucket.objects_exist(BUCKET, wanted, list_threshold=5, max_list_pages=1)
+
+    assert results == {key: key in folder for key in wanted}
+    # One page from just before the first wanted key, the rest by HEAD
+    assert calls == [("big/", "big/00000-missing.jso")]
+
+
+def test_root_keys_are_never_listed(bucket, monkeypatch):
+    roots = [f"{n}.json" for n in range(30)]
+    put(bucket, *roots[:10])
+    calls = spy_listings(bucket, monkeypatch)
+
+    results = bucket.objects_exist(BUCKET, roots, list_threshold=5)
+
+    assert results == {key: key in roots[:10] for key in roots}
+    assert calls == []
+
+
+def test_failed_checks_are_reported_per_key(bucket, monkeypatch):
+    put(bucket, "a/ok.json")
+    head_object = bucket.s3_client.head_object
+
+    def forbidden(Bucket, Key):
+        if Key == "a/secret.json":
+            raise ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+        return head_object(Bucket=Bucket, Key=Key)
+
+    monkeypatch.setattr(bucket.s3_client, "head_object", forbidden)
+
+    results = bucket.objects_exist(BUCKET, ["a/ok.json", "a/secret.json", "a/gone.json"])
+
+    assert results == {"a/ok.json": True, "a/secret.json": None, "a/gone.json": False}
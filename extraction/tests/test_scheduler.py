@@ -0,0 +1,119 @@
+"""Scheduler lanes and large-document forwarding against moto SQS."""
+
+import json
+
+import pytest
+
+from src.scheduler import LANE_LARGE, ContractScheduler, ScheduledJob
+
+REGION = "us-east-1"
+THRESHOLD = 1024
+
+
+def job(key: str, size: int) -> ScheduledJob:
+    return ScheduledJob(message={"key": key}, keys=[key], size_bytes=size, prefix=key.rsplit("/", 1)[0])
+
+
+def test_take_removes_that_job_without_serving_it():
+    scheduler = ContractScheduler(THRESHOLD)
+    first = scheduler.submit(job("incoming/a/1.pdf", 5000))
+    second = scheduler.submit(job("incoming/b/2.pdf", 4000))
+
+    assert scheduler.take(first)
+    assert not scheduler.take(first)
+
+    assert scheduler.lane_stats()[LANE_LARGE]["served"] == 0
+    assert scheduler.next_job() is second
+    assert scheduler.next_job() is None
+
+
+class RecordingExtractor:
+    def __init__(self):
+        self.keys = []
+
+    def process_s3_event(self, event, raise_errors=False):
+        keys = [record["s3"]["object"]["key"] for record in event["Records"]]
+        self.keys.extend(keys)
+        return keys
+
+
+class Queues:
+    def __init__(self):
+        import boto3
+
+        self.sqs = boto3.client("sqs", region_name=REGION)
+        self.work = self.sqs.create_queue(QueueName="work")["QueueUrl"]
+        self.large = self.sqs.create_queue(QueueName="large")["QueueUrl"]
+
+    def send(self, key: str, size: int):
+        self.sqs.send_message(
+            QueueUrl=self.work,
+            MessageBody=json.dumps({"Records": [{"s3": {"bucket": {"name": "raw"}, "object": {"key": key, "size": size}}}]}),
+            MessageAttributes={"tenant": {"DataType": "String", "StringValue": "acme"}}
+        )
+
+    def receive(self, queue_url: str) -> list:
+        return self.sqs.receive_message(
+            QueueUrl=queue_url, MaxNumberOfMessages=10, MessageAttributeNames=["All"]
+        ).get("Messages", [])
+
+    def poller(self, queue_url: str):
+        from src.extractor import SQSPoller
+
+        return SQSPoller(
+            queue_url, RecordingExtractor(), REGION, wait_time=0,
+            scheduler=ContractScheduler(THRESHOLD), large_queue_url=self.large
+        )
+
+
+@pytest.fixture
+def queues(aws):
+    return Queues()
+
+
+def test_large_message_is_forwarded_with_attributes(queues):
+    queues.send("incoming/a/big.pdf", 5000)
+    queues.send("incoming/a/small.pdf", 10)
+    poller = queues.poller(queues.work)
+
+    poller._run_scheduled(queues.receive(queues.work))
+
+    assert poller.extractor.keys == ["incoming/a/small.pdf"]
+    (forwarded,) = queues.receive(queues.large)
+    assert json.loads(forwarded["Body"])["Records"][0]["s3"]["object"]["key"] == "incoming/a/big.pdf"
+    assert forwarded["MessageAttributes"]["tenant"]["StringValue"] == "acme"
+    assert len(poller.scheduler) == 0
+
+
+def test_large_worker_group_does_not_forward_to_itself(queues):
+    queues.send("incoming/a/big.pdf", 5000)
+    poller = queues.poller(queues.large)
+    queues.sqs.send_message_batch(QueueUrl=queues.large, Entries=[
+        {"Id": "0", "MessageBody": m["Body"]} for m in queues.receive(queues.work)
+    ])
+
+    poller._run_scheduled(queues.receive(queues.large))
+
+    assert poller.large_queue_url is None
+    assert poller.extractor.keys == ["incoming/a/big.pdf"]
+
+
+def test_failed_forward_is_processed_locally(queues, monkeypatch):
+    queues.send("incoming/a/big.pdf", 5000)
+    queues.send("incoming/b/big.pdf", 6000)
+    poller = queues.poller(queues.work)
+    send_message = poller.sqs_client.send_message
+
+    def flaky_send(**kwargs):
+        if "incoming/a/" in kwargs["MessageBody"]:
+            raise RuntimeError("SQS unavailable")
+        return send_message(**kwargs)
+
+    monkeypatch.setattr(poller.sqs_client, "send_message", flaky_send)
+    poller._run_scheduled(queues.receive(queues.work))
+
+    # One failure does not stop the batch: the other message was still forwarded
+    assert poller.extractor.keys == ["incoming/a/big.pdf"]
+    assert [json.loads(m["Body"])["Records"][0]["s3"]["object"]["key"] for m in queues.receive(queues.large)] == [
+        "incoming/b/big.pdf"
+    ]
@@ -0,0 +1,314 @@
+"""Shard routing, departure and rejoin against moto S3/SQS."""
+
+import json
+from collections import Counter
+
+import pytest
+
+from src.scheduler import key_prefix
+from src.sharding import (
+    SHARD_BY_PREFIX,
+    HashRing,
+    ShardMembership,
+    ShardRouter,
+    parse_shard_queues,
+    routing_key,
+)
+
+REGION = "us-east-1"
+BUCKET = "shard-test-processed"
+SHARDS = ["shard-0", "shard-1", "shard-2", "shard-3"]
+SPARE = "shard-4"
+
+
+def s3_event(keys: list) -> str:
+    return json.dumps({
+        "Records": [
+            {"eventSource": "aws:s3", "s3": {"bucket": {"name": "raw"}, "object": {"key": key, "size": 1024}}}
+            for key in keys
+        ]
+    })
+
+
+def payer_keys(prefixes: int = 60, per_prefix: int = 3) -> list:
+    return [f"incoming/payer-{p:03d}/contract-{k}.pdf" for k in range(per_prefix) for p in range(prefixes)]
+
+
+def test_routing_key_uses_payer_folder_only_when_present():
+    assert routing_key("incoming/payer-1/a.pdf", SHARD_BY_PREFIX) == "incoming/payer-1"
+    assert routing_key("incoming/a.pdf", SHARD_BY_PREFIX) == "incoming/a.pdf"
+    assert routing_key("a.pdf", SHARD_BY_PREFIX) == "a.pdf"
+    assert routing_key("incoming/payer-1/a.pdf") == "incoming/payer-1/a.pdf"
+
+
+def test_parse_shard_queues_rejects_malformed_entries():
+    assert parse_shard_queues("a=http://q/a, b=http://q/b,") == {"a": "http://q/a", "b": "http://q/b"}
+    with pytest.raises(ValueError):
+        parse_shard_queues("a=http://q/a,b")
+
+
+def test_hash_ring_removal_only_moves_removed_shard_keys():
+    ring = HashRing(SHARDS)
+    keys = [f"key-{i}" for i in range(2000)]
+    before = {key: ring.shard_for(key) for key in keys}
+
+    ring.remove("shard-1")
+    after = {key: ring.shard_for(key) for key in keys}
+
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(before[key] == "shard-1" for key in moved)
+    assert "shard-1" not in after.values()
+
+
+class Harness:
+    """Intake queue, shard queues, heartbeats and a routing SQSPoller on moto."""
+
+    def __init__(self, by: str = SHARD_BY_PREFIX):
+        import boto3
+        from src.extractor import SQSPoller
+        from src.s3_handler import S3Handler
+
+        self.sqs = boto3.client("sqs", region_name=REGION)
+        self.s3_handler = S3Handler(REGION)
+        self.s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+
+        self.intake_url = self.sqs.create_queue(QueueName="intake")["QueueUrl"]
+        self.shard_queues = {name: self.sqs.create_queue(QueueName=name)["QueueUrl"] for name in SHARDS + [SPARE]}
+
+        self.membership = ShardMembership(self.s3_handler, BUCKET)
+        for name in SHARDS:
+            self.membership.heartbeat(name, "worker-1")
+
+        self.router = ShardRouter(self.shard_queues, by=by, membership=self.membership, refresh_seconds=0)
+        self.poller = SQSPoller(self.intake_url, None, REGION, wait_time=0, shard_router=self.router)
+
+    def send(self, keys: list, records_per_message: int = 4):
+        bodies = [s3_event(keys[i:i + records_per_message]) for i in range(0, len(keys), records_per_message)]
+        for start in range(0, len(bodies), 10):
+            self.sqs.send_message_batch(
+                QueueUrl=self.intake_url,
+                Entries=[{"Id": str(i), "MessageBody": body} for i, body in enumerate(bodies[start:start + 10])]
+            )
+
+    def depth(self, queue_url: str, attribute: str = "ApproximateNumberOfMessages") -> int:
+        attributes = self.sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=[attribute])
+        return int(attributes["Attributes"][attribute])
+
+    def route_all(self, queue_url: str = None):
+        """Poll the router until a queue (intake or a departed shard) is empty."""
+        queue_url = queue_url or self.intake_url
+        while True:
+            self.poller._poll_once()
+            if self.depth(queue_url) == 0:
+                return
+
+    def consume(self) -> dict:
+        """Drain every shard queue; routing key -> shards that received it, plus record counts."""
+        seen = {}
+        self.records = Counter()
+        for shard, queue_url in self.shard_queues.items():
+            while True:
+                messages = self.sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get("Messages", [])
+                if not messages:
+                    break
+                for message in messages:
+                    for record in json.loads(message["Body"])["Records"]:
+                        key = record["s3"]["object"]["key"]
+                        self.records[key] += 1
+                        seen.setdefault(routing_key(key, self.router.by), set()).add(shard)
+                    self.sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message["ReceiptHandle"])
+        return seen
+
+
+def single_owner(seen: dict) -> dict:
+    split = {key: shards for key, shards in seen.items() if len(shards) != 1}
+    assert not split, f"Routing keys sent to several shards: {split}"
+    return {key: next(iter(shards)) for key, shards in seen.items()}
+
+
+@pytest.fixture
+def harness(aws):
+    return Harness()
+
+
+def test_each_payer_prefix_has_one_shard_and_spare_gets_nothing(harness):
+    keys = payer_keys()
+    harness.send(keys)
+    harness.route_all()
+
+    owners = single_owner(harness.consume())
+
+    assert set(owners) == {key_prefix(k) for k in keys}
+    assert set(owners.values()) == set(SHARDS)
+    assert all(count == 1 for count in harness.records.values())
+
+
+def test_flat_intake_spreads_over_all_shards(aws):
+    harness = Harness(by="key")
+    keys = [f"incoming/contract-{i:04d}.pdf" for i in range(200)]
+    harness.send(keys)
+    harness.route_all()
+
+    owners = single_owner(harness.consume())
+
+    assert len(owners) == len(keys)
+    assert set(owners.values()) == set(SHARDS)
+
+
+def test_departed_shard_is_drained_and_only_its_prefixes_move(harness):
+    keys = payer_keys()
+    harness.send(keys)
+    harness.route_all()
+    before = single_owner(harness.consume())
+
+    departed = SHARDS[0]
+    harness.send(keys)
+    harness.route_all()
+    queued = harness.depth(harness.shard_queues[departed])
+    assert queued > 0
+
+    harness.membership.leave(departed, "worker-1")
+    harness.route_all(harness.shard_queues[departed])
+    after = single_owner(harness.consume())
+
+    assert departed not in after.values()
+    moved = [p for p in before if before[p] != after[p]]
+    assert moved and all(before[p] == departed for p in moved)
+    assert all(count == 1 for count in harness.records.values())
+
+
+def test_rejoin_moves_prefixes_only_to_joining_shards(harness):
+    keys = payer_keys()
+    departed = SHARDS[0]
+    harness.membership.leave(departed, "worker-1")
+    harness.send(keys)
+    harness.route_all()
+    without = single_owner(harness.consume())
+
+    harness.membership.heartbeat(departed, "worker-1")
+    harness.membership.heartbeat(SPARE, "worker-1")
+    harness.send(keys)
+    harness.route_all()
+    rejoined = single_owner(harness.consume())
+
+    moved = [p for p in without if without[p] != rejoined[p]]
+    assert moved and all(rejoined[p] in (departed, SPARE) for p in moved)
+
+
+def test_partial_send_failure_requeues_only_unsent_records(harness, monkeypatch):
+    keys = payer_keys(prefixes=8, per_prefix=1)
+    owners = {key: harness.router.shard_for(key) for key in keys}
+    failing = owners[keys[0]]
+    failing_url = harness.shard_queues[failing]
+
+    send_message = harness.poller.sqs_client.send_message
+
+    def flaky_send(**kwargs):
+        if kwargs["QueueUrl"] == failing_url:
+            raise RuntimeError("SQS unavailable")
+        return send_message(**kwargs)
+
+    monkeypatch.setattr(harness.poller.sqs_client, "send_message", flaky_send)
+    harness.send(keys, records_per_message=len(keys))
+    harness.poller._poll_once()
+
+    # The original is gone; only the failed shard's records are back on intake
+    requeued = harness.sqs.receive_message(QueueUrl=harness.intake_url, MaxNumberOfMessages=10)["Messages"]
+    assert len(requeued) == 1
+    requeued_keys = [r["s3"]["object"]["key"] for r in json.loads(requeued[0]["Body"])["Records"]]
+    assert sorted(requeued_keys) == sorted(k for k in keys if owners[k] == failing)
+
+    harness.consume()
+    assert set(harness.records) == {k for k in keys if owners[k] != failing}
+    assert all(count == 1 for count in harness.records.values())
+
+
+def test_message_stays_queued_when_no_shard_accepts_it(harness, monkeypatch):
+    def failing_send(**kwargs):
+        raise RuntimeError("SQS unavailable")
+
+    monkeypatch.setattr(harness.poller.sqs_client, "send_message", failing_send)
+    harness.send(payer_keys(prefixes=2, per_prefix=1))
+    harness.send(payer_keys(prefixes=2, per_prefix=1))
+    harness.poller._poll_once()
+
+    # Both messages were received and left for redelivery rather than aborting the batch
+    assert harness.depth(harness.intake_url, "ApproximateNumberOfMessagesNotVisible") == 2
+
+
+def test_router_deletes_expired_heartbeats(aws):
+    from src.s3_handler import S3Handler
+
+    s3_handler = S3Handler(REGION)
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    membership = ShardMembership(s3_handler, BUCKET, ttl_seconds=0)
+    membership.heartbeat("shard-0", "host-1234")
+
+    assert membership.live_shards(delete_expired=True) == {}
+    assert list(s3_handler.iter_objects(BUCKET, "_shards/")) == []
+
+
+def test_worker_removes_heartbeat_on_shutdown(harness):
+    from src.extractor import SQSPoller
+
+    worker = SQSPoller(
+        harness.shard_queues["shard-1"], None, REGION, wait_time=0,
+        shard_id="shard-1", membership=harness.membership
+    )
+    heartbeat_key = f"_shards/shard-1/{worker.worker_id}"
+    polls = []
+
+    def poll_once():
+        polls.append(1)
+        if len(polls) > 1:
+            raise KeyboardInterrupt
+        worker._shard_housekeeping()
+        assert harness.s3_handler.head_object(BUCKET, heartbeat_key) is not None
+
+    worker._poll_once = poll_once
+    with pytest.raises(KeyboardInterrupt):
+        worker.poll_forever()
+
+    assert harness.s3_handler.head_object(BUCKET, heartbeat_key) is None
+
+
+def test_busy_shard_stays_on_ring_past_heartbeat_ttl(harness, monkeypatch):
+    import time
+
+    from src import sharding
+    from src.extractor import SQSPoller
+
+    monkeypatch.setattr(sharding, "HEARTBEAT_SECONDS", 0.2)
+    membership = ShardMembership(harness.s3_handler, BUCKET, ttl_seconds=1)
+    router = ShardRouter(harness.shard_queues, membership=membership, refresh_seconds=0)
+
+    class BusyExtractor:
+        def maybe_flush_partition_index(self):
+            pass
+
+        def metrics(self):
+            return {}
+
+    worker = SQSPoller(
+        harness.shard_queues["shard-1"], BusyExtractor(), REGION, wait_time=0,
+        shard_id="shard-1", membership=membership
+    )
+    rings = []
+
+    def slow_batch(messages):
+        # One long parse: no poll (and no inline heartbeat) for longer than the TTL
+        time.sleep(2.5)
+        router.refresh(force=True)
+        rings.append(set(router.ring.shards))
+
+    worker._handle_messages = slow_batch
+    harness.sqs.send_message(QueueUrl=harness.shard_queues["shard-1"], MessageBody=s3_event(["incoming/a.pdf"]))
+
+    try:
+        worker._poll_once()
+    finally:
+        worker.leave_shard()
+
+    # The harness's own heartbeats have expired; the busy worker's have not
+    assert rings == [{"shard-1"}]
+    assert membership.live_shards() == {}
@@ -0,0 +1,125 @@
+"""Supervised parser workers: readiness, retries and quarantine."""
+
+import os
+import time
+
+import pytest
+
+from src.supervisor import WORKER_FAILED, WORKER_READY, QuarantineList, SupervisedParser, WorkerLimits
+
+
+def _serve(conn):
+    """Answer requests by the behaviour named in the PDF path."""
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        pdf_path = request[0]
+        behaviour, _, marker = pdf_path.partition(":")
+        if behaviour == "crash" or (behaviour == "crash-once" and not os.path.exists(marker)):
+            if marker:
+                open(marker, "w").close()
+            os._exit(1)
+        if behaviour == "hang":
+            time.sleep(60)
+        conn.send({"path": pdf_path, "pid": os.getpid()})
+
+
+def fake_worker(conn, parse_cache_dir, table_structure, escalation=None):
+    conn.send((WORKER_READY, os.getpid()))
+    _serve(conn)
+
+
+def slow_starting_worker(conn, parse_cache_dir, table_structure, escalation=None):
+    time.sleep(1.5)
+    conn.send((WORKER_READY, os.getpid()))
+    _serve(conn)
+
+
+def failing_worker(conn, parse_cache_dir, table_structure, escalation=None):
+    conn.send((WORKER_FAILED, "ImportError: no module named docling"))
+
+
+def dying_worker(conn, parse_cache_dir, table_structure, escalation=None):
+    os._exit(3)
+
+
+def supervised(target, tmp_path, **limits) -> SupervisedParser:
+    class Supervised(SupervisedParser):
+        worker_target = staticmethod(target)
+
+    limits.setdefault("timeout_seconds", 5)
+    return Supervised(WorkerLimits(**limits), quarantine=QuarantineList(str(tmp_path / "quarantine.jsonl")))
+
+
+@pytest.fixture
+def cleanup():
+    parsers = []
+    yield parsers.append
+    for parser in parsers:
+        parser.close()
+
+
+def test_crash_once_is_retried_on_fresh_worker(tmp_path, cleanup):
+    parser = supervised(fake_worker, tmp_path)
+    cleanup(parser)
+    first_pid = parser.parse_contract("ok")["pid"]
+
+    result = parser.parse_contract(f"crash-once:{tmp_path / 'crashed'}", source="incoming/a.pdf")
+
+    assert result is not None and result["pid"] != first_pid
+    assert "incoming/a.pdf" not in parser.quarantine
+    assert parser.stats["crashes"] == 1
+    assert parser.stats["retries"] == 1
+
+
+def test_repeated_crash_is_quarantined_after_retry(tmp_path, cleanup):
+    parser = supervised(fake_worker, tmp_path)
+    cleanup(parser)
+
+    assert parser.parse_contract("crash", source="incoming/bad.pdf") is None
+
+    assert "incoming/bad.pdf" in parser.quarantine
+    assert parser.stats["crashes"] == 2
+    # The next document gets a working worker
+    assert parser.parse_contract("ok") is not None
+
+
+def test_timeout_is_retried_then_quarantined(tmp_path, cleanup):
+    parser = supervised(fake_worker, tmp_path, timeout_seconds=0.5)
+    cleanup(parser)
+
+    assert parser.parse_contract("hang", source="incoming/slow.pdf") is None
+
+    assert parser.stats["timeouts"] == 2
+    assert "incoming/slow.pdf" in parser.quarantine
+
+
+def test_timeout_starts_after_worker_is_ready(tmp_path, cleanup):
+    parser = supervised(slow_starting_worker, tmp_path, timeout_seconds=1)
+    cleanup(parser)
+
+    assert parser.parse_contract("ok", source="incoming/a.pdf") is not None
+    assert parser.stats["timeouts"] == 0
+
+
+@pytest.mark.parametrize("target", [failing_worker, dying_worker])
+def test_worker_that_never_gets_ready_does_not_quarantine(tmp_path, cleanup, target):
+    parser = supervised(target, tmp_path)
+    cleanup(parser)
+
+    assert parser.parse_contract("ok", source="incoming/a.pdf") is None
+
+    assert "incoming/a.pdf" not in parser.quarantine
+    assert parser.stats["startup_failures"] == 1
+    assert parser.stats["crashes"] == 0
+
+
+def test_startup_timeout_does_not_quarantine(tmp_path, cleanup):
+    parser = supervised(slow_starting_worker, tmp_path, startup_timeout_seconds=0.5)
+    cleanup(parser)
+
+    assert parser.parse_contract("ok", source="incoming/a.pdf") is None
+
+    assert len(parser.quarantine) == 0
+    assert parser.stats["startup_failures"] == 1
@@ -0,0 +1,89 @@
+"""Page runs, page subsets and converter warm-up for table-structure recognition."""
+
+import os
+import tempfile
+
+import pytest
+
+from src.table_selection import open_pdf, page_runs, write_page_subset
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+
+
+def test_page_runs_groups_consecutive_pages():
+    assert page_runs([7, 2, 3, 3, 9, 10, 11]) == [[2, 3], [7], [9, 10, 11]]
+    assert page_runs([]) == []
+
+
+def test_subsets_share_one_reader():
+    from pypdf import PdfReader
+
+    reader = open_pdf(SAMPLE_PDF)
+    paths = [write_page_subset(SAMPLE_PDF, run, reader) for run in ([1, 2], [2])]
+
+    try:
+        assert [len(PdfReader(path).pages) for path in paths] == [2, 1]
+        assert PdfReader(paths[1]).pages[0].extract_text() == reader.pages[1].extract_text()
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+def test_failed_write_removes_temporary_file(monkeypatch, tmp_path):
+    from pypdf import PdfWriter
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    def broken_write(self, stream):
+        stream.write(b"%PDF-partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(PdfWriter, "write", broken_write)
+
+    with pytest.raises(OSError):
+        write_page_subset(SAMPLE_PDF, [1])
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("mode, pools", [
+    ("all", {(True, True), (True, False)}),
+    ("auto", {(False, True), (True, True), (False, False), (True, False)}),
+    ("off", {(False, True), (False, False)}),
+])
+def test_warm_up_loads_every_pool_the_mode_uses(monkeypatch, mode, pools):
+    import sys
+    import types
+
+    from src import docling_parser
+    from src.docling_parser import DoclingParser
+    from src.escalation import EscalationPolicy
+
+    base_models = types.SimpleNamespace(InputFormat=types.SimpleNamespace(PDF="pdf"))
+    for name in ("docling", "docling.datamodel"):
+        monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+    monkeypatch.setitem(sys.modules, "docling.datamodel.base_models", base_models)
+    monkeypatch.setattr(docling_parser, "DOCLING_AVAILABLE", True)
+
+    initialized = []
+
+    class Converter:
+        def __init__(self, options):
+            self.options = options
+
+        def initialize_pipeline(self, input_format):
+            initialized.append(self.options)
+
+    monkeypatch.setattr(
+        docling_parser, "_create_converter", lambda do_table_structure, do_ocr: Converter((do_table_structure, do_ocr))
+    )
+    parser = DoclingParser(
+        field_cache=None,
+        table_structure=mode,
+        escalation=EscalationPolicy.from_options("pypdf,docling,docling-ocr")
+    )
+
+    parser.warm_up()
+
+    assert set(initialized) == pools and len(initialized) == len(pools)
+    assert set(parser._pools) == pools
@@ -0,0 +1,96 @@
+"""Span export off the message thread, and traces across the supervised worker."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src import tracing
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "sample-contract.pdf")
+
+
+class BlockingExporter:
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def export(self, spans):
+        self.release.wait(5)
+        self.batches.append([span.name for span in spans])
+
+
+@pytest.fixture
+def processor():
+    processors = []
+
+    def make(exporter, **kwargs):
+        processor = tracing._BatchProcessor([exporter], **kwargs)
+        processors.append((processor, exporter))
+        return processor
+
+    yield make
+    for processor, exporter in processors:
+        exporter.release.set()
+        processor.shutdown(timeout=1)
+
+
+def finished(name: str, parent=None) -> tracing.Span:
+    span = tracing.Span(name, parent, {})
+    span.end_ns = time.time_ns()
+    return span
+
+
+def test_root_span_end_does_not_wait_for_export(processor):
+    exporter = BlockingExporter()
+    batcher = processor(exporter)
+    root = finished("sqs.message")
+
+    started = time.monotonic()
+    batcher.on_end(finished("parse", root))
+    batcher.on_end(root)
+    assert time.monotonic() - started < 1
+
+    exporter.release.set()
+    assert batcher.flush()
+    assert exporter.batches == [["parse", "sqs.message"]]
+    assert batcher.exported == 2
+
+
+def test_full_queue_drops_batches_instead_of_blocking(processor):
+    exporter = BlockingExporter()
+    batcher = processor(exporter, max_queued=1)
+
+    for _ in range(4):
+        batcher.on_end(finished("sqs.message"))
+
+    # One batch in the exporter, one queued, the rest dropped
+    assert batcher.dropped >= 2
+    exporter.release.set()
+    assert batcher.flush()
+
+
+def test_supervised_worker_continues_parent_trace(tmp_path, monkeypatch):
+    from src.supervisor import SupervisedParser, WorkerLimits
+
+    trace_file = str(tmp_path / "traces.jsonl")
+    monkeypatch.setenv("TRACE_FILE", trace_file)
+    tracing.configure_from_env()
+    parser = SupervisedParser(WorkerLimits(timeout_seconds=60))
+
+    try:
+        with tracing.span("parse") as parent:
+            assert parser.parse_contract(SAMPLE_PDF, source="incoming/sample.pdf") is not None
+    finally:
+        parser.close()
+        tracing.configure()
+
+    with open(trace_file) as f:
+        spans = {span["name"]: span for span in map(json.loads, f)}
+
+    worker = spans["worker.parse"]
+    assert worker["traceId"] == parent.trace_id
+    assert worker["parentSpanId"] == parent.span_id
+    assert spans["convert"]["traceId"] == parent.trace_id
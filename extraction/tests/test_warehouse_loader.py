@@ -0,0 +1,263 @@
+"""WarehouseLoader against moto S3 and the Postgres stand-in."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.warehouse_loader import (
+    MANIFEST_PREFIX,
+    PostgresDialect,
+    Watermark,
+    WarehouseLoader,
+    build_manifest,
+    pending_objects,
+)
+
+BUCKET = "contracts-processed-test"
+
+
+def contract(contract_id: str, extracted_at: str, payer_name: str = "Aetna") -> dict:
+    return {
+        "contract_id": contract_id,
+        "payer_name": payer_name,
+        "payer_id": "AETNA-001",
+        "provider_npi": "1234567890",
+        "provider_name": "Example Clinic",
+        "effective_date": "2024-01-01",
+        "termination_date": None,
+        "rate_schedules": [{"cpt_code": "99213", "rate_amount": 95.0, "rate_type": "FEE_SCHEDULE"}],
+        "amendments": [],
+        "extraction_metadata": {"extracted_at": extracted_at, "source_file": f"incoming/{contract_id}.pdf"},
+    }
+
+
+def output_key(contract_id: str, partition: str = "payer=AETNA-001/contract_date=2024-01") -> str:
+    return f"contracts/{partition}/{contract_id}.json"
+
+
+@pytest.fixture
+def bucket(s3_handler):
+    s3_handler.s3_client.create_bucket(Bucket=BUCKET)
+    return BUCKET
+
+
+def make_loader(warehouse, s3_handler, **kwargs) -> WarehouseLoader:
+    kwargs.setdefault("settle_seconds", 0)
+    loader = WarehouseLoader(warehouse, s3_handler, BUCKET, PostgresDialect(), **kwargs)
+    loader.ensure_state_table()
+    return loader
+
+
+def fetch(warehouse, sql: str, params=()) -> list:
+    with warehouse.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    warehouse.rollback()
+    return rows
+
+
+def test_pending_objects_orders_past_watermark_and_before_cutoff():
+    base = datetime(2024, 5, 1, 12, 0, 0)
+    objects = [
+        {"key": "contracts/c.json", "last_modified": base + timedelta(seconds=2)},
+        {"key": "contracts/a.json", "last_modified": base},
+        {"key": "contracts/b.json", "last_modified": base},
+        {"key": "contracts/late.json", "last_modified": base + timedelta(minutes=5)},
+    ]
+
+    pending = pending_objects(objects, Watermark(base, "contracts/a.json"), base + timedelta(minutes=1))
+
+    assert [obj["key"] for _, obj in pending] == ["contracts/b.json", "contracts/c.json"]
+
+
+def test_build_manifest_lists_urls_and_sizes():
+    manifest = build_manifest(BUCKET, [{"key": "contracts/a.json", "size": 10}])
+
+    assert manifest == {
+        "entries": [{"url": f"s3://{BUCKET}/contracts/a.json", "mandatory": True, "meta": {"content_length": 10}}]
+    }
+
+
+def test_first_load_writes_manifest_rows_and_watermark(warehouse, s3_handler, bucket):
+    for contract_id in ("C-1", "C-2"):
+        s3_handler.upload_json(bucket, output_key(contract_id), contract(contract_id, "2024-05-01T00:00:00"))
+
+    results = make_loader(warehouse, s3_handler).load_pending()
+
+    assert [(r.files, r.rows) for r in results] == [(2, 2)]
+    manifest_key = results[0].manifest[len(f"s3://{bucket}/"):]
+    assert manifest_key.startswith(MANIFEST_PREFIX)
+    manifest = s3_handler.read_json(bucket, manifest_key)
+    assert sorted(e["url"] for e in manifest["entries"]) == [f"s3://{bucket}/{output_key(c)}" for c in ("C-1", "C-2")]
+
+    rows = fetch(warehouse, "SELECT contract_id, payer_name, rate_schedules, extraction_metadata FROM raw_contracts ORDER BY 1")
+    assert [r[:2] for r in rows] == [("C-1", "Aetna"), ("C-2", "Aetna")]
+    assert rows[0][2][0]["cpt_code"] == "99213"
+    assert rows[0][3]["extracted_at"] == "2024-05-01T00:00:00"
+
+    state = fetch(warehouse, "SELECT last_key, files, rows_loaded FROM raw_contracts_load_state")
+    assert state == [(output_key("C-2"), 2, 2)]
+
+
+def test_repeated_run_loads_nothing(warehouse, s3_handler, bucket):
+    s3_handler.upload_json(bucket, output_key("C-1"), contract("C-1", "2024-05-01T00:00:00"))
+    loader = make_loader(warehouse, s3_handler)
+
+    assert len(loader.load_pending()) == 1
+    assert loader.load_pending() == []
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts") == [(1,)]
+
+
+def test_merge_keeps_latest_extraction_of_a_contract(warehouse, s3_handler, bucket):
+    # Two extractions of the same contract in one batch: the newest wins
+    s3_handler.upload_json(bucket, output_key("C-1", "payer=AETNA-001/contract_date=2024-01"),
+                           contract("C-1", "2024-05-01T00:00:00", payer_name="Old"))
+    s3_handler.upload_json(bucket, output_key("C-1", "payer=AETNA-001/contract_date=2024-02"),
+                           contract("C-1", "2024-05-02T00:00:00", payer_name="New"))
+    loader = make_loader(warehouse, s3_handler)
+    loader.load_pending()
+
+    assert fetch(warehouse, "SELECT payer_name FROM raw_contracts") == [("New",)]
+
+    # A later load replaces the row instead of adding another
+    s3_handler.upload_json(bucket, output_key("C-1", "payer=AETNA-001/contract_date=2024-03"),
+                           contract("C-1", "2024-05-03T00:00:00", payer_name="Newest"))
+    loader.load_pending()
+
+    assert fetch(warehouse, "SELECT payer_name FROM raw_contracts") == [("Newest",)]
+
+
+def test_max_files_splits_manifests(warehouse, s3_handler, bucket):
+    for i in range(5):
+        s3_handler.upload_json(bucket, output_key(f"C-{i}"), contract(f"C-{i}", "2024-05-01T00:00:00"))
+
+    results = make_loader(warehouse, s3_handler, max_files=2).load_pending()
+
+    assert [r.files for r in results] == [2, 2, 1]
+    assert len({r.manifest for r in results}) == 3
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts") == [(5,)]
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts_load_state") == [(3,)]
+
+
+def test_unsettled_objects_wait_for_next_run(warehouse, s3_handler, bucket):
+    s3_handler.upload_json(bucket, output_key("C-1"), contract("C-1", "2024-05-01T00:00:00"))
+
+    assert make_loader(warehouse, s3_handler, settle_seconds=3600).load_pending() == []
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts_load_state") == [(0,)]
+
+
+def test_failed_load_rolls_back_rows_and_watermark(warehouse, s3_handler, bucket):
+    s3_handler.upload_json(bucket, output_key("C-1"), contract("C-1", "2024-05-01T00:00:00"))
+
+    class FailingDialect(PostgresDialect):
+        def copy_manifest(self, cursor, manifest_url, manifest, s3_handler):
+            super().copy_manifest(cursor, manifest_url, manifest, s3_handler)
+            raise RuntimeError("COPY failed")
+
+    loader = make_loader(warehouse, s3_handler)
+    loader.dialect = FailingDialect()
+    with pytest.raises(RuntimeError):
+        loader.load_pending()
+
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts") == [(0,)]
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts_load_state") == [(0,)]
+
+    # The next run picks the same file up again
+    loader.dialect = PostgresDialect()
+    assert [r.files for r in loader.load_pending()] == [1]
+
+
+def test_cli_loads_through_postgres_dialect(warehouse, warehouse_params, s3_handler, bucket):
+    from click.testing import CliRunner
+
+    from src.warehouse_loader import main
+
+    s3_handler.upload_json(bucket, output_key("C-1"), contract("C-1", "2024-05-01T00:00:00"))
+
+    result = CliRunner().invoke(main, [
+        "--processed-bucket", bucket,
+        "--dialect", "postgres",
+        "--host", warehouse_params["host"],
+        "--port", str(warehouse_params["port"]),
+        "--user", warehouse_params["user"],
+        "--password", warehouse_params["password"],
+        "--database", warehouse_params["dbname"],
+        "--aws-region", "us-east-1",
+        "--settle-seconds", "0",
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert "Loaded 1 files (1 rows) in 1 manifests" in result.output
+    assert fetch(warehouse, "SELECT contract_id FROM raw_contracts") == [("C-1",)]
+
+
+def test_interrupted_pass_resumes_after_its_checkpoint(warehouse, s3_handler, bucket, monkeypatch):
+    for i in range(5):
+        s3_handler.upload_json(bucket, output_key(f"C-{i}"), contract(f"C-{i}", "2024-05-01T00:00:00"))
+
+    class FailSecondCopy(PostgresDialect):
+        copies = 0
+
+        def copy_manifest(self, cursor, manifest_url, manifest, s3_handler):
+            FailSecondCopy.copies += 1
+            if FailSecondCopy.copies == 2:
+                raise RuntimeError("COPY failed")
+            super().copy_manifest(cursor, manifest_url, manifest, s3_handler)
+
+    loader = make_loader(warehouse, s3_handler, max_files=2)
+    loader.dialect = FailSecondCopy()
+    with pytest.raises(RuntimeError):
+        loader.load_pending()
+
+    # The first manifest committed a checkpoint; the watermark has not moved
+    cursor = warehouse.cursor()
+    assert loader.read_watermark(cursor) is None
+    assert loader.read_checkpoint(cursor).start_after == output_key("C-1")
+    warehouse.rollback()
+
+    listings = []
+    iter_objects_parallel = s3_handler.iter_objects_parallel
+
+    def recording(*args, **kwargs):
+        listings.append(kwargs.get("start_after"))
+        return iter_objects_parallel(*args, **kwargs)
+
+    monkeypatch.setattr(s3_handler, "iter_objects_parallel", recording)
+    loader.dialect = PostgresDialect()
+
+    assert [r.files for r in loader.load_pending()] == [2, 1]
+    assert listings == [output_key("C-1")]
+    assert fetch(warehouse, "SELECT count(*) FROM raw_contracts") == [(5,)]
+
+    cursor = warehouse.cursor()
+    assert loader.read_checkpoint(cursor) is None
+    assert loader.read_watermark(cursor).key == output_key("C-4")
+    warehouse.rollback()
+
+    assert loader.load_pending() == []
+
+
+def test_older_extraction_in_later_manifest_does_not_replace_newer(warehouse, s3_handler, bucket):
+    # Key order puts the newer extraction in the first manifest
+    s3_handler.upload_json(bucket, output_key("C-1", "payer=AETNA-001/contract_date=2024-01"),
+                           contract("C-1", "2024-05-02T00:00:00", payer_name="New"))
+    s3_handler.upload_json(bucket, output_key("C-1", "payer=AETNA-001/contract_date=2024-02"),
+                           contract("C-1", "2024-05-01T00:00:00", payer_name="Old"))
+
+    results = make_loader(warehouse, s3_handler, max_files=1).load_pending()
+
+    assert [r.files for r in results] == [1, 1]
+    assert fetch(warehouse, "SELECT payer_name FROM raw_contracts") == [("New",)]
+
+
+def test_older_state_table_gains_checkpoint_columns(warehouse, s3_handler, bucket):
+    with warehouse.cursor() as cursor:
+        cursor.execute("DROP TABLE public.raw_contracts_load_state")
+        cursor.execute(
+            "CREATE TABLE public.raw_contracts_load_state (loader VARCHAR(100), last_modified TIMESTAMP, "
+            "last_key VARCHAR(1024), manifest VARCHAR(1024), files INTEGER, rows_loaded INTEGER, loaded_at TIMESTAMP)"
+        )
+    warehouse.commit()
+    s3_handler.upload_json(bucket, output_key("C-1"), contract("C-1", "2024-05-01T00:00:00"))
+
+    assert [r.files for r in make_loader(warehouse, s3_handler).load_pending()] == [1]
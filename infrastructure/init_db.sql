@@ -0,0 +1,29 @@
+-- Local Postgres stand-in for Redshift (docker-compose "postgres" service).
+-- Mirrors the Redshift DDL in the README with JSONB in place of SUPER.
+
+CREATE TABLE IF NOT EXISTS public.raw_contracts (
+    contract_id VARCHAR(100),
+    payer_name VARCHAR(255),
+    payer_id VARCHAR(50),
+    provider_npi VARCHAR(20),
+    provider_name VARCHAR(255),
+    effective_date VARCHAR(50),
+    termination_date VARCHAR(50),
+    rate_schedules JSONB,
+    amendments JSONB,
+    extraction_metadata JSONB,
+    loaded_at TIMESTAMP DEFAULT now()
+);
+
+-- Watermarks written by src.warehouse_loader
+CREATE TABLE IF NOT EXISTS public.raw_contracts_load_state (
+    loader VARCHAR(100),
+    last_modified TIMESTAMP,
+    last_key VARCHAR(1024),
+    manifest VARCHAR(1024),
+    files INTEGER,
+    rows_loaded INTEGER,
+    loaded_at TIMESTAMP,
+    list_after VARCHAR(1024),
+    list_cutoff TIMESTAMP
+);